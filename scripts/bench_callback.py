@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for Vegitate._event_callback.
+
+Drives the callback with synthetic events through the stand-in Quartz
+backend (vegitate.simulate), so it runs anywhere — no Mac, no permissions.
+
+Usage:
+    python scripts/bench_callback.py                  # 1,000,000 events per case
+    python scripts/bench_callback.py -n 200000        # fewer events
+    python scripts/bench_callback.py --allow-mouse-move
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.keys import KEY_MAP  # noqa: E402
+
+
+def bench(callback, event_type: int, event: simulate.FakeEvent, n: int) -> float:  # noqa: ANN001
+    """Return the mean cost of one callback invocation in nanoseconds."""
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        callback(None, event_type, event, None)
+    return (time.perf_counter_ns() - start) / n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the event-tap callback")
+    parser.add_argument("-n", type=int, default=1_000_000, help="events per case")
+    parser.add_argument(
+        "--allow-mouse-move",
+        action="store_true",
+        help="benchmark with mouse-move passthrough enabled",
+    )
+    args = parser.parse_args()
+
+    vegitate = Vegitate(allow_mouse_move=args.allow_mouse_move, stats_path=None)
+    vegitate._compile_policy()
+    callback = vegitate._event_callback
+
+    cases = [
+        ("mouse moved", simulate.kCGEventMouseMoved, simulate.FakeEvent()),
+        ("left mouse down", simulate.kCGEventLeftMouseDown, simulate.FakeEvent()),
+        ("scroll wheel", simulate.kCGEventScrollWheel, simulate.FakeEvent()),
+        ("key down (a)", simulate.kCGEventKeyDown, simulate.FakeEvent(KEY_MAP["a"])),
+        ("key up (a)", simulate.kCGEventKeyUp, simulate.FakeEvent(KEY_MAP["a"])),
+    ]
+
+    print(f"  {'event':<20} {'ns/event':>10}")
+    print(f"  {'-' * 20} {'-' * 10}")
+    for label, event_type, event in cases:
+        print(f"  {label:<20} {bench(callback, event_type, event, args.n):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Check the unlock-combo automaton, then show key-down cost stays flat as
+combos are added.
+
+Every key-down goes through the real tap callback (stand-in Quartz backend):
+
+  1. scripted — a multi-step sequence matches; a broken one doesn't; a
+                repeated first step still leads into the sequence; combos
+                that overlap (shared prefix, one ending where another
+                starts) each unlock; any of several -c combos unlocks; later
+                steps without modifiers must be pressed bare; a combo that
+                sits inside another (so the longer could never complete) is
+                rejected naming both;
+  2. random   — --sequences random key streams first unlock exactly where a
+                plain "does a combo end here?" model says they should;
+  3. scaling  — Vegitate with 1, 10 and 100 random unlock combos / sequences,
+                timed on key-downs that don't unlock — half of them stray
+                keys, half of them the first step of a configured sequence.
+
+Usage:
+    python scripts/bench_combos.py
+    python scripts/bench_combos.py -n 500000 --sequences 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate.combos import STATE_SHIFT, compile_sequences  # noqa: E402
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.keys import KEY_MAP, _parse_step, parse_sequence  # noqa: E402
+
+MODS = ["ctrl", "cmd", "alt", "shift"]
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+class Session:
+    """A compiled callback that records which key-downs unlocked."""
+
+    def __init__(self, combos: list[str]) -> None:
+        self.vegitate = Vegitate(unlock_combo=combos, panic_taps=0, stats_path=None)
+        self.unlocked: list[int] = []
+        self._index = 0
+        self.vegitate._unlock = lambda: self.unlocked.append(self._index)  # type: ignore[method-assign]
+        self.vegitate._compile_policy()
+        self.callback = self.vegitate._event_callback
+
+    def press(self, steps: list[str]) -> list[int]:
+        """Indexes of the key-downs (``"ctrl+cmd+u"``, ``"g"``...) that unlocked."""
+        self.unlocked.clear()
+        for i, step in enumerate(steps):
+            self._index = i
+            keycode, modifiers = _parse_step(step, require_modifier=False)
+            event = simulate.FakeEvent(keycode, modifiers)
+            self.callback(None, simulate.kCGEventKeyDown, event, None)
+            self.callback(None, simulate.kCGEventKeyUp, event, None)
+        return list(self.unlocked)
+
+
+def check(name: str, combos: list[str], steps: str, expected: list[int]) -> None:
+    # Steps separated by spaces; a fresh session each time.
+    got = Session(combos).press(steps.split())
+    if got != expected:
+        fail(f"{name}: {combos} unlocked on key-downs {got} of {steps!r}, expected {expected}")
+
+
+def check_scripted() -> None:
+    seq = ["ctrl+cmd+u g h"]
+    check("sequence", seq, "ctrl+cmd+u g h", [2])
+    check("sequence after stray keys", seq, "a b ctrl+cmd+u g h", [4])
+    check("incomplete", seq, "ctrl+cmd+u g", [])
+    check("broken", seq, "ctrl+cmd+u x h", [])
+    check("broken late", seq, "ctrl+cmd+u g x h", [])
+    check("broken, then whole", seq, "ctrl+cmd+u g x ctrl+cmd+u g h", [5])
+    check("out of order", seq, "g h ctrl+cmd+u", [])
+
+    check("repeated first step", ["ctrl+cmd+u g"], "ctrl+cmd+u ctrl+cmd+u g", [2])
+    check("repeated prefix", ["ctrl+cmd+u ctrl+cmd+u g"], "ctrl+cmd+u ctrl+cmd+u ctrl+cmd+u g", [3])
+    check("repeated prefix, broken", ["ctrl+cmd+u ctrl+cmd+u g"], "ctrl+cmd+u g", [])
+
+    shared = ["ctrl+alt+a b c", "ctrl+alt+a b d"]
+    check("shared prefix, first", shared, "ctrl+alt+a b c", [2])
+    check("shared prefix, second", shared, "ctrl+alt+a b d", [2])
+    chained = ["ctrl+alt+x ctrl+alt+a b", "ctrl+alt+a b c"]
+    check("one inside another", chained, "ctrl+alt+x ctrl+alt+a b", [2])
+    check("the inner one", chained, "ctrl+alt+a b c", [2])
+    fallback = ["ctrl+cmd+k ctrl+cmd+l m", "ctrl+cmd+l n"]
+    check("falls back into another", fallback, "ctrl+cmd+k ctrl+cmd+l n", [2])
+    check_rejected("prefix", ["ctrl+cmd+u", "ctrl+cmd+u g"])
+    check_rejected("prefix, written differently", ["ctrl+cmd+u g h", "cmd+ctrl+u g"])
+    check_rejected("one-step inside a sequence", ["cmd+shift+l x y", "cmd+shift+l"])
+    check_rejected("at the end", ["ctrl+cmd+u ctrl+cmd+k g", "ctrl+cmd+k g"])
+
+    several = ["ctrl+cmd+u", "ctrl+alt+l g", "cmd+shift+9"]
+    for combo in several:
+        check(f"-c {combo!r} of several", several, combo, [len(combo.split()) - 1])
+    check("none of several", several, "ctrl+cmd+l ctrl+alt+u g cmd+9", [])
+
+    bare = ["ctrl+cmd+u g"]
+    check("bare later step", bare, "ctrl+cmd+u g", [1])
+    check("later step with a modifier", bare, "ctrl+cmd+u cmd+g", [])
+    check("later step with shift", bare, "ctrl+cmd+u shift+g", [])
+    check("bare first step", bare, "u g", [])
+    check("extra modifier on the chord", ["ctrl+cmd+u"], "ctrl+cmd+shift+u", [])
+    print("  ✓ scripted : sequences, broken sequences, repeated prefixes, overlapping and "
+          "several combos, bare later steps, combos inside combos rejected")
+
+
+def check_rejected(name: str, combos: list[str]) -> None:
+    try:
+        compile_sequences(combos)
+    except ValueError as exc:
+        if not all(repr(combo) in str(exc) for combo in combos):
+            fail(f"{name}: error doesn't name both {combos}: {exc}")
+    else:
+        fail(f"{name}: {combos} compiled, though one can never complete")
+
+
+def model(steps: list[str], combos: list[str]) -> list[int]:
+    """The first key-down where the ones so far end with a combo, if any.
+
+    Only the first: unlocking ends the session (a daemon's next lock
+    compiles a fresh callback).
+    """
+    wanted = [[_parse_step(s, require_modifier=False) for s in c.split()] for c in combos]
+    history: list[tuple[int, int]] = []
+    for i, step in enumerate(steps):
+        history.append(_parse_step(step, require_modifier=False))
+        if any(history[-len(w):] == w for w in wanted if len(w) <= len(history)):
+            return [i]
+    return []
+
+
+def check_random(sequences: int, rng: random.Random) -> None:
+    # A small alphabet, so streams often (nearly) spell a combo.
+    keys = ["ctrl+cmd+u", "ctrl+cmd+k", "g", "h", "cmd+g"]
+    total = unlocks = 0
+    for n in range(sequences):
+        combos = random_stream_combos(keys, rng)
+        steps = [rng.choice(keys) for _ in range(rng.randint(1, 60))]
+        expected = model(steps, combos)
+        got = Session(combos).press(steps)[:1]
+        if got != expected:
+            fail(f"stream {n} with {combos}: unlocked on {got}, model says {expected}")
+        total += len(steps)
+        unlocks += len(got)
+    print(f"  ✓ random   : {sequences} streams, {total:,} key-downs, {unlocks} unlocks — "
+          "all match the model")
+
+
+def compiles(combos: list[str]) -> bool:
+    """False if one of *combos* sits inside another."""
+    try:
+        compile_sequences(combos)
+    except ValueError:
+        return False
+    return True
+
+
+def random_stream_combos(keys: list[str], rng: random.Random) -> list[str]:
+    while True:
+        combos = sorted({
+            " ".join(["ctrl+cmd+" + rng.choice("uk")]
+                     + [rng.choice(keys) for _ in range(rng.randint(0, 3))])
+            for _ in range(rng.randint(1, 4))
+        })
+        if compiles(combos):
+            return combos
+
+
+def random_combos(count: int, rng: random.Random) -> list[str]:
+    combos: set[str] = set()
+    while len(combos) < count:
+        mods = rng.sample(MODS, rng.randint(1, 3))
+        first = "+".join([*mods, rng.choice(LETTERS)])
+        tail = [rng.choice(LETTERS) for _ in range(rng.randint(0, 3))]
+        combo = " ".join([first, *tail])
+        if compiles(sorted(combos | {combo})):
+            combos.add(combo)
+    return sorted(combos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Unlock-combo scaling benchmark")
+    parser.add_argument("-n", type=int, default=1_000_000, help="key-downs per case")
+    parser.add_argument("--sequences", type=int, default=2000, help="random streams")
+    parser.add_argument(
+        "--max-ratio",
+        type=float,
+        default=1.5,
+        help="fail if the 100-combo case is this much slower than the 1-combo case",
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    check_scripted()
+    check_random(args.sequences, rng)
+
+    results: dict[int, float] = {}
+    print(f"  {'combos':>6} {'states':>7} {'ns/key-down':>12}")
+    for count in (1, 10, 100):
+        combos = random_combos(count, rng)
+        vegitate = Vegitate(unlock_combo=combos, panic_taps=0, stats_path=None)
+        vegitate._unlock = lambda: None  # type: ignore[method-assign]
+        vegitate._compile_policy()
+        callback = vegitate._event_callback
+
+        # Alternate a stray key with the opening step of a real sequence, so
+        # the automaton actually moves between states.
+        keycode, modifiers = parse_sequence(combos[0])[0]
+        events = [
+            simulate.FakeEvent(KEY_MAP["escape"]),
+            simulate.FakeEvent(keycode, modifiers),
+        ] * (args.n // 2)
+        if " " not in combos[0]:
+            # One-step combo: its first step would unlock, use a near miss.
+            events[1::2] = [simulate.FakeEvent(keycode)] * (args.n // 2)
+
+        key_down = simulate.kCGEventKeyDown
+        start = time.perf_counter_ns()
+        for event in events:
+            callback(None, key_down, event, None)
+        results[count] = (time.perf_counter_ns() - start) / len(events)
+        states = len({k >> STATE_SHIFT for k in vegitate._unlock_table}) + 1
+        print(f"  {count:>6} {states:>7} {results[count]:>12.1f}")
+
+    ratio = results[100] / results[1]
+    print(f"  100 / 1 combos: {ratio:.2f}x")
+    if ratio > args.max_ratio:
+        print("  ✗ key-down cost grows with the number of combos")
+        sys.exit(1)
+    print("  ✓ flat")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Check and time config loading and live reload, on the stand-in Quartz backend.
+
+  1. snapshot — load_config() parsing and validating the file vs serving
+     the unchanged file from its (mtime, size)-keyed snapshot;
+  2. errors   — bad TOML and bad settings raise ConfigError instead of
+     quietly falling back to the defaults;
+  3. reload   — for the native watcher (inotify / kqueue) and the stat-poll
+     fallback: a locked session under a steady stream of clicks has its
+     combo changed on disk.  Reports save → applied latency, and checks
+     that the tap was never recreated, no event was dropped, the old combo
+     stops working and the new one unlocks.
+
+Usage:
+    python scripts/bench_config_reload.py
+    python scripts/bench_config_reload.py -n 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+# Config and state paths are fixed at import time.
+TMP = tempfile.TemporaryDirectory()
+os.environ["XDG_CONFIG_HOME"] = str(Path(TMP.name) / "config")
+os.environ["XDG_STATE_HOME"] = str(Path(TMP.name) / "state")
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate import config, watch  # noqa: E402
+from vegitate.cli import _session_options  # noqa: E402
+from vegitate.config import CONFIG_PATH, DEFAULT_CONFIG, ConfigError, load_config  # noqa: E402
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.keys import parse_combo  # noqa: E402
+
+ARGS = argparse.Namespace(
+    combo=None, allow_mouse_move=False, no_caffeinate=True, keep_awake=None, split_taps=False,
+    stats_file=None, journal=False, journal_file=None, no_history=True, history_file=None,
+    metrics_file=None, metrics_interval=None, status_addr=None,
+)
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+def save(text: str) -> None:
+    """Write the config the way most editors do: a new file renamed over it."""
+    tmp = CONFIG_PATH.with_suffix(".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, CONFIG_PATH)
+
+
+def check_snapshot(n: int) -> None:
+    CONFIG_PATH.parent.mkdir(parents=True)
+    save(DEFAULT_CONFIG)
+
+    cold = []
+    for _ in range(n):
+        config.SNAPSHOT_PATH.unlink(missing_ok=True)
+        start = time.perf_counter()
+        load_config()
+        cold.append(time.perf_counter() - start)
+    warm = []
+    for _ in range(n):
+        start = time.perf_counter()
+        load_config()
+        warm.append(time.perf_counter() - start)
+    cold_us = statistics.median(cold) * 1e6
+    warm_us = statistics.median(warm) * 1e6
+    if warm_us >= cold_us:
+        fail(f"snapshot load {warm_us:.0f} µs isn't faster than parsing ({cold_us:.0f} µs)")
+    print(f"  ✓ parse + validate : {cold_us:8.1f} µs")
+    print(f"  ✓ from snapshot    : {warm_us:8.1f} µs")
+
+
+def check_errors() -> None:
+    bad = {
+        "bad TOML": DEFAULT_CONFIG + "\ncombo = \n",
+        "unknown setting": "panic_tap = 3\n",
+        "bad panic_key": 'panic_key = "nope"\n',
+        "bad combo": 'combo = "ctrl+nope"\n',
+        "bad passthrough": '[passthrough]\nevents = ["teleport"]\n',
+    }
+    for name, text in bad.items():
+        save(text)
+        try:
+            load_config()
+        except ConfigError:
+            continue
+        fail(f"{name} was accepted")
+    save(DEFAULT_CONFIG)
+    load_config()
+    print(f"  ✓ rejected         : {', '.join(bad)}")
+
+
+def check_reload(backend: str, rounds: int) -> None:
+    if backend == "poll":
+        # No kqueue or inotify: the watcher falls back to stat polling.
+        watch._inotify_fd = lambda directory: None  # type: ignore[assignment]
+        kqueue = getattr(watch.select, "kqueue", None)
+        if kqueue is not None:
+            del watch.select.kqueue
+    simulate.reset()
+    save(DEFAULT_CONFIG)
+
+    vegitate = Vegitate(
+        **_session_options(ARGS, load_config()),
+        reload_options=lambda: _session_options(ARGS, load_config()),
+    )
+    steps: list[str] = []
+    vegitate._notify = lambda title, message: None  # type: ignore[method-assign]
+    vegitate.display.show_step = steps.append  # type: ignore[method-assign]
+    vegitate.display.show_locked = lambda **kwargs: None  # type: ignore[method-assign]
+    vegitate.display.show_unlocked = lambda timings=None: None  # type: ignore[method-assign]
+    vegitate._lock()
+    tap = simulate.taps[0]
+
+    sent = 0
+    handled = 0
+    blocked = True
+    stop = threading.Event()
+
+    def on_click(result: object) -> None:
+        nonlocal handled, blocked
+        handled += 1
+        blocked = blocked and result is None
+
+    def flood() -> None:
+        nonlocal sent
+        click = simulate.FakeEvent()
+        while not stop.is_set():
+            tap.enqueue(simulate.kCGEventLeftMouseDown, click, on_click)
+            sent += 1
+            time.sleep(0.0002)
+
+    def press(combo: str) -> None:
+        keycode, flags = parse_combo(combo)
+        tap.enqueue(simulate.kCGEventKeyDown, simulate.FakeEvent(keycode, flags))
+
+    latencies: list[float] = []
+    errors: list[str] = []
+
+    def drive() -> None:
+        try:
+            while vegitate._watcher is None:
+                time.sleep(0.001)
+            watcher = vegitate._watcher
+            flooder.start()
+            combos = ["ctrl+alt+l", "ctrl+shift+k"]
+            for i in range(rounds):
+                combo = combos[i % 2]
+                start = time.perf_counter()
+                save(DEFAULT_CONFIG.replace('combo = "ctrl+cmd+u"', f'combo = "{combo}"'))
+                while vegitate.combos != [combo]:
+                    if time.perf_counter() - start > 10:
+                        raise TimeoutError("reload never applied")
+                    time.sleep(0.0005)
+                latencies.append(time.perf_counter() - start)
+            if watcher.backend != backend:
+                errors.append(f"watcher used {watcher.backend}, not {backend}")
+            press("ctrl+cmd+u")
+            time.sleep(0.05)
+            if vegitate._unlock_requested.is_set():
+                errors.append(f"{backend}: the old combo still unlocked")
+            stop.set()
+            flooder.join()
+            press(vegitate.combos[0])
+        except Exception as exc:  # noqa: BLE001
+            errors.append(f"{backend}: {exc}")
+            stop.set()
+            vegitate._unlock()
+
+    flooder = threading.Thread(target=flood, daemon=True)
+    driver = threading.Thread(target=drive, daemon=True)
+    driver.start()
+    simulate.CFRunLoopRun()
+    driver.join()
+
+    for error in errors:
+        fail(error)
+    if not vegitate._unlock_requested.is_set():
+        fail(f"{backend}: the new combo didn't unlock")
+    if len(simulate.taps) != 1:
+        fail(f"{backend}: {len(simulate.taps)} taps created")
+    if handled != sent or not blocked:
+        fail(f"{backend}: {sent} clicks sent, {handled} handled, all blocked: {blocked}")
+    if not any(step.startswith("Config reloaded") for step in steps):
+        fail(f"{backend}: no reload was reported")
+    ms = sorted(t * 1000 for t in latencies)
+    print(f"  ✓ reload ({backend:<7}) : p50 {statistics.median(ms):7.1f} ms · "
+          f"max {ms[-1]:7.1f} ms · {rounds} saves, {sent:,} clicks, none dropped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Config snapshot and live reload check")
+    parser.add_argument("-n", type=int, default=200, help="snapshot loads per measurement")
+    parser.add_argument("--rounds", type=int, default=5, help="config saves per backend")
+    args = parser.parse_args()
+
+    try:
+        check_snapshot(args.n)
+        check_errors()
+        native = "kqueue" if hasattr(watch.select, "kqueue") else "inotify"
+        check_reload(native, args.rounds)
+        check_reload("poll", args.rounds)
+    finally:
+        TMP.cleanup()
+
+
+if __name__ == "__main__":
+    main()
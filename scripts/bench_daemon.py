@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Time-to-locked: a cold `vegitate` start vs a request to `vegitate daemon`.
+
+Both run headless on the stand-in Quartz backend, so this works on Linux.
+
+  cold     — a fresh interpreter importing vegitate and running _lock(),
+             timed from spawn until the tap is live.
+  daemon   — lock/unlock round-trips to a `vegitate daemon --simulate`
+             process over its control socket, in-process client.
+  cli      — wall time of `vegitate lock` / `vegitate unlock` (interpreter
+             start included) against the same daemon.
+
+Fails if the p99 lock round-trip is over --budget-ms.
+
+Usage:
+    python scripts/bench_daemon.py
+    python scripts/bench_daemon.py -n 500 --budget-ms 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from vegitate.control import request  # noqa: E402
+
+COLD_LOCK = """\
+from vegitate import simulate
+simulate.install()
+from vegitate.core import Vegitate
+v = Vegitate(use_caffeinate=False, stats_path=None)
+v._notify = lambda title, message: None
+v.display.show_locked = lambda **kwargs: None
+v._lock()
+print("locked", flush=True)
+"""
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    return env
+
+
+def cold_lock_ms() -> float:
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", COLD_LOCK],
+        env=_env(),
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    while proc.stdout.readline().strip() != "locked":
+        pass
+    elapsed = time.perf_counter() - start
+    proc.kill()
+    proc.wait()
+    return elapsed * 1000
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Daemon time-to-locked benchmark")
+    parser.add_argument("-n", type=int, default=200, help="lock/unlock cycles")
+    parser.add_argument("--budget-ms", type=float, default=5.0, help="p99 lock round-trip")
+    args = parser.parse_args()
+
+    cold = min(cold_lock_ms() for _ in range(3))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sock = Path(tmp) / "vegitate.sock"
+        base = [
+            sys.executable, "-m", "vegitate",
+            "--no-caffeinate",
+            "--socket", str(sock),
+            "--stats-file", str(Path(tmp) / "stats.json"),
+            "--journal-file", str(Path(tmp) / "journal.bin"),
+            "--history-file", str(Path(tmp) / "history.db"),
+        ]
+        daemon = subprocess.Popen(
+            [*base, "daemon", "--simulate"],
+            env=_env(),
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            deadline = time.monotonic() + 10
+            while not sock.exists():
+                if time.monotonic() > deadline or daemon.poll() is not None:
+                    print("  ✗ daemon didn't come up")
+                    sys.exit(1)
+                time.sleep(0.01)
+
+            locks: list[float] = []
+            unlocks: list[float] = []
+            for _ in range(args.n):
+                t0 = time.perf_counter()
+                reply = request("lock", sock)
+                t1 = time.perf_counter()
+                if not reply["locked"]:
+                    print(f"  ✗ lock reply says unlocked: {reply}")
+                    sys.exit(1)
+                reply = request("unlock", sock)
+                t2 = time.perf_counter()
+                if reply["locked"]:
+                    print(f"  ✗ unlock reply says locked: {reply}")
+                    sys.exit(1)
+                locks.append((t1 - t0) * 1000)
+                unlocks.append((t2 - t1) * 1000)
+
+            cli = []
+            for command in ("lock", "unlock"):
+                t0 = time.perf_counter()
+                subprocess.run([*base, command], env=_env(), check=True, capture_output=True)
+                cli.append((time.perf_counter() - t0) * 1000)
+        finally:
+            daemon.terminate()
+            daemon.wait(timeout=5)
+
+    p99 = percentile(locks, 0.99)
+    print(f"  cold start → locked    : {cold:8.1f} ms")
+    print(f"  daemon lock   p50/p99  : {percentile(locks, 0.5):8.3f} / {p99:.3f} ms")
+    print(f"  daemon unlock p50/p99  : {percentile(unlocks, 0.5):8.3f} / "
+          f"{percentile(unlocks, 0.99):.3f} ms")
+    print(f"  `vegitate lock`/`unlock`: {cli[0]:7.1f} / {cli[1]:.1f} ms (incl. interpreter)")
+    if p99 > args.budget_ms:
+        print(f"  ✗ p99 lock round-trip {p99:.3f} ms over budget {args.budget_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
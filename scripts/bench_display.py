@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Compare the cost of refreshing the lock screen.
+
+  rebuild      — build a fresh panel with Display._build_lock_panel and render
+                 it, which is what every refresh used to do
+  incremental  — the _LockScreen renderer, which lays the panel out once and
+                 only swaps the timer text on each refresh
+
+Both render into an off-screen console; the script also checks the two
+produce identical output, for timers from minutes to over 1000 days.
+
+Usage:
+    python scripts/bench_display.py
+    python scripts/bench_display.py -n 5000 --width 120
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from rich.console import Console  # noqa: E402
+
+from vegitate.display import _TIMER_SLOT, Display, _fmt_time, _LockScreen  # noqa: E402
+
+CAFFEINATE = "[green]active[/]"
+
+
+def _console(width: int) -> Console:
+    return Console(file=io.StringIO(), width=width, height=40, force_terminal=True)
+
+
+def bench(render, console: Console, n: int) -> float:  # noqa: ANN001
+    """CPU microseconds per refresh."""
+    start = time.process_time()
+    for i in range(n):
+        console.print(render(_fmt_time(i * 7)))
+        console.file.seek(0)
+        console.file.truncate()
+    return (time.process_time() - start) / n * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lock-screen refresh benchmark")
+    parser.add_argument("-n", type=int, default=2000, help="refreshes per renderer")
+    parser.add_argument("--width", type=int, default=100)
+    args = parser.parse_args()
+
+    display = Display()
+    screen = _LockScreen(lambda timer: display._build_lock_panel(CAFFEINATE, timer))
+
+    def rebuild(timer: str):  # noqa: ANN202
+        return display._build_lock_panel(CAFFEINATE, timer)
+
+    def incremental(timer: str):  # noqa: ANN202
+        screen.timer = timer
+        return screen
+
+    # Every width the timer takes up to 1000 days fits the slot.
+    for seconds in (59, 3599, 86399, 9 * 86400, 99 * 86400, 1000 * 86400 - 1):
+        if len(_fmt_time(seconds)) > len(_TIMER_SLOT):
+            print(f"  ✗ timer {_fmt_time(seconds)!r} is wider than the slot {_TIMER_SLOT!r}")
+            sys.exit(1)
+
+    # Same pixels either way, including past the slot (a fresh, wider layout).
+    for timer in ("00:00", "59:59", "01:00:00", "1d 00:00:00", "999d 23:59:59",
+                  "1000d 00:00:00"):
+        a, b = _console(args.width), _console(args.width)
+        a.print(rebuild(timer))
+        b.print(incremental(timer))
+        if a.file.getvalue() != b.file.getvalue():
+            print(f"  ✗ renderers disagree for timer {timer!r}")
+            sys.exit(1)
+
+    old = bench(rebuild, _console(args.width), args.n)
+    new = bench(incremental, _console(args.width), args.n)
+    print(f"  rebuild     : {old:8.1f} µs CPU / refresh")
+    print(f"  incremental : {new:8.1f} µs CPU / refresh")
+    print(f"  reduction   : {100 * (1 - new / old):8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
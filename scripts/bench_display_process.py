@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Check that a stalled --display-process renderer can't hold up the lock.
+
+Runs the real renderer subprocess (its terminal output goes to /dev/null):
+
+  1. healthy — a renderer that keeps up gets every call and exits on its own
+               after show_unlocked;
+  2. stalled — with the renderer stopped (SIGSTOP), a flood of show_step calls
+               fills the pipe: no call takes longer than --max-ms, the excess
+               is dropped, and show_unlocked returns promptly with the
+               renderer killed and reaped;
+  3. session — the same stall mid-lock in a Vegitate session through the
+               stand-in Quartz backend: the unlock combo still stops the run
+               loop within --max-ms of the keystroke.
+
+Usage:
+    python scripts/bench_display_process.py
+    python scripts/bench_display_process.py -n 50000 --max-ms 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import signal
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+os.environ["PYTHONPATH"] = os.pathsep.join(
+    filter(None, [str(ROOT / "src"), os.environ.get("PYTHONPATH")])
+)
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.display_process import RemoteDisplay  # noqa: E402
+from vegitate.keys import parse_combo  # noqa: E402
+
+TIMINGS = [("Event tap", 0.0123), ("Keep-awake", 0.0045)]
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+@contextlib.contextmanager
+def quiet_renderer() -> Iterator[None]:
+    """Renderers started inside this block draw to /dev/null."""
+    sys.stdout.flush()
+    saved = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    try:
+        yield
+    finally:
+        os.dup2(saved, 1)
+        os.close(saved)
+        os.close(devnull)
+
+
+def timed(call, *args: object, limit: float) -> float:  # noqa: ANN001
+    """Seconds *call* took, failing if it hasn't returned after *limit*."""
+    thread = threading.Thread(target=call, args=args, daemon=True)
+    start = time.perf_counter()
+    thread.start()
+    thread.join(limit)
+    if thread.is_alive():
+        fail(f"{call.__name__}() still blocked after {limit:g} s")
+    return time.perf_counter() - start
+
+
+def flood(display: RemoteDisplay, n: int) -> float:
+    """Send *n* show_step calls; return the slowest in seconds."""
+    worst = 0.0
+
+    def send() -> None:
+        nonlocal worst
+        for i in range(n):
+            start = time.perf_counter()
+            display.show_step(f"Step {i:>6} — " + "x" * 64)
+            worst = max(worst, time.perf_counter() - start)
+
+    timed(send, limit=5)
+    return worst
+
+
+def check_healthy() -> None:
+    with quiet_renderer():
+        display = RemoteDisplay()
+    proc = display._proc
+    display.show_banner("0.0.0")
+    display.show_locked("active")
+    for i in range(200):
+        display.show_step(f"Step {i}")
+    took = timed(display.show_unlocked, TIMINGS, limit=10)
+    if proc is None or proc.returncode != 0:
+        fail(f"renderer exited {proc and proc.returncode} after show_unlocked, expected 0")
+    if display.dropped:
+        fail(f"{display.dropped} calls dropped with a renderer that keeps up")
+    print(f"  ✓ healthy : 203 calls delivered, renderer exited 0 after show_unlocked "
+          f"in {took * 1e3:.0f} ms")
+
+
+def check_stalled(n: int, max_ms: float) -> None:
+    with quiet_renderer():
+        display = RemoteDisplay()
+    proc = display._proc
+    assert proc is not None
+    display.show_locked("active")
+    time.sleep(0.2)
+    os.kill(proc.pid, signal.SIGSTOP)
+    try:
+        worst = flood(display, n)
+        took = timed(display.show_unlocked, TIMINGS, limit=5)
+    finally:
+        if proc.poll() is None:
+            os.kill(proc.pid, signal.SIGKILL)
+            proc.wait()
+    if worst * 1e3 > max_ms:
+        fail(f"show_step() took {worst * 1e3:.1f} ms behind a stopped renderer")
+    if not display.dropped:
+        fail(f"{n:,} calls to a stopped renderer and none dropped — pipe never filled")
+    if took * 1e3 > max_ms:
+        fail(f"show_unlocked() took {took * 1e3:.0f} ms behind a stopped renderer")
+    if proc.returncode is None:
+        fail("stopped renderer not reaped after show_unlocked")
+    print(f"  ✓ stalled : {n:,} calls to a stopped renderer, worst {worst * 1e3:.2f} ms, "
+          f"{display.dropped:,} dropped · show_unlocked {took * 1e3:.0f} ms, renderer killed")
+
+
+def check_session(n: int, max_ms: float) -> None:
+    simulate.reset()
+    with quiet_renderer():
+        vegitate = Vegitate(use_caffeinate=False, stats_path=None, display_process=True)
+    vegitate._notify = lambda title, message: None  # type: ignore[method-assign]
+    display = vegitate.display
+    assert isinstance(display, RemoteDisplay) and display._proc is not None
+    proc = display._proc
+    vegitate._compile_policy()
+    vegitate._start_unlock_worker()
+    vegitate._create_event_tap()
+    display.show_locked("active")
+    time.sleep(0.2)
+    os.kill(proc.pid, signal.SIGSTOP)
+    try:
+        flood(display, n)
+        keycode, modifiers = parse_combo(vegitate.combos[0])
+        assert vegitate.run_loop is not None
+        loop = threading.Thread(target=vegitate.run_loop.run, daemon=True)
+        loop.start()
+        start = time.perf_counter()
+        vegitate.event_tap.post(simulate.kCGEventKeyDown, simulate.FakeEvent(keycode, modifiers))
+        loop.join(5)
+        took = time.perf_counter() - start
+    finally:
+        if proc.poll() is None:
+            os.kill(proc.pid, signal.SIGKILL)
+            proc.wait()
+    if loop.is_alive():
+        fail("unlock never stopped the run loop with the renderer stopped")
+    if took * 1e3 > max_ms:
+        fail(f"unlock took {took * 1e3:.0f} ms with the renderer stopped")
+    print(f"  ✓ session : renderer stopped mid-lock, unlock stopped the run loop "
+          f"in {took * 1e3:.0f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Display process stall check")
+    parser.add_argument("-n", type=int, default=20_000, help="show_step calls in the flood")
+    parser.add_argument("--max-ms", type=float, default=500.0,
+                        help="fail if any call or the unlock takes longer than this")
+    args = parser.parse_args()
+
+    check_healthy()
+    check_stalled(args.n, args.max_ms)
+    check_session(args.n, args.max_ms)
+
+
+if __name__ == "__main__":
+    main()
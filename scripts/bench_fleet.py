@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Check and time `vegitate fleet` against local stand-in status servers.
+
+Starts --hosts real status endpoints (vegitate.status.StatusServer serving
+made-up lock states) on localhost, plus one of each kind of broken host: a
+slow one that answers after the timeout, a black hole that accepts and
+never replies, a closed port, and a server that isn't vegitate.  Then:
+
+  1. cold  — the first round: every good host reported with the right
+             state, every broken one with the right error, and the round
+             takes about one timeout, not one per host;
+  2. warm  — a second round reuses the pooled connections: no new
+             connections are opened, and the per-host latency drops;
+  3. live  — a locked Vegitate session (stand-in Quartz backend) serves its
+             own status, and the poller sees it locked, then unlocked.
+
+Fails if any result is wrong, the cold round takes longer than --timeout
+plus --slack-s, or the warm round opens a connection.
+
+Usage:
+    python scripts/bench_fleet.py
+    python scripts/bench_fleet.py --hosts 500 --timeout 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.fleet import FleetPoller, summarize  # noqa: E402
+from vegitate.status import StatusServer  # noqa: E402
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+class CountingServer(StatusServer):
+    """A StatusServer that counts the connections it accepts."""
+
+    accepted = 0
+
+    def process_request(self, request, client_address) -> None:  # noqa: ANN001
+        CountingServer.accepted += 1
+        super().process_request(request, client_address)
+
+
+def stand_in(index: int) -> dict[str, object]:
+    locked = index % 3 == 0
+    return {
+        "ok": True,
+        "locked": locked,
+        "locked_since": time.time() - 600 if locked else None,
+        "locked_for": 600.0 if locked else None,
+        "caffeinate": "active" if locked else "inactive",
+        "pid": 1000 + index,
+        "version": "0.0.0",
+    }
+
+
+def start_servers(n: int, timeout: float) -> tuple[list[str], dict[str, str], list]:
+    """Good hosts, {broken host: expected error fragment}, things to close."""
+    servers = []
+    good = []
+    for i in range(n):
+        server = CountingServer(("127.0.0.1", 0), lambda i=i: stand_in(i))
+        server.start()
+        servers.append(server)
+        good.append(f"127.0.0.1:{server.port}")
+
+    def slow() -> dict[str, object]:
+        time.sleep(timeout * 3)
+        return stand_in(0)
+
+    slow_server = StatusServer(("127.0.0.1", 0), slow)
+    slow_server.start()
+    other = StatusServer(("127.0.0.1", 0), lambda: {"hello": "world"})
+    other.start()
+    servers += [slow_server, other]
+
+    black_hole = socket.create_server(("127.0.0.1", 0))  # listens, never accepts
+    closed = socket.create_server(("127.0.0.1", 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()
+
+    broken = {
+        f"127.0.0.1:{slow_server.port}": "timed out",
+        f"127.0.0.1:{black_hole.getsockname()[1]}": "timed out",
+        f"127.0.0.1:{closed_port}": "refused",
+        f"127.0.0.1:{other.port}": "not a vegitate status",
+    }
+    return good, broken, servers + [black_hole]
+
+
+def check_results(results: list[dict], good: list[str], broken: dict[str, str]) -> None:
+    by_host = {r["host"]: r for r in results}
+    for i, host in enumerate(good):
+        r = by_host[host]
+        if not r["ok"] or r["status"]["locked"] != (i % 3 == 0):
+            fail(f"{host}: {r}")
+    for host, error in broken.items():
+        r = by_host[host]
+        if r["ok"] or error not in (r["error"] or ""):
+            fail(f"{host}: expected '{error}', got {r}")
+    counts = summarize(results)
+    expected_locked = sum(1 for i in range(len(good)) if i % 3 == 0)
+    if counts["locked"] != expected_locked or counts["unreachable"] != len(broken):
+        fail(f"summary {counts}")
+
+
+async def check_fleet(n: int, timeout: float, concurrency: int, slack: float) -> None:
+    good, broken, closers = start_servers(n, timeout)
+    poller = FleetPoller(good + list(broken), timeout=timeout, concurrency=concurrency)
+    try:
+        start = time.perf_counter()
+        cold = await poller.poll()
+        cold_s = time.perf_counter() - start
+        check_results(cold, good, broken)
+        accepted = CountingServer.accepted
+        if accepted != n:
+            fail(f"{accepted} connections accepted for {n} good hosts")
+        cold_ms = statistics.median(r["latency_ms"] for r in cold if r["ok"])
+        print(f"  ✓ cold : {len(cold)} hosts in {cold_s:.2f} s (timeout {timeout:g} s) · "
+              f"p50 {cold_ms:.1f} ms per host · {len(broken)} broken ones reported")
+        if cold_s > timeout + slack:
+            fail(f"round took {cold_s:.2f} s, over {timeout:g} s timeout + {slack:g} s")
+
+        start = time.perf_counter()
+        warm = await poller.poll()
+        warm_s = time.perf_counter() - start
+        check_results(warm, good, broken)
+        if CountingServer.accepted != accepted:
+            fail(f"warm round opened {CountingServer.accepted - accepted} new connections")
+        warm_ms = statistics.median(r["latency_ms"] for r in warm if r["ok"])
+        print(f"  ✓ warm : {len(warm)} hosts in {warm_s:.2f} s · p50 {warm_ms:.1f} ms per host · "
+              f"no new connections ({poller.connects} opened in total)")
+    finally:
+        await poller.close()
+        for closer in closers:
+            closer.close()
+
+
+async def check_live() -> None:
+    vegitate = Vegitate(use_caffeinate=False, stats_path=None, status_address=("127.0.0.1", 0))
+    vegitate.display.show_step = lambda message: None  # type: ignore[method-assign]
+    vegitate._start_status_server()
+    server = vegitate._status_server
+    if server is None:
+        fail("status endpoint didn't start")
+    poller = FleetPoller([f"127.0.0.1:{server.port}"], timeout=2.0)
+    try:
+        vegitate.locked_since = time.time()
+        vegitate._unlock_requested.clear()
+        [locked] = await poller.poll()
+        vegitate._unlock_requested.set()
+        [unlocked] = await poller.poll()
+    finally:
+        await poller.close()
+        vegitate._stop_status_server()
+    if not (locked["ok"] and locked["status"]["locked"]):
+        fail(f"locked session reported as {locked}")
+    if not unlocked["ok"] or unlocked["status"]["locked"]:
+        fail(f"unlocked session reported as {unlocked}")
+    if "combo" in locked["status"] or "combo" in unlocked["status"]:
+        fail("the status endpoint gave away the unlock combo")
+    print("  ✓ live : a stand-in session's endpoint reports it locked, then unlocked")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fleet poller check")
+    parser.add_argument("--hosts", type=int, default=100, help="good stand-in hosts")
+    parser.add_argument("--timeout", type=float, default=0.5, help="per-host timeout")
+    parser.add_argument("--concurrency", type=int, default=64, help="requests in flight")
+    parser.add_argument("--slack-s", type=float, default=1.0, help="cold round budget over timeout")
+    args = parser.parse_args()
+
+    asyncio.run(check_fleet(args.hosts, args.timeout, args.concurrency, args.slack_s))
+    asyncio.run(check_live())
+
+
+if __name__ == "__main__":
+    main()
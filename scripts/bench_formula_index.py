@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Check generate_formula.py's metadata fetching against a local stub index.
+
+Serves PyPI-style JSON (``/pypi/<package>/json``, with ETags) from
+127.0.0.1 for every dependency, at the versions in Formula/vegitate.lock.json,
+and runs the real script against it with --index-url on copies of the
+formula and lockfile:
+
+  1. cold    — every package fetched once, unconditionally, several at a
+               time over at most --jobs keep-alive connections;
+  2. warm    — a second run only makes conditional requests
+               (If-None-Match), all answered 304 and served from the cache;
+  3. error   — a 500 for one package fails the run cleanly: non-zero exit,
+               the package and status named, no traceback, nothing written;
+  4. timeout — a request that times out drops its pooled connection, so the
+               next request on that thread gets its own answer, not the late
+               one.
+
+Usage:
+    python scripts/bench_formula_index.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPT = ROOT / "scripts" / "generate_formula.py"
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from generate_formula import LOCK_PATH, PYPI_DEPS, PyPIClient  # noqa: E402
+
+
+def metadata(entry: dict) -> dict:
+    """The JSON API document PyPI would serve for a lock *entry*."""
+    return {
+        "info": {"name": entry["name"], "version": entry["version"]},
+        "urls": [{
+            "packagetype": "sdist",
+            "url": entry["url"],
+            "digests": {"sha256": entry["sha256"]},
+        }],
+        "releases": {},
+    }
+
+
+class StubIndex:
+    """A PyPI JSON API stand-in that records what it was asked."""
+
+    def __init__(self, entries: dict[str, dict], delay: float = 0.05) -> None:
+        self.delay = delay
+        self.documents: dict[str, bytes] = {}
+        self.fail: dict[str, int] = {}     # package → status to answer with
+        self.slow: dict[str, float] = {}   # package → seconds, once
+        self.requests: list[tuple[str, str | None, int]] = []  # (package, If-None-Match, status)
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        for dep, entry in entries.items():
+            self.set(dep, entry)
+
+        index = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with index._lock:
+                    index.connections += 1
+
+            def do_GET(self) -> None:  # noqa: N802
+                index.handle(self)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/pypi"
+
+    def set(self, dep: str, entry: dict) -> None:
+        self.documents[dep.lower()] = json.dumps(metadata(entry)).encode()
+
+    def etag(self, package: str) -> str:
+        return '"' + hashlib.sha256(self.documents[package]).hexdigest()[:16] + '"'
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        package = request.path.strip("/").split("/")[1].lower()
+        condition = request.headers.get("If-None-Match")
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            slow = self.slow.pop(package, 0.0)
+        try:
+            time.sleep(self.delay + slow)
+            if package in self.fail:
+                status, body, headers = self.fail[package], b"", {}
+            elif package not in self.documents:
+                status, body, headers = 404, b"", {}
+            elif condition == self.etag(package):
+                status, body, headers = 304, b"", {"ETag": condition}
+            else:
+                status, body = 200, self.documents[package]
+                headers = {"ETag": self.etag(package), "Content-Type": "application/json"}
+            with self._lock:
+                self.requests.append((package, condition, status))
+            request.send_response(status)
+            for name, value in headers.items():
+                request.send_header(name, value)
+            if status != 304:
+                request.send_header("Content-Length", str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.connections = 0
+            self.max_in_flight = 0
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+def generate(index: StubIndex, tmp: Path, *extra: str, jobs: int = 4) -> subprocess.CompletedProcess:
+    """Run generate_formula.py on tmp's formula and lockfile, against *index*."""
+    env = dict(os.environ, XDG_CACHE_HOME=str(tmp / "cache"))
+    return subprocess.run(
+        [sys.executable, str(SCRIPT), "--index-url", index.url, "-j", str(jobs),
+         "--output", str(tmp / "vegitate.rb"), "--lockfile", str(tmp / "vegitate.lock.json"),
+         *extra],
+        env=env, capture_output=True, text=True, timeout=60,
+    )
+
+
+def workspace(tmp: Path) -> None:
+    """Fresh copies of the repo's formula and lockfile in *tmp*, no cache."""
+    shutil.copyfile(ROOT / "Formula" / "vegitate.rb", tmp / "vegitate.rb")
+    shutil.copyfile(LOCK_PATH, tmp / "vegitate.lock.json")
+    shutil.rmtree(tmp / "cache", ignore_errors=True)
+
+
+def snapshot(tmp: Path) -> tuple[bytes, bytes]:
+    return (tmp / "vegitate.rb").read_bytes(), (tmp / "vegitate.lock.json").read_bytes()
+
+
+def check_cold_and_warm(index: StubIndex, tmp: Path, jobs: int) -> None:
+    workspace(tmp)
+    index.reset()
+    start = time.perf_counter()
+    result = generate(index, tmp, jobs=jobs)
+    cold = time.perf_counter() - start
+    if result.returncode:
+        fail(f"cold run failed:\n{result.stdout}{result.stderr}")
+    fetched = sorted(p for p, _, _ in index.requests)
+    if fetched != sorted(dep.lower() for dep in PYPI_DEPS):
+        fail(f"cold run fetched {fetched}")
+    if any(condition for _, condition, _ in index.requests):
+        fail("cold run sent conditional requests with an empty cache")
+    if index.max_in_flight < 2:
+        fail(f"metadata fetched one package at a time (at most {index.max_in_flight} in flight)")
+    if index.connections > jobs:
+        fail(f"{index.connections} connections for -j {jobs}")
+    print(f"  ✓ cold    : {len(fetched)} packages from --index-url in {cold * 1000:.0f} ms · "
+          f"up to {index.max_in_flight} in flight over {index.connections} connections")
+
+    index.reset()
+    start = time.perf_counter()
+    result = generate(index, tmp, jobs=jobs)
+    warm = time.perf_counter() - start
+    if result.returncode:
+        fail(f"warm run failed:\n{result.stdout}{result.stderr}")
+    if len(index.requests) != len(PYPI_DEPS):
+        fail(f"warm run made {len(index.requests)} requests")
+    for package, condition, status in index.requests:
+        if condition != index.etag(package) or status != 304:
+            fail(f"warm run: {package} sent If-None-Match {condition!r}, got {status}")
+    if f"{len(PYPI_DEPS)} not modified" not in result.stdout:
+        fail(f"304s not served from the cache:\n{result.stdout}")
+    print(f"  ✓ warm    : {len(index.requests)} conditional requests, all 304, "
+          f"served from the cache in {warm * 1000:.0f} ms")
+
+
+def check_error(index: StubIndex, tmp: Path) -> None:
+    workspace(tmp)
+    before = snapshot(tmp)
+    index.fail["rich"] = 500
+    try:
+        result = generate(index, tmp)
+    finally:
+        index.fail.clear()
+    output = result.stdout + result.stderr
+    if result.returncode == 0:
+        fail("a 500 from the index didn't fail the run")
+    if "Traceback" in output:
+        fail(f"a 500 from the index ended in a traceback:\n{output}")
+    if "rich" not in output or "HTTP 500" not in output:
+        fail(f"error doesn't name the package and status:\n{output}")
+    if snapshot(tmp) != before:
+        fail("formula or lockfile written despite the error")
+    print("  ✓ error   : HTTP 500 for rich → exit "
+          f"{result.returncode}, package and status named, nothing written")
+
+
+def check_timeout(index: StubIndex) -> None:
+    client = PyPIClient(index.url, cache_dir=None, artifact_dir=None, timeout=0.3)
+    index.reset()
+    index.slow["mdurl"] = 1.0
+    try:
+        client.get_json("mdurl")
+    except OSError:
+        pass
+    else:
+        fail("a 1 s response didn't time out at 0.3 s")
+    try:
+        data = client.get_json("rich")
+    except Exception as exc:
+        fail(f"request after a timeout failed: {type(exc).__name__}: {exc}")
+    finally:
+        client.close()
+    if data["info"]["name"].lower() != "rich":
+        fail(f"request after a timeout got {data['info']['name']}'s answer")
+    if index.connections != 2:
+        fail(f"{index.connections} connections, expected a fresh one after the timeout")
+    print("  ✓ timeout : the timed-out connection is dropped, the next request "
+          "gets its own answer on a new one")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Formula metadata fetch check")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="concurrent fetches")
+    args = parser.parse_args()
+
+    entries = json.loads(LOCK_PATH.read_text())["dependencies"]
+    index = StubIndex(entries)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            check_cold_and_warm(index, Path(tmp), args.jobs)
+            check_error(index, Path(tmp))
+        check_timeout(index)
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Check that generate_formula.py only touches what moved upstream.
+
+Runs the real script with --index-url against the stub index from
+bench_formula_index.py, on copies of Formula/vegitate.rb and its lockfile:
+
+  1. unchanged — upstream at the locked versions: the formula and lockfile
+                 come out byte-identical, and --diff exits 0;
+  2. drift     — one dependency moved: --diff --dry-run prints the change,
+                 exits 1 and writes nothing;
+  3. patch     — a real run rewrites only that dependency's resource block
+                 and lock entry (the release url/sha256 and every other
+                 line stay as they were), after which --diff exits 0 again.
+
+Usage:
+    python scripts/bench_formula_lock.py
+    python scripts/bench_formula_lock.py --dep rich
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import hashlib
+import json
+import tempfile
+from pathlib import Path
+
+from bench_formula_index import StubIndex, fail, generate, snapshot, workspace
+from generate_formula import LOCK_PATH, PYPI_DEPS, RESOURCE_RE
+
+
+def moved(entry: dict) -> dict:
+    """*entry* as if its next release had just come out."""
+    major, _, rest = entry["version"].partition(".")
+    version = f"{int(major) + 1}.{rest or '0'}"
+    filename = f"{entry['name'].lower().replace('-', '_')}-{version}.tar.gz"
+    return {
+        "name": entry["name"],
+        "version": version,
+        "url": f"https://files.pythonhosted.org/packages/fa/ke/{filename}",
+        "sha256": hashlib.sha256(filename.encode()).hexdigest(),
+    }
+
+
+def block_lines(text: str, name: str) -> range:
+    """0-based line numbers of *name*'s resource block in *text*."""
+    for match in RESOURCE_RE.finditer(text):
+        if match["name"] == name:
+            first = text.count("\n", 0, match.start())
+            return range(first, first + match.group().count("\n") + 1)
+    fail(f"no resource block for {name}")
+    raise AssertionError
+
+
+def changed_lines(before: str, after: str) -> set[int]:
+    """Line numbers in *before* that differ in *after* (same line count)."""
+    old, new = before.splitlines(), after.splitlines()
+    if len(old) != len(new):
+        fail(f"formula went from {len(old)} to {len(new)} lines")
+    return {i for i, (a, b) in enumerate(zip(old, new)) if a != b}
+
+
+def check_unchanged(index: StubIndex, tmp: Path) -> None:
+    workspace(tmp)
+    before = snapshot(tmp)
+    result = generate(index, tmp)
+    if result.returncode:
+        fail(f"run failed:\n{result.stdout}{result.stderr}")
+    if snapshot(tmp) != before:
+        fail("unchanged upstream rewrote the formula or the lockfile")
+    result = generate(index, tmp, "--diff")
+    if result.returncode != 0:
+        fail(f"--diff exited {result.returncode} with nothing to change:\n{result.stdout}")
+    if "\n+++ " in result.stdout or "\n@@ " in result.stdout:
+        fail(f"--diff printed a diff with nothing to change:\n{result.stdout}")
+    print("  ✓ unchanged : formula and lockfile byte-identical · --diff exits 0")
+
+
+def check_drift(index: StubIndex, tmp: Path, dep: str, entry: dict) -> None:
+    workspace(tmp)
+    before = snapshot(tmp)
+    result = generate(index, tmp, "--diff", "--dry-run")
+    if result.returncode != 1:
+        fail(f"--diff --dry-run exited {result.returncode} with {dep} moved, expected 1")
+    if f'+    url "{entry["url"]}"' not in result.stdout:
+        fail(f"--diff doesn't show the new {dep} url:\n{result.stdout}")
+    if snapshot(tmp) != before:
+        fail("--dry-run wrote the formula or the lockfile")
+    print(f"  ✓ drift     : {dep} moved → --diff --dry-run shows it, exits 1, writes nothing")
+
+
+def check_patch(index: StubIndex, tmp: Path, dep: str, locked: dict, entry: dict) -> None:
+    workspace(tmp)
+    formula, lock = (part.decode() for part in snapshot(tmp))
+    result = generate(index, tmp)
+    if result.returncode:
+        fail(f"run failed:\n{result.stdout}{result.stderr}")
+    new_formula, new_lock = (part.decode() for part in snapshot(tmp))
+
+    block = block_lines(formula, locked["name"])
+    changed = changed_lines(formula, new_formula)
+    if not changed or not changed <= set(block):
+        outside = sorted(changed - set(block))
+        fail(f"lines outside {dep}'s resource block changed: {outside}")
+    patched = "\n".join(new_formula.splitlines()[block.start:block.stop])
+    if f'url "{entry["url"]}"' not in patched or f'sha256 "{entry["sha256"]}"' not in patched:
+        fail(f"{dep}'s block wasn't patched to the new release:\n{patched}")
+
+    old_deps = json.loads(lock)["dependencies"]
+    new_deps = json.loads(new_lock)["dependencies"]
+    moved_deps = [d for d in PYPI_DEPS if old_deps[d] != new_deps[d]]
+    if moved_deps != [dep] or new_deps[dep] != entry:
+        fail(f"lock entries changed: {moved_deps}")
+    diff = [
+        line for line in difflib.unified_diff(lock.splitlines(), new_lock.splitlines(), n=0)
+        if line.startswith(("+", "-")) and not line.startswith(("+++", "---"))
+    ]
+    if len(diff) != 6:  # version, url, sha256: one - and one + each
+        fail(f"lockfile diff touches more than {dep}'s entry:\n" + "\n".join(diff))
+
+    result = generate(index, tmp, "--diff")
+    if result.returncode != 0:
+        fail(f"--diff exited {result.returncode} right after the update")
+    print(f"  ✓ patch     : {dep} {locked['version']} → {entry['version']} rewrote "
+          f"{len(changed)} lines, all in its resource block, and only its lock entry · "
+          "release sha256 kept · --diff exits 0 after")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Formula patch / lockfile check")
+    parser.add_argument("--dep", default="rich", choices=PYPI_DEPS,
+                        help="the dependency that moves upstream (default: rich)")
+    args = parser.parse_args()
+
+    entries = json.loads(LOCK_PATH.read_text())["dependencies"]
+    index = StubIndex(entries, delay=0)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            check_unchanged(index, Path(tmp))
+            entry = moved(entries[args.dep])
+            index.set(args.dep, entry)
+            check_drift(index, Path(tmp), args.dep, entry)
+            check_patch(index, Path(tmp), args.dep, entries[args.dep], entry)
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Check and time generate_formula.py's sdist verification against a local
+HTTP stand-in for files.pythonhosted.org.
+
+Serves a random payload per dependency from 127.0.0.1, then:
+
+  1. verifies every sdist cold — all downloaded, peak Python memory well
+     below the total payload (the download is streamed, not buffered);
+  2. verifies again — nothing downloaded, everything from the cache;
+  3. corrupts one payload — verification fails naming that package and
+     nothing unverified is left in the cache;
+  4. stalls one download halfway until it times out — verification fails
+     naming that package and no partial ``.part`` file is left in the cache.
+
+Usage:
+    python scripts/bench_formula_verify.py
+    python scripts/bench_formula_verify.py --size-mb 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from generate_formula import PYPI_DEPS, PyPIClient, verify_artifacts  # noqa: E402
+
+PAYLOADS: dict[str, bytes] = {}
+STALLED: set[str] = set()  # filenames that stop arriving halfway through
+STALL = 1.0  # seconds; longer than the client timeout in check 4
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        body = PAYLOADS.get(self.path.rsplit("/", 1)[-1])
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.path.rsplit("/", 1)[-1] in STALLED:
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            time.sleep(STALL)
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="sdist verification check")
+    parser.add_argument("--size-mb", type=float, default=4, help="payload per package")
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1e6)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}/files"
+
+    entries: dict[str, dict] = {}
+    for dep in PYPI_DEPS:
+        filename = f"{dep}-1.0.tar.gz"
+        PAYLOADS[filename] = os.urandom(size)
+        entries[dep] = {
+            "name": dep,
+            "version": "1.0",
+            "url": f"{base}/{filename}",
+            "sha256": hashlib.sha256(PAYLOADS[filename]).hexdigest(),
+        }
+    total = size * len(PYPI_DEPS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifacts = Path(tmp)
+
+        # 1. Cold: everything downloaded, streamed.
+        client = PyPIClient(artifact_dir=artifacts)
+        tracemalloc.start()
+        start = time.perf_counter()
+        verify_artifacts(entries, client)
+        cold = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        client.close()
+        if client.downloads != len(PYPI_DEPS):
+            fail(f"expected {len(PYPI_DEPS)} downloads, got {client.downloads}")
+        if peak > total / 4:
+            fail(f"peak memory {peak / 1e6:.1f} MB for {total / 1e6:.1f} MB of sdists")
+        print(f"  ✓ cold   : {total / 1e6:.0f} MB in {cold * 1000:7.1f} ms, "
+              f"peak {peak / 1e6:.2f} MB traced")
+
+        # 2. Warm: all from the content-addressed cache.
+        client = PyPIClient(artifact_dir=artifacts)
+        start = time.perf_counter()
+        verify_artifacts(entries, client)
+        warm = time.perf_counter() - start
+        client.close()
+        if client.downloads or client.requests:
+            fail(f"warm run made {client.requests} request(s)")
+        print(f"  ✓ warm   : {warm * 1000:7.1f} ms, no requests")
+
+        # 3. A tampered artifact is caught and never cached.
+        victim = PYPI_DEPS[-1]
+        filename = entries[victim]["url"].rsplit("/", 1)[-1]
+        original = PAYLOADS[filename]
+        PAYLOADS[filename] = os.urandom(size)
+        fresh = Path(tmp) / "fresh"
+        client = PyPIClient(artifact_dir=fresh)
+        try:
+            verify_artifacts(entries, client)
+        except RuntimeError as exc:
+            if victim not in str(exc) or "sha256 mismatch" not in str(exc):
+                fail(f"unexpected error: {exc}")
+        else:
+            fail("tampered sdist passed verification")
+        finally:
+            client.close()
+        cached = {p.name for p in fresh.rglob("*") if p.is_file()}
+        if entries[victim]["sha256"] in cached or any(n.endswith(".part") for n in cached):
+            fail("unverified data left in the artifact cache")
+        print(f"  ✓ tamper : {victim} rejected, cache clean")
+
+        # 4. A download that dies mid-body leaves nothing behind.
+        PAYLOADS[filename] = original
+        victim = PYPI_DEPS[0]
+        STALLED.add(entries[victim]["url"].rsplit("/", 1)[-1])
+        stalled = Path(tmp) / "stalled"
+        client = PyPIClient(artifact_dir=stalled, timeout=STALL / 4)
+        try:
+            verify_artifacts(entries, client)
+        except RuntimeError as exc:
+            if victim not in str(exc):
+                fail(f"unexpected error: {exc}")
+        else:
+            fail("stalled sdist passed verification")
+        finally:
+            client.close()
+        partial = [p.name for p in stalled.rglob("*.part")]
+        if partial:
+            fail(f"partial download left in the artifact cache: {partial}")
+        print(f"  ✓ stall  : {victim} timed out halfway, rejected, no partial file left")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
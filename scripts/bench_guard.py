@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Check the latency guard, on the stand-in Quartz backend with an injected clock.
+
+The callback times itself with core._perf_counter_ns; this replaces it with a
+clock that advances a set amount per reading, so every callback "takes" as
+long as the script says — no real load needed.  A locked session (with a
+journal) is driven through:
+
+  1. normal — fast callbacks: the guard stays at "normal";
+  2. load   — callbacks at 10, 20, then 45 ms against a 50 ms budget: the
+              guard sheds step by step — live refresh paused, journal
+              records stopped (the journal stops growing), then mouse moves
+              dropped from a recreated tap (moves pass, clicks and keys are
+              still blocked, and the old tap is disabled);
+  3. recover — fast again: every step is restored, one level per sample,
+              and mouse moves are blocked again;
+  4. unlock — the combo still unlocks, and every tap ever created ends up
+              disabled.
+
+Also times LatencyGuard.sample(), which runs off the callback path.
+Fails if any transition, log line or counter is wrong.
+
+Usage:
+    python scripts/bench_guard.py
+    python scripts/bench_guard.py -n 10000 --events 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate import core  # noqa: E402
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.guard import (  # noqa: E402
+    BOOKKEEPING_OFF,
+    DISPLAY_PAUSED,
+    MASK_NARROWED,
+    NORMAL,
+)
+from vegitate.keys import parse_combo  # noqa: E402
+from vegitate.policy import MOUSE_MOVED  # noqa: E402
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+class SlowClock:
+    """perf_counter_ns() stand-in: each reading is *step* ns after the last."""
+
+    def __init__(self) -> None:
+        self.now = time.perf_counter_ns()
+        self.step = 300
+
+    def __call__(self) -> int:
+        self.now += self.step
+        return self.now
+
+
+class FakeDisplay:
+    def __init__(self) -> None:
+        self.paused = False
+        self.steps: list[str] = []
+
+    def pause_refresh(self, paused: bool) -> None:
+        self.paused = paused
+
+    def show_step(self, msg: str) -> None:
+        self.steps.append(msg)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latency guard check")
+    parser.add_argument("-n", type=int, default=1000, help="samples for the sample() timing")
+    parser.add_argument("--events", type=int, default=200,
+                        help="fast click/move pairs per sample in the normal and recover steps")
+    args = parser.parse_args()
+
+    clock = SlowClock()
+    core._perf_counter_ns = clock  # type: ignore[assignment]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A long interval: the script takes every sample itself.
+        vegitate = Vegitate(
+            use_caffeinate=False,
+            stats_path=None,
+            journal_path=Path(tmp) / "journal.bin",
+            guard_budget_ms=50,
+            guard_interval=3600,
+        )
+        display = FakeDisplay()
+        vegitate.display = display  # type: ignore[assignment]
+        vegitate.locked_since = time.time()
+        vegitate._open_journal()
+        vegitate._compile_policy()
+        vegitate._unlock_requested.clear()
+        vegitate._create_event_tap()
+        vegitate._start_guard()
+        guard = vegitate._guard
+        first_tap = vegitate.event_tap
+
+        click = simulate.FakeEvent()
+
+        def traffic(step_ns: int, n: int = args.events) -> None:
+            clock.step = step_ns  # one step between a callback's two readings
+            tap = vegitate.event_tap
+            for _ in range(n):
+                tap.post(simulate.kCGEventLeftMouseDown, click)
+                tap.post(simulate.kCGEventMouseMoved, click)
+
+        def expect(level: int, what: str) -> None:
+            if guard.level != level:
+                fail(f"{what}: level {guard.level}, expected {level} "
+                     f"(estimate {guard.estimate / 1e6:.2f} ms)")
+
+        # 1. Normal.
+        for _ in range(10):
+            traffic(600)
+            guard.sample()
+        expect(NORMAL, "fast callbacks")
+        print(f"  ✓ normal  : estimate {guard.estimate / 1e3:.1f} µs, nothing shed")
+
+        # 2. Load.
+        levels = []
+        for step_ms in (10, 20, 45):
+            for _ in range(12):
+                traffic(step_ms * 1_000_000, n=20)
+                levels.append(guard.sample())
+        expect(MASK_NARROWED, "45 ms callbacks")
+        seen = sorted(set(levels))
+        if seen != [DISPLAY_PAUSED, BOOKKEEPING_OFF, MASK_NARROWED] and seen != [
+            NORMAL, DISPLAY_PAUSED, BOOKKEEPING_OFF, MASK_NARROWED,
+        ]:
+            fail(f"levels went {levels}")
+        if not display.paused:
+            fail("live refresh not paused")
+        seq = vegitate.journal.seq
+        traffic(45_000_000, n=20)
+        if vegitate.journal.seq != seq:
+            fail(f"journal grew by {vegitate.journal.seq - seq} records with bookkeeping off")
+        narrowed = vegitate.event_tap
+        if narrowed is first_tap or (narrowed.mask >> MOUSE_MOVED) & 1:
+            fail("tap wasn't recreated without mouse moves")
+        if first_tap.enabled or not narrowed.enabled:
+            fail("old tap still enabled, or new one not")
+        if narrowed.post(simulate.kCGEventMouseMoved, click) is None:
+            fail("mouse move blocked on the narrowed tap")
+        if narrowed.post(simulate.kCGEventLeftMouseDown, click) is not None:
+            fail("click let through on the narrowed tap")
+        print(f"  ✓ load    : estimate {guard.estimate / 1e6:.1f} ms · shed in "
+              f"{guard.shed} step(s): refresh paused, journal stopped, mouse moves pass")
+
+        # 3. Recover.
+        downs = [guard.level]
+        for _ in range(40):
+            traffic(600)
+            level = guard.sample()
+            if downs[-1] != level:
+                downs.append(level)
+            if level == NORMAL:
+                break
+        expect(NORMAL, "recovered callbacks")
+        if downs != [MASK_NARROWED, BOOKKEEPING_OFF, DISPLAY_PAUSED, NORMAL]:
+            fail(f"restored as {downs}, expected one level at a time")
+        if display.paused:
+            fail("live refresh still paused")
+        restored = vegitate.event_tap
+        if not (restored.mask >> MOUSE_MOVED) & 1 or narrowed.enabled:
+            fail("mouse moves not filtered again after recovery")
+        if restored.post(simulate.kCGEventMouseMoved, click) is not None:
+            fail("mouse move let through after recovery")
+        seq = vegitate.journal.seq
+        traffic(600, n=10)
+        if vegitate.journal.seq != seq + 20:
+            fail("journal didn't resume")
+        if guard.restored != 3:
+            fail(f"{guard.restored} restore transitions, expected 3")
+        logged = [s for s in display.steps if s.startswith("Callback p99")]
+        if len(logged) != guard.shed + guard.restored:
+            fail(f"{len(logged)} transitions logged, {guard.shed + guard.restored} made")
+        print(f"  ✓ recover : restored in {guard.restored} steps · "
+              f"{len(logged)} transitions logged")
+
+        # 4. Unlock.
+        keycode, flags = parse_combo("ctrl+cmd+u")
+        vegitate.event_tap.post(simulate.kCGEventKeyDown, simulate.FakeEvent(keycode, flags))
+        if not vegitate._unlock_requested.is_set():
+            fail("combo didn't unlock")
+        if any(tap.enabled for tap in simulate.taps):
+            fail("a tap is still enabled after unlocking")
+        print(f"  ✓ unlock  : combo works · all {len(simulate.taps)} taps disabled")
+
+        vegitate._stop_guard()
+        start = time.perf_counter()
+        for _ in range(args.n):
+            guard.sample()
+        print(f"  ✓ sample  : {(time.perf_counter() - start) / args.n * 1e6:.1f} µs per sample "
+              "(guard thread, not the callback)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Check and time the session history database.
+
+  1. writes  — years of synthetic sessions submitted through HistoryWriter:
+               the caller only ever queues (submit latency), the writer
+               commits in batches; compared with one commit per session;
+  2. queries — `vegitate history` summaries for the last 30 days and for
+               the whole range, which must be index-only range scans;
+  3. midnight — sessions that run past local midnight (overnight, and one
+               over two days) have their locked time split across the days
+               they cover, never more than a day's worth on one day.
+
+Fails if a 30-day summary takes longer than --budget-ms, if the queries
+stop using the covering index, or if any session is lost.
+
+Usage:
+    python scripts/bench_history.py
+    python scripts/bench_history.py --years 10 --per-day 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate.history import (  # noqa: E402
+    INSERT,
+    UNLOCK_METHODS,
+    HistoryWriter,
+    connect,
+    session_row,
+    summarize,
+)
+from vegitate.stats import CallbackStats  # noqa: E402
+
+DAY = 86400.0
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+def synthetic_rows(years: float, per_day: int, end: float, seed: int = 0) -> list[tuple]:
+    rng = random.Random(seed)
+    stats = CallbackStats()
+    stats.events[10] = 12
+    stats.events[5] = 4000
+    stats.latency[0] = 4012
+    rows = []
+    start = end - years * 365 * DAY
+    for i in range(int(years * 365 * per_day)):
+        started = start + i * DAY / per_day + rng.random() * 60
+        method = rng.choices(UNLOCK_METHODS, weights=(90, 5, 4, 1))[0]
+        rows.append(session_row(started, started + rng.uniform(60, 3600), method, stats))
+    return rows
+
+
+def local(day: dt.date, hour: float = 0.0) -> float:
+    """Unix time of *hour* o'clock, local time, on *day*."""
+    midnight = dt.datetime.combine(day, dt.time()).timestamp()
+    return midnight + hour * 3600
+
+
+def check_midnight(tmp: Path) -> None:
+    d = dt.date(2026, 3, 7)  # the night before US daylight saving starts
+    sessions = [
+        (local(d, 9), local(d, 10), "combo"),                         # within a day
+        (local(d, 22), local(d + dt.timedelta(1), 2), "panic"),       # overnight
+        (local(d + dt.timedelta(3), 12), local(d + dt.timedelta(5), 14), "combo"),  # 2+ days
+    ]
+    stats = CallbackStats()
+    db = connect(tmp / "midnight.db")
+    with db:
+        db.executemany(INSERT, [session_row(a, b, m, stats) for a, b, m in sessions])
+    db.close()
+
+    expected: dict[str, list[float]] = {}
+    for started, ended, method in sessions:
+        day = dt.date.fromtimestamp(started)
+        row = expected.setdefault(day.isoformat(), [0, 0.0, 0])
+        row[0] += 1
+        row[2] += method == "panic"
+        while True:
+            start, end = local(day), local(day + dt.timedelta(1))
+            overlap = min(ended, end) - max(started, start)
+            if overlap <= 0:
+                break
+            expected.setdefault(day.isoformat(), [0, 0.0, 0])[1] += overlap
+            day += dt.timedelta(1)
+
+    summary = summarize(tmp / "midnight.db", local(d), local(d + dt.timedelta(7)))
+    got = {
+        row["day"]: [row["sessions"], row["locked_seconds"], row["panic"]]
+        for row in summary["days"]
+    }
+    if got != expected:
+        fail(f"per-day split wrong:\n    got      {got}\n    expected {expected}")
+    if any(secs > 25 * 3600 for _, secs, _ in got.values()):
+        fail(f"a day shows more than a day locked: {got}")
+    if abs(sum(secs for _, secs, _ in got.values()) - summary["locked_seconds"]) > 1e-6:
+        fail("days don't add up to the total locked time")
+    print(f"  ✓ midnight : overnight and 50 h sessions split over {len(got)} days, "
+          "each day's share only, adding up to the total")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Session history benchmark")
+    parser.add_argument("--years", type=float, default=5, help="years of history")
+    parser.add_argument("--per-day", type=int, default=30, help="sessions per day")
+    parser.add_argument("--budget-ms", type=float, default=10.0, help="30-day summary")
+    args = parser.parse_args()
+
+    now = time.time()
+    rows = synthetic_rows(args.years, args.per_day, now)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 1a. One transaction per session, for comparison.
+        sample = rows[:2000]
+        db = connect(Path(tmp) / "naive.db")
+        start = time.perf_counter()
+        for row in sample:
+            with db:
+                db.execute(INSERT, row)
+        naive = (time.perf_counter() - start) / len(sample)
+        db.close()
+
+        # 1b. Through the writer.
+        path = Path(tmp) / "history.db"
+        writer = HistoryWriter(path)
+        submits = []
+        start = time.perf_counter()
+        for row in rows:
+            t0 = time.perf_counter_ns()
+            writer.submit(row)
+            submits.append(time.perf_counter_ns() - t0)
+        writer.close(timeout=600)
+        batched = (time.perf_counter() - start) / len(rows)
+        if writer.written != len(rows) or writer.failed:
+            fail(f"{writer.written:,} of {len(rows):,} sessions written, {writer.failed} failed")
+        submits.sort()
+        print(f"  ✓ writes   : {len(rows):,} sessions in {writer.transactions:,} transactions · "
+              f"{batched * 1e6:.1f} µs/session vs {naive * 1e6:.1f} µs committing each")
+        print(f"  ✓ submit   : p50 {submits[len(submits) // 2] / 1000:.1f} µs · "
+              f"p99 {submits[int(len(submits) * 0.99)] / 1000:.1f} µs on the caller")
+
+        # 2. Queries.
+        db = sqlite3.connect(path)
+        for query in (
+            "SELECT count(*), sum(ended - started), sum(method = 'panic') "
+            "FROM sessions WHERE started >= ? AND started < ?",
+            "SELECT date(started, 'unixepoch', 'localtime') AS day, count(*) "
+            "FROM sessions WHERE started >= ? AND started < ? GROUP BY day",
+        ):
+            plan = " ".join(r[-1] for r in db.execute(f"EXPLAIN QUERY PLAN {query}", (0, 1)))
+            if "COVERING INDEX sessions_by_start" not in plan:
+                fail(f"query isn't an index-only scan: {plan}")
+        db.close()
+
+        def timed(since: float) -> tuple[float, dict]:
+            times = []
+            for _ in range(5):
+                t0 = time.perf_counter()
+                summary = summarize(path, since, now + 1)
+                times.append(time.perf_counter() - t0)
+            return statistics.median(times) * 1000, summary
+
+        month_ms, month = timed(now - 30 * DAY)
+        all_ms, everything = timed(0)
+        if everything["sessions"] != len(rows):
+            fail(f"summary counts {everything['sessions']:,} sessions, expected {len(rows):,}")
+        print(f"  ✓ 30 days  : {month_ms:7.2f} ms · {month['sessions']:,} sessions, "
+              f"panic rate {month['panic_rate']:.1%}")
+        print(f"  ✓ all time : {all_ms:7.2f} ms · {everything['sessions']:,} sessions "
+              f"over {len(everything['days']):,} days ({path.stat().st_size / 2**20:.1f} MiB)")
+        if month_ms > args.budget_ms:
+            fail(f"30-day summary {month_ms:.2f} ms over budget {args.budget_ms} ms")
+
+        check_midnight(Path(tmp))
+
+
+if __name__ == "__main__":
+    main()
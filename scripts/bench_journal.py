@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Check and time the event journal, on the stand-in Quartz backend.
+
+  1. cost      — the callback with and without the journal, per event;
+  2. alloc     — journaled callbacks leave no Python allocations behind
+                 (tracemalloc), and the journal file never grows;
+  3. audit     — a scripted session (clicks, a wrong combo, panic taps,
+                 the unlock) is summarised with the right counts;
+  4. live read — summaries taken while another thread writes flat out are
+                 always consistent (known kinds only, never more records
+                 than the ring holds);
+  5. threads   — two writers at once, as with split taps, with a tiny switch
+                 interval: every record lands in a slot of its own, none
+                 lost or doubled, and the header counts them all.
+
+Fails if the journal adds more than --budget-ns per event, or any check fails.
+
+Usage:
+    python scripts/bench_journal.py
+    python scripts/bench_journal.py -n 200000 --budget-ns 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.journal import (  # noqa: E402
+    PASSED,
+    SUPPRESSED,
+    Journal,
+    read_journal,
+    summarize,
+)
+from vegitate.keys import KEY_MAP, parse_combo  # noqa: E402
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+def make(journal: Path | None, **kwargs: object) -> Vegitate:
+    vegitate = Vegitate(use_caffeinate=False, stats_path=None, journal_path=journal, **kwargs)
+    vegitate._open_journal()
+    vegitate._compile_policy()
+    return vegitate
+
+
+def per_event_ns(callback, event_type: int, event: simulate.FakeEvent, n: int) -> float:  # noqa: ANN001
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        callback(None, event_type, event, None)
+    return (time.perf_counter_ns() - start) / n
+
+
+def check_cost(tmp: Path, n: int, budget: float) -> None:
+    plain = make(None)
+    journaled = make(tmp / "cost.bin")
+    click = simulate.FakeEvent()
+    base = min(per_event_ns(plain._event_callback, 1, click, n) for _ in range(3))
+    cost = min(per_event_ns(journaled._journaled_callback, 1, click, n) for _ in range(3))
+    overhead = cost - base
+    print(f"  ✓ cost     : {base:6.0f} ns/event plain, {cost:6.0f} ns journaled "
+          f"(+{overhead:.0f} ns)")
+    if overhead > budget:
+        fail(f"journal adds {overhead:.0f} ns per event, budget {budget:g} ns")
+
+
+def check_alloc(tmp: Path, n: int) -> None:
+    path = tmp / "alloc.bin"
+    vegitate = make(path)
+    callback = vegitate._journaled_callback
+    click = simulate.FakeEvent()
+    size = path.stat().st_size
+    for _ in range(1000):  # warm up
+        callback(None, 1, click, None)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(n):
+        callback(None, 1, click, None)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    capacity = vegitate.journal.capacity
+    if path.stat().st_size != size:
+        fail(f"journal grew from {size} to {path.stat().st_size} bytes")
+    if after - before > 1024:
+        fail(f"{after - before} bytes still allocated after {n:,} events")
+    header, records = read_journal(path)
+    # The reader leaves a two-record margin for writes in flight.
+    expected = min(header["seq"], capacity - 2)
+    if len(records) != expected:
+        fail(f"{len(records)} records readable, expected {expected}")
+    print(f"  ✓ alloc    : {after - before:+d} bytes over {n:,} events · "
+          f"file {size / 2**20:.2f} MiB fixed, {header['first']:,} overwritten")
+
+
+def check_audit(tmp: Path) -> None:
+    path = tmp / "audit.bin"
+    vegitate = make(path, passthrough={"events": ["scroll"]})
+    callback = vegitate._journaled_callback
+    vegitate._unlock_requested.clear()
+    vegitate._unlock = vegitate._unlock_requested.set  # type: ignore[method-assign]
+    vegitate._compile_policy()
+
+    def key(combo: str) -> None:
+        keycode, flags = parse_combo(combo) if "+" in combo else (KEY_MAP[combo], 0)
+        callback(None, simulate.kCGEventKeyDown, simulate.FakeEvent(keycode, flags), None)
+
+    for _ in range(100):
+        callback(None, simulate.kCGEventLeftMouseDown, simulate.FakeEvent(), None)
+    for _ in range(7):
+        callback(None, simulate.kCGEventScrollWheel, simulate.FakeEvent(), None)
+    key("ctrl+alt+x")                     # wrong combo
+    key("a")                              # plain typing: not an attempt
+    key("escape")
+    key("escape")                         # two panic taps, not enough
+    key("ctrl+cmd+u")                     # unlock
+
+    summary = summarize(path)
+    expected = {
+        "sessions": 1,
+        "unlocks": 1,
+        "panic_taps": 2,
+        "wrong_combo_attempts": 1,
+        "suppressed_total": 100 + 4 + 1,   # clicks, 4 key-downs, the unlock key
+    }
+    got = {k: summary[k] for k in expected}
+    if got != expected:
+        fail(f"audit summary {got}, expected {expected}")
+    scroll = summary["events"]["scroll_wheel"]
+    if scroll["passed"] != 7 or scroll["suppressed"]:
+        fail(f"scroll_wheel {scroll}, expected 7 passed")
+    print("  ✓ audit    : sessions, unlocks, panic taps, wrong combos and "
+          "per-type counts all match")
+
+
+def check_live_read(tmp: Path, seconds: float) -> None:
+    path = tmp / "live.bin"
+    journal = Journal(path, capacity=1 << 12)
+    stop = threading.Event()
+
+    def writer() -> None:
+        event = journal.event
+        n = 0
+        while not stop.is_set():
+            event(1, n & 1, n & 0xFFFF, n)
+            n += 1
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    reads = 0
+    deadline = time.monotonic() + seconds
+    try:
+        while time.monotonic() < deadline:
+            header, records = read_journal(path)
+            reads += 1
+            if len(records) > header["capacity"]:
+                fail(f"{len(records)} records read from a ring of {header['capacity']}")
+            kinds = {kind for _, kind, _, _, _ in records}
+            if not kinds <= {PASSED, SUPPRESSED}:
+                fail(f"torn read: unexpected record kinds {kinds}")
+            stamps = [ts for *_, ts in records]
+            if stamps != sorted(stamps):
+                fail("torn read: records out of order")
+    finally:
+        stop.set()
+        thread.join()
+    print(f"  ✓ live read: {reads:,} consistent reads during {journal.seq:,} writes")
+
+
+def check_threads(tmp: Path, n: int) -> None:
+    journal = Journal(tmp / "threads.bin", capacity=1 << (2 * n - 1).bit_length())
+    errors: list[BaseException] = []
+
+    def writer(tap: int) -> None:
+        event = journal.event
+        try:
+            for i in range(n):
+                event(tap, 0, 0, tap << 32 | i)
+        except BaseException as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=writer, args=(tap,)) for tap in (1, 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    if errors:
+        fail(f"writer raised {errors[0]!r}")
+    header, records = read_journal(journal.path)
+    stamps = [ts for *_, ts in records]
+    if header["seq"] != 2 * n or sorted(stamps) != sorted(
+        tap << 32 | i for tap in (1, 2) for i in range(n)
+    ):
+        fail(f"{2 * n:,} records from two threads: header says {header['seq']:,}, "
+             f"{len(set(stamps)):,} distinct in the ring")
+    for tap in (1, 2):
+        own = [ts for ts in stamps if ts >> 32 == tap]
+        if own != sorted(own):
+            fail(f"thread {tap}'s records out of order")
+    print(f"  ✓ threads  : 2 × {n:,} concurrent writes, each in its own slot, in order")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Event journal check")
+    parser.add_argument("-n", type=int, default=300_000, help="events per measurement")
+    parser.add_argument(
+        "--budget-ns", type=float, default=1000.0, help="journal cost per event",
+    )
+    parser.add_argument("--seconds", type=float, default=1.0, help="live-read duration")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        check_cost(Path(tmp), args.n, args.budget_ns)
+        check_alloc(Path(tmp), args.n)
+        check_audit(Path(tmp))
+        check_live_read(Path(tmp), args.seconds)
+        check_threads(Path(tmp), min(args.n, 100_000))
+
+
+if __name__ == "__main__":
+    main()
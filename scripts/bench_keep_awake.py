@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Check and time the keep-awake backends (vegitate.awake).
+
+  1. cycle     — -n lock/unlock cycles per backend through the session's own
+                 _start_keep_awake / _stop_keep_awake: median and p99 time,
+                 and the backend is active exactly while "locked".  fake and
+                 caffeinate always run; assertion only on macOS (skipped,
+                 with a note, elsewhere);
+  2. supervise — the caffeinate child is killed mid-session: it's replaced,
+                 counted, reported through the session's lock screen and
+                 metrics, and after unlock no child is left running;
+  3. backoff   — a caffeinate that exits as soon as it starts is retried at
+                 most once per backoff period, not in a fork loop;
+  4. errors    — an unknown backend, or one that can't start, leaves the
+                 session locking without keep-awake instead of failing.
+
+Without a caffeinate binary (Linux) a stand-in that just waits is put on
+PATH.
+
+Usage:
+    python scripts/bench_keep_awake.py
+    python scripts/bench_keep_awake.py -n 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import signal
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate import awake  # noqa: E402
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.metrics import render  # noqa: E402
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+def fake_caffeinate(tmp: Path) -> None:
+    """Put a stand-in `caffeinate` (it just waits to be killed) on PATH."""
+    script = tmp / "caffeinate"
+    script.write_text("#!/bin/sh\nexec tail -f /dev/null\n")
+    script.chmod(0o755)
+    os.environ["PATH"] = f"{tmp}{os.pathsep}{os.environ['PATH']}"
+
+
+class FakeDisplay:
+    def __init__(self) -> None:
+        self.steps: list[str] = []
+
+    def show_step(self, msg: str) -> None:
+        self.steps.append(msg)
+
+
+def session(keep_awake: str) -> Vegitate:
+    vegitate = Vegitate(use_caffeinate=True, keep_awake=keep_awake, stats_path=None)
+    vegitate.display = FakeDisplay()  # type: ignore[assignment]
+    return vegitate
+
+
+def wait_for(condition, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def check_cycle(name: str, n: int) -> None:
+    vegitate = session(name)
+    times = []
+    for _ in range(n):
+        start = time.perf_counter_ns()
+        vegitate._start_keep_awake()
+        if not vegitate.keep_awake_active:
+            fail(f"{name}: not active after lock ({vegitate._awake_error})")
+        vegitate._stop_keep_awake()
+        times.append(time.perf_counter_ns() - start)
+        if vegitate.keep_awake_active:
+            fail(f"{name}: still active after unlock")
+    times.sort()
+    p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+    print(f"  ✓ cycle     : {name:<10} median {statistics.median(times) / 1e3:9.1f} µs · "
+          f"p99 {p99 / 1e3:9.1f} µs  ({n} lock/unlock cycles)")
+
+
+def check_supervise() -> None:
+    vegitate = session("caffeinate")
+    vegitate._start_keep_awake()
+    backend = vegitate._awake
+    first = backend.proc
+    # Past the restart backoff, so the replacement comes straight away.
+    time.sleep(awake._RESTART_BACKOFF + 0.1)
+    os.kill(first.pid, signal.SIGKILL)
+    if not wait_for(lambda: backend.restarts == 1 and vegitate.keep_awake_active, 2.0):
+        fail(f"killed child not replaced (restarts {backend.restarts})")
+    second = backend.proc
+    if second is first:
+        fail("the dead child is still the one being watched")
+    if not any("restarted" in s for s in vegitate.display.steps):
+        fail(f"restart not reported on the lock screen: {vegitate.display.steps}")
+    if "vegitate_keep_awake_restarts_total 1" not in render(vegitate):
+        fail("restart not counted in the metrics")
+
+    vegitate._stop_keep_awake()
+    time.sleep(awake._RESTART_BACKOFF + 0.2)
+    if vegitate.keep_awake_active or backend.proc is not None:
+        fail("a caffeinate child was started after unlock")
+    if second.poll() is None or alive(second.pid):
+        fail(f"caffeinate child {second.pid} left running after unlock")
+    if backend.restarts != 1:
+        fail(f"{backend.restarts} restarts, expected 1")
+    print(f"  ✓ supervise : killed pid {first.pid} replaced by {second.pid}, reported and "
+          "counted · nothing left after unlock")
+
+
+def check_backoff(seconds: float) -> None:
+    backend = awake.CaffeinateBackend(command=("false",))
+    backend.start()
+    time.sleep(seconds)
+    restarts = backend.restarts
+    backend.stop()
+    allowed = int(seconds / awake._RESTART_BACKOFF) + 1
+    if restarts > allowed:
+        fail(f"a failing caffeinate was restarted {restarts} times in {seconds:.1f} s")
+    if backend.active:
+        fail("still active after stop")
+    print(f"  ✓ backoff   : a failing caffeinate restarted {restarts} times in {seconds:.1f} s "
+          f"(at most {allowed})")
+
+
+def check_errors() -> None:
+    vegitate = session("bogus")
+    vegitate._start_keep_awake()
+    if vegitate.keep_awake_active or not vegitate._awake_error:
+        fail("an unknown backend didn't report an error")
+    vegitate._stop_keep_awake()
+
+    vegitate = session("caffeinate")
+    path = os.environ["PATH"]
+    os.environ["PATH"] = ""
+    try:
+        vegitate._start_keep_awake()
+    finally:
+        os.environ["PATH"] = path
+    if vegitate.keep_awake_active or not vegitate._awake_error:
+        fail("a missing caffeinate didn't report an error")
+    vegitate._stop_keep_awake()
+
+    vegitate = Vegitate(use_caffeinate=False, keep_awake="fake", stats_path=None)
+    vegitate._start_keep_awake()
+    if vegitate._awake is not None:
+        fail("a backend was opened with keep-awake off")
+    print("  ✓ errors    : unknown backend and missing caffeinate reported, session goes on")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Keep-awake backend check")
+    parser.add_argument("-n", type=int, default=200, help="lock/unlock cycles per backend")
+    parser.add_argument("--backoff-seconds", type=float, default=2.5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if shutil.which("caffeinate") is None:
+            fake_caffeinate(Path(tmp))
+
+        check_cycle("fake", args.n)
+        check_cycle("caffeinate", args.n)
+        if sys.platform == "darwin":
+            check_cycle("assertion", args.n)
+        else:
+            print("  - cycle     : assertion  skipped (IOKit is macOS only)")
+        check_supervise()
+        check_backoff(args.backoff_seconds)
+        check_errors()
+
+
+if __name__ == "__main__":
+    main()
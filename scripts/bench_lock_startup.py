@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Time-to-locked for `vegitate` on the stand-in Quartz backend, by phase.
+
+Each run is a fresh interpreter going through the real CLI with --timings
+(argument parsing, config, lazy imports, banner, tap creation, lock
+screen).  Once the lock screen is up the run unlocks itself with the
+combo, and the phases it prints are read back and shifted to be relative
+to spawn.  Medians over -n runs.
+
+With --history FILE, each result is appended to FILE as a JSON line
+(version, date, phases) and compared with the previous entry, so the
+numbers can be tracked across releases.
+
+Fails if the median spawn → tap enabled time is over --budget-ms.
+
+Usage:
+    python scripts/bench_lock_startup.py
+    python scripts/bench_lock_startup.py -n 10 --history bench-startup.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+
+# Runs in the child: the real CLI with --timings, unlocked with the default
+# combo once the lock screen is up.  MAIN marks when cli.main() is entered.
+CHILD = """\
+import sys, threading, time
+from vegitate import simulate
+simulate.install()
+from vegitate import cli
+from vegitate.keys import parse_sequence
+
+def unlock_after_lock_screen():
+    while not simulate.taps:
+        time.sleep(0.002)
+    time.sleep(1.0)  # past the 0.6 s pause, so the lock screen is up
+    tap = next(t for t in simulate.taps if (t.mask >> simulate.kCGEventKeyDown) & 1)
+    for keycode, flags in parse_sequence("ctrl+cmd+u"):
+        tap.enqueue(simulate.kCGEventKeyDown, simulate.FakeEvent(keycode, flags))
+
+threading.Thread(target=unlock_after_lock_screen, daemon=True).start()
+sys.argv = ["vegitate", "--no-caffeinate", "--timings",
+            "--stats-file", sys.argv[1], "--journal-file", sys.argv[2],
+            "--history-file", sys.argv[3]]
+print(f"MAIN {time.time()}", flush=True)
+cli.main()
+"""
+
+TIMING_LINE = re.compile(r"^\s+([\d.]+) ms  (.+?)\s*$")
+
+
+def one_run(tmp: Path) -> dict[str, float]:
+    """Phase → ms since spawn, for one cold start."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    # An empty config dir, so a developer's own config doesn't skew the run.
+    env["XDG_CONFIG_HOME"] = str(tmp)
+    env["COLUMNS"] = "100"
+    spawned = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, str(tmp / "stats.json"), str(tmp / "journal.bin"),
+         str(tmp / "history.db")],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=30,
+    )
+    lines = proc.stdout.splitlines()
+    offset = (float(lines[0].split()[1]) - spawned) * 1000
+    phases = {"cli.main() entered": offset}
+    in_table = False
+    for line in lines:
+        if "Startup (time since launch)" in line:
+            in_table = True
+        elif in_table and (m := TIMING_LINE.match(line)):
+            phases[m[2]] = offset + float(m[1])
+    return phases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lock startup benchmark")
+    parser.add_argument("-n", type=int, default=5, help="cold starts (median is reported)")
+    parser.add_argument(
+        "--budget-ms", type=float, default=150.0, help="spawn → tap enabled budget",
+    )
+    parser.add_argument(
+        "--history", type=Path, default=None, metavar="FILE",
+        help="append results to FILE (JSON lines) and compare with the last entry",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [one_run(Path(tmp)) for _ in range(args.n)]
+    phases = {
+        phase: statistics.median(run[phase] for run in runs if phase in run)
+        for phase in sorted(runs[0], key=runs[0].get)
+    }
+
+    previous: dict[str, float] = {}
+    if args.history is not None and args.history.exists():
+        lines = args.history.read_text().splitlines()
+        if lines:
+            previous = json.loads(lines[-1])["phases_ms"]
+
+    print(f"  {'phase':<22} {'ms since spawn':>14}" + ("   vs last" if previous else ""))
+    for phase, ms in phases.items():
+        delta = ""
+        if phase in previous:
+            delta = f"   {ms - previous[phase]:+8.1f}"
+        print(f"  {phase:<22} {ms:>14.1f}{delta}")
+
+    if args.history is not None:
+        sys.path.insert(0, str(SRC))
+        from vegitate import __version__
+
+        entry = {
+            "version": __version__,
+            "date": time.strftime("%Y-%m-%d"),
+            "python": platform.python_version(),
+            "runs": args.n,
+            "phases_ms": {phase: round(ms, 2) for phase, ms in phases.items()},
+        }
+        with args.history.open("a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    tap = phases["tap enabled"]
+    if tap > args.budget_ms:
+        print(f"  ✗ spawn → tap enabled {tap:.1f} ms over budget {args.budget_ms} ms")
+        sys.exit(1)
+    print(f"  ✓ tap enabled {tap:.1f} ms after spawn (budget {args.budget_ms:g} ms)")
+
+
+if __name__ == "__main__":
+    main()
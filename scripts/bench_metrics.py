@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Check and time the node-exporter metrics export, on the stand-in Quartz backend.
+
+  1. content — a scripted session (blocked clicks, passthrough scrolls,
+               keys, tap re-enables) is exported with the right values;
+  2. atomic  — a reader polling the file while the exporter rewrites it
+               flat out never sees a partial file: every read parses and
+               ends with "# EOF";
+  3. cost    — the callback with the exporter running at a short interval
+               vs without it, per event.
+
+Fails if any read is partial or wrong, or if exporting slows the callback
+by more than --budget-pct.
+
+Usage:
+    python scripts/bench_metrics.py
+    python scripts/bench_metrics.py -n 500000 --seconds 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.keys import KEY_MAP  # noqa: E402
+from vegitate.metrics import MetricsExporter  # noqa: E402
+
+SAMPLE = re.compile(r"^([a-z_]+)(\{[a-z]+=\"[^\"]*\"\})? (\S+)$")
+
+TAP_DISABLED_BY_TIMEOUT = 0xFFFFFFFE
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+def parse(text: str) -> dict[str, float]:
+    """Samples by name+labels; fails on anything that isn't well-formed."""
+    lines = text.split("\n")
+    if lines[-2:] != ["# EOF", ""]:
+        fail(f"export doesn't end with '# EOF': {text[-40:]!r}")
+    samples = {}
+    declared = set()
+    for line in lines[:-2]:
+        if line.startswith("# TYPE "):
+            declared.add(line.split()[2])
+            continue
+        if line.startswith("# HELP "):
+            continue
+        match = SAMPLE.match(line)
+        if match is None:
+            fail(f"malformed line {line!r}")
+        name, labels, value = match.groups()
+        if name not in declared:
+            fail(f"sample {name} has no TYPE line")
+        samples[name + (labels or "")] = float(value)
+    return samples
+
+
+def locked_session(**kwargs: object) -> Vegitate:
+    vegitate = Vegitate(use_caffeinate=False, stats_path=None, **kwargs)
+    vegitate.locked_since = time.time() - 42
+    vegitate._unlock_requested.clear()
+    vegitate._compile_policy()
+    return vegitate
+
+
+def check_content(tmp: Path) -> None:
+    path = tmp / "content.prom"
+    vegitate = locked_session(passthrough={"events": ["scroll"], "keys": ["volume_up"]})
+    callback = vegitate._event_callback
+    for _ in range(100):
+        callback(None, simulate.kCGEventLeftMouseDown, simulate.FakeEvent(), None)
+    for _ in range(7):
+        callback(None, simulate.kCGEventScrollWheel, simulate.FakeEvent(), None)
+    for key in ("a", "volume_up", "volume_up"):
+        callback(None, simulate.kCGEventKeyDown, simulate.FakeEvent(KEY_MAP[key]), None)
+    callback(None, TAP_DISABLED_BY_TIMEOUT, simulate.FakeEvent(), None)
+
+    exporter = MetricsExporter(vegitate, path)
+    exporter.write()
+    samples = parse(path.read_text())
+    expected = {
+        "vegitate_locked": 1,
+        "vegitate_caffeinate_running": 0,
+        "vegitate_keep_awake_restarts_total": 0,
+        'vegitate_events_suppressed_total{type="left_mouse_down"}': 100,
+        'vegitate_events_suppressed_total{type="key_down"}': 1,
+        'vegitate_events_passed_total{type="scroll_wheel"}': 7,
+        'vegitate_events_passed_total{type="key_down"}': 2,
+        'vegitate_tap_reenabled_total{reason="timeout"}': 1,
+        'vegitate_tap_reenabled_total{reason="user"}': 0,
+    }
+    got = {k: samples.get(k) for k in expected}
+    if got != expected:
+        fail(f"exported {got}, expected {expected}")
+    if 'vegitate_events_suppressed_total{type="scroll_wheel"}' in samples:
+        fail("passthrough scrolls were exported as suppressed")
+    uptime = samples["vegitate_session_uptime_seconds"]
+    if not 42 <= uptime < 60:
+        fail(f"session uptime {uptime}, expected ~42 s")
+    for q in ("0.5", "0.99", "0.999"):
+        if not samples.get(f'vegitate_callback_latency_seconds{{quantile="{q}"}}'):
+            fail(f"no callback latency quantile {q}")
+
+    vegitate._unlock()
+    vegitate.locked_since = None
+    exporter.write()
+    samples = parse(path.read_text())
+    if samples["vegitate_locked"] or samples["vegitate_session_uptime_seconds"]:
+        fail("an unlocked session still exports as locked")
+    print(f"  ✓ content : {len(samples)} samples · counts, quantiles, uptime and "
+          "lock state all match")
+
+
+def check_atomic(tmp: Path, seconds: float) -> None:
+    path = tmp / "atomic.prom"
+    vegitate = locked_session()
+    exporter = MetricsExporter(vegitate, path, interval=0)
+    exporter.start()
+    while not path.exists():
+        time.sleep(0.001)
+
+    reads = 0
+    deadline = time.monotonic() + seconds
+    try:
+        while time.monotonic() < deadline:
+            parse(path.read_text())
+            reads += 1
+    finally:
+        exporter.stop()
+    leftovers = [p.name for p in tmp.iterdir() if p.name.startswith("atomic.prom.")]
+    if leftovers:
+        fail(f"temporary files left behind: {leftovers}")
+    if exporter.failed:
+        fail(f"{exporter.failed} writes failed")
+    print(f"  ✓ atomic  : {reads:,} reads during {exporter.written:,} rewrites, "
+          "none partial")
+
+
+def per_event_ns(callback, n: int) -> float:  # noqa: ANN001
+    click = simulate.FakeEvent()
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        callback(None, 1, click, None)
+    return (time.perf_counter_ns() - start) / n
+
+
+def check_cost(tmp: Path, n: int, interval: float, budget_pct: float) -> None:
+    vegitate = locked_session()
+    callback = vegitate._event_callback
+    base = min(per_event_ns(callback, n) for _ in range(5))
+
+    exporter = MetricsExporter(vegitate, tmp / "cost.prom", interval=interval)
+    exporter.start()
+    try:
+        exported = min(per_event_ns(callback, n) for _ in range(5))
+    finally:
+        exporter.stop()
+    overhead = (exported - base) / base * 100
+    print(f"  ✓ cost    : {base:6.0f} ns/event alone, {exported:6.0f} ns while exporting "
+          f"every {interval * 1000:g} ms ({overhead:+.1f}%, {exporter.written} writes)")
+    if overhead > budget_pct:
+        fail(f"exporting slows the callback by {overhead:.1f}%, budget {budget_pct:g}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Metrics export check")
+    parser.add_argument("-n", type=int, default=300_000, help="events per measurement")
+    parser.add_argument("--seconds", type=float, default=1.0, help="atomicity check duration")
+    parser.add_argument(
+        "--interval", type=float, default=0.01, help="export interval for the cost check",
+    )
+    parser.add_argument("--budget-pct", type=float, default=10.0, help="callback slowdown")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        check_content(Path(tmp))
+        check_atomic(Path(tmp), args.seconds)
+        check_cost(Path(tmp), args.n, args.interval, args.budget_pct)
+
+
+if __name__ == "__main__":
+    main()
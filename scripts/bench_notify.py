@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Check the notification worker (vegitate.notify) against a stub osascript.
+
+A stand-in `osascript` that appends whatever it reads on stdin to a file is
+put first on PATH, so this runs anywhere and sees exactly what the real one
+would be sent:
+
+  1. deliver   — separate notifications all reach the one child, one
+                 statement per line, with no new process after the first;
+  2. coalesce  — a burst is posted as its newest message only;
+  3. pressure  — a full queue drops its oldest messages, and messages that
+                 waited past max_age are dropped as stale;
+  4. quoting   — quotes, backslashes, newlines, control characters and
+                 AppleScript injected into the text all come out as exactly
+                 the one string literal, decoding back to the text;
+  5. recover   — a dead child is replaced on the next message; a command
+                 that can't be run turns the notifier off without raising;
+  6. block     — with a child that never reads, send() stays fast and
+                 close() returns on time;
+  7. session   — Vegitate's lock/unlock notifications go through it, and
+                 send() is timed against spawning a process per message.
+
+Usage:
+    python scripts/bench_notify.py
+    python scripts/bench_notify.py -n 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.notify import Notifier, notification_script  # noqa: E402
+
+# One statement: display notification "<literal>" with title "<literal>".
+LITERAL = r'"((?:[^"\\\n]|\\[\\"nrt])*)"'
+STATEMENT = re.compile(rf"^display notification {LITERAL} with title {LITERAL}$")
+UNESCAPE = {"\\": "\\", '"': '"', "n": "\n", "r": "\r", "t": "\t"}
+
+NASTY = [
+    'plain',
+    'say "hi"',
+    'back\\slash at the end\\',
+    '\\"',
+    'two\nlines\r\nand\ttabs',
+    'bell\x07 nul\x00 esc\x1b del\x7f',
+    'line\u2028separator, paragraph\u2029separator',
+    '" & (do shell script "touch /tmp/pwned") & "',
+    '"\ndisplay dialog "injected',
+    'ünïcødé ✓ 🔒',
+    '',
+]
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+def stub_osascript(tmp: Path) -> Path:
+    """Put a recording `osascript` on PATH; returns the file it appends to."""
+    log = tmp / "received.txt"
+    script = tmp / "osascript"
+    script.write_text(f'#!/bin/sh\nexec cat >> "{log}"\n')
+    script.chmod(0o755)
+    os.environ["PATH"] = f"{tmp}{os.pathsep}{os.environ['PATH']}"
+    return log
+
+
+def received(log: Path, count: int, timeout: float = 3.0) -> list[str]:
+    """The first *count* lines the stub got, once it has them."""
+    deadline = time.monotonic() + timeout
+    while True:
+        lines = log.read_text(encoding="utf-8").splitlines() if log.exists() else []
+        if len(lines) >= count or time.monotonic() > deadline:
+            return lines
+        time.sleep(0.005)
+
+
+def expect(text: str) -> str:
+    """*text* as it should arrive: other control characters left out."""
+    text = text.replace("\u2028", " ").replace("\u2029", " ")
+    return "".join(c for c in text if c in "\n\r\t" or (c >= " " and c != "\x7f"))
+
+
+def decode(literal: str) -> str:
+    return re.sub(r"\\(.)", lambda m: UNESCAPE[m.group(1)], literal)
+
+
+def check_deliver(log: Path) -> None:
+    log.unlink(missing_ok=True)
+    notifier = Notifier(linger=0)
+    for i in range(5):
+        notifier.send("Vegitate", f"message {i}")
+        if len(received(log, i + 1)) != i + 1:
+            fail(f"message {i} not delivered")
+    notifier.close()
+    lines = received(log, 5)
+    if lines != [notification_script("Vegitate", f"message {i}") for i in range(5)]:
+        fail(f"stub got {lines}")
+    if notifier.spawned != 1 or notifier.sent != 5:
+        fail(f"{notifier.spawned} children for {notifier.sent} notifications, expected 1")
+    print("  ✓ deliver  : 5 notifications, one per line, through 1 child")
+
+
+def check_coalesce(log: Path) -> None:
+    log.unlink(missing_ok=True)
+    notifier = Notifier(linger=0.2, maxsize=64)
+    for i in range(50):
+        notifier.send("Vegitate", f"burst {i}")
+    notifier.close()
+    lines = received(log, 1)
+    if lines != [notification_script("Vegitate", "burst 49")]:
+        fail(f"burst posted as {lines}")
+    if notifier.coalesced != 49:
+        fail(f"{notifier.coalesced} coalesced, expected 49")
+    print("  ✓ coalesce : 50 sends in a burst → 1 notification, the newest")
+
+
+def check_pressure(log: Path) -> None:
+    log.unlink(missing_ok=True)
+    notifier = Notifier(linger=0.2, maxsize=4)
+    for i in range(10):
+        notifier.send("Vegitate", f"queued {i}")
+    notifier.close()
+    lines = received(log, 1)
+    if lines != [notification_script("Vegitate", "queued 9")]:
+        fail(f"posted {lines} from a full queue")
+    if (notifier.dropped, notifier.coalesced, notifier.sent) != (6, 3, 1):
+        fail(f"dropped {notifier.dropped}, coalesced {notifier.coalesced}, "
+             f"sent {notifier.sent}; expected 6, 3, 1")
+
+    log.unlink(missing_ok=True)
+    notifier = Notifier(linger=0.2, max_age=0.05)
+    notifier.send("Vegitate", "too late")
+    time.sleep(0.4)
+    notifier.close()
+    if notifier.stale != 1 or notifier.sent or received(log, 1, timeout=0.2):
+        fail(f"stale message posted (stale {notifier.stale}, sent {notifier.sent})")
+    print("  ✓ pressure : full queue keeps the newest 4 of 10 · a stale message is dropped")
+
+
+def check_quoting(log: Path) -> None:
+    log.unlink(missing_ok=True)
+    notifier = Notifier(linger=0)
+    for i, text in enumerate(NASTY):
+        notifier.send(f"title {text}", text)
+        received(log, i + 1)
+    notifier.close()
+    lines = received(log, len(NASTY))
+    if len(lines) != len(NASTY):
+        fail(f"{len(NASTY)} notifications became {len(lines)} lines")
+    for text, line in zip(NASTY, lines):
+        match = STATEMENT.match(line)
+        if match is None:
+            fail(f"{text!r} sent as a malformed statement: {line}")
+        expected = expect(text)
+        message, title = decode(match.group(1)), decode(match.group(2))
+        if message != expected or title != f"title {expected}":
+            fail(f"{text!r} came back as {message!r} / {title!r}")
+    print(f"  ✓ quoting  : {len(NASTY)} hostile messages, each one statement that "
+          "decodes back to its text")
+
+
+def check_recover(log: Path, tmp: Path) -> None:
+    log.unlink(missing_ok=True)
+    notifier = Notifier(linger=0)
+    notifier.send("Vegitate", "first")
+    received(log, 1)
+    notifier._proc.kill()  # type: ignore[union-attr]
+    notifier._proc.wait()  # type: ignore[union-attr]
+    notifier.send("Vegitate", "second")
+    notifier.close()
+    lines = received(log, 2)
+    if lines[-1:] != [notification_script("Vegitate", "second")] or notifier.spawned != 2:
+        fail(f"after the child died: {lines}, {notifier.spawned} children")
+
+    missing = Notifier(command=(str(tmp / "no-such-osascript"), "-i"), linger=0)
+    missing.send("Vegitate", "nowhere")
+    time.sleep(0.1)
+    missing.send("Vegitate", "still nowhere")
+    missing.close()
+    if missing.failed != 1 or missing.sent or missing.dropped != 1:
+        fail(f"missing command: failed {missing.failed}, sent {missing.sent}, "
+             f"dropped {missing.dropped}")
+    print("  ✓ recover  : dead child replaced · missing command turns it off quietly")
+
+
+def check_block(n: int) -> None:
+    # A child that never reads, and messages bigger than a pipe buffer: the
+    # worker is stuck writing the first one, the callers aren't.
+    notifier = Notifier(command=("sleep", "2"), linger=0)
+    messages = [f"{i} " + "x" * 100_000 for i in range(min(n, 200))]
+    worst = 0
+    for i in range(n):
+        message = messages[i % len(messages)]
+        start = time.perf_counter_ns()
+        notifier.send("Vegitate", message)
+        worst = max(worst, time.perf_counter_ns() - start)
+    start = time.monotonic()
+    notifier.close(timeout=0.5)
+    closed = time.monotonic() - start
+    if worst > 50_000_000:
+        fail(f"send() took {worst / 1e6:.1f} ms with the child not reading")
+    if closed > 1.0:
+        fail(f"close() took {closed:.2f} s with the child not reading")
+    print(f"  ✓ block    : {n:,} sends to a child that never reads, worst "
+          f"{worst / 1e3:.0f} µs · close() in {closed:.2f} s")
+
+
+def check_session(log: Path, n: int) -> None:
+    log.unlink(missing_ok=True)
+    vegitate = Vegitate(use_caffeinate=False, stats_path=None)
+    vegitate._notify("Vegitate", "Input locked")
+    vegitate._notify("Vegitate", "Input unlocked")
+    vegitate._close_notifier()
+    lines = received(log, 1)
+    if lines != [notification_script("Vegitate", "Input unlocked")]:
+        fail(f"session notifications posted as {lines}")
+
+    notifier = Notifier(maxsize=8)
+    times = []
+    for _ in range(n):
+        start = time.perf_counter_ns()
+        notifier.send("Vegitate", "Input locked")
+        times.append(time.perf_counter_ns() - start)
+    notifier.close()
+    times.sort()
+    spawn = []
+    for _ in range(20):
+        start = time.perf_counter_ns()
+        subprocess.Popen(["true"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).wait()
+        spawn.append(time.perf_counter_ns() - start)
+    spawn.sort()
+    print(f"  ✓ session  : lock + unlock → 1 notification · send() p50 "
+          f"{times[n // 2] / 1e3:.1f} µs, p99 {times[int(n * 0.99)] / 1e3:.1f} µs "
+          f"(a process per message: {spawn[10] / 1e3:.0f} µs)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Notification worker check")
+    parser.add_argument("-n", type=int, default=5000, help="sends for the timing checks")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = stub_osascript(Path(tmp))
+        check_deliver(log)
+        check_coalesce(log)
+        check_pressure(log)
+        check_quoting(log)
+        check_recover(log, Path(tmp))
+        check_block(args.n)
+        check_session(log, args.n)
+
+
+if __name__ == "__main__":
+    main()
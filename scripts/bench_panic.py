@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Check the panic reset's rate detectors by replaying timestamped key-downs.
+
+Every sequence goes through the real tap callback (stand-in Quartz backend),
+with the times carried by the events, as CGEventGetTimestamp reports them:
+
+  1. scripted — bursts inside and outside the window, a burst completed by
+                a sliding window, other keys in between, several panic keys
+                at once, and an alternating pattern done right and wrong;
+  2. timebase — with a non-1:1 timebase (Apple Silicon's 125/3: ~41.67 ns
+                ticks) the window is still the configured number of seconds;
+  3. jumps    — the wall clock (time.time) jumping hours either way between
+                presses changes nothing; event timestamps going backwards
+                forget the earlier presses instead of firing on them, and a
+                long gap (sleep) doesn't count towards a burst;
+  4. random   — --sequences random streams (with backward jumps) give the
+                same resets as a plain list-based model of the rules;
+  5. cost     — a panic-key press costs the same with 1 or --patterns
+                patterns configured, and allocates nothing.
+
+Usage:
+    python scripts/bench_panic.py
+    python scripts/bench_panic.py --sequences 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate import bursts  # noqa: E402
+from vegitate.bursts import parse_pattern  # noqa: E402
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.keys import KEY_MAP  # noqa: E402
+
+MS = 1_000_000
+S = 1_000_000_000
+ESC, F1, F2, F12, A = (KEY_MAP[k] for k in ("escape", "f1", "f2", "f12", "a"))
+
+# (keycode, timestamp in ns)
+Press = tuple[int, int]
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+class Session:
+    """A compiled callback that records which presses tripped the reset."""
+
+    def __init__(self, panic_key: str | list[str], taps: int = 5, window: float = 2.0) -> None:
+        self.vegitate = Vegitate(
+            use_caffeinate=False, stats_path=None,
+            panic_key=panic_key, panic_taps=taps, panic_window=window,
+        )
+        self.fired: list[int] = []
+        self._index = 0
+        self.vegitate._unlock_by_panic = lambda: self.fired.append(self._index)  # type: ignore[method-assign]
+        self.vegitate._compile_policy()
+        self.callback = self.vegitate._event_callback
+
+    def replay(self, presses: list[Press]) -> list[int]:
+        """Indexes of the presses that tripped the reset."""
+        self.fired.clear()
+        for i, (keycode, timestamp) in enumerate(presses):
+            self._index = i
+            self.callback(None, simulate.kCGEventKeyDown, simulate.FakeEvent(keycode, 0, timestamp), None)
+        return list(self.fired)
+
+
+def every(keys: list[int], gap_ms: int, start: int = 10 * S) -> list[Press]:
+    return [(k, start + i * gap_ms * MS) for i, k in enumerate(keys)]
+
+
+def check(name: str, session: Session, presses: list[Press], expected: list[int]) -> None:
+    got = session.replay(presses)
+    if got != expected:
+        fail(f"{name}: reset on presses {got}, expected {expected}")
+
+
+def check_scripted() -> None:
+    esc = Session("escape")
+    check("5 in 1.2 s", esc, every([ESC] * 5, 300), [4])
+    check("5 in 2.4 s", esc, every([ESC] * 5, 600), [])
+    check("exactly the window", esc, every([ESC] * 5, 500), [4])
+    # 0, 1.9 s, then 4 quick ones from 2 s: the first five span 2.3 s, the
+    # last five 0.5 s.
+    check("sliding window", esc,
+          [(ESC, 10 * S), (ESC, 11_900 * MS)] + every([ESC] * 4, 100, 12 * S), [5])
+    check("other keys between", esc, every([ESC, A, ESC, A, ESC, ESC, A, ESC], 100), [7])
+    check("ten in a row", esc, every([ESC] * 10, 100), [4, 9])
+
+    several = Session(["escape", "f12"])
+    check("mixed keys", several, every([ESC, F12] * 4, 100), [])
+    check("either key", several, every([ESC, F12, F12, F12, F12, F12], 100), [5])
+
+    alternating = Session("f1 f2")
+    check("alternating", alternating, every([F1, F2, F1, F2, F1], 100), [4])
+    check("out of turn", alternating, every([F1, F2, F2, F1, F2, F1, F2], 100), [])
+    check("restart on first key", alternating, every([F1, F2, F1, F1, F2, F1, F2, F1], 100), [7])
+
+    off = Session("escape", taps=0)
+    check("disabled", off, every([ESC] * 20, 10), [])
+    print("  ✓ scripted : inside/outside the window, sliding, several keys, alternating")
+
+
+def check_timebase() -> None:
+    saved = bursts._timebase
+    bursts._timebase = (125, 3)  # Apple Silicon: 1 tick = 125/3 ns
+    try:
+        esc = Session("escape")
+        [(detector,)] = esc.vegitate._panic_table.values()
+        if detector.window != 2 * S * 3 // 125:
+            fail(f"2 s window is {detector.window} ticks, expected {2 * S * 3 // 125}")
+
+        def ticks(presses: list[Press]) -> list[Press]:
+            return [(k, ts * 3 // 125) for k, ts in presses]
+
+        check("ticks: 5 in 1.2 s", esc, ticks(every([ESC] * 5, 300)), [4])
+        check("ticks: 5 in 2.4 s", esc, ticks(every([ESC] * 5, 600)), [])
+        # Unconverted, a 2 s window would span 83 s of ticks.
+        check("ticks: 5 in 60 s", esc, ticks(every([ESC] * 5, 15_000)), [])
+    finally:
+        bursts._timebase = saved
+    print("  ✓ timebase : 125/3 ticks — 2 s window is 48,000,000 ticks, bursts judged in seconds")
+
+
+def check_jumps() -> None:
+    esc = Session("escape")
+    real = time.time
+    jumps = iter([3600.0, -7200.0, 86400.0, -86400.0, 0.0] * 4)
+    offset = 0.0
+
+    def jumping() -> float:
+        nonlocal offset
+        offset += next(jumps, 0.0)
+        return real() + offset
+
+    time.time = jumping  # type: ignore[assignment]
+    try:
+        presses = every([ESC] * 5, 300)
+        check("wall clock jumping", esc, presses, [4])
+        check("wall clock jumping, slow", esc, every([ESC] * 5, 600), [])
+    finally:
+        time.time = real  # type: ignore[assignment]
+
+    # Three presses, then the event clock goes back 9 s: the three are
+    # forgotten, so two more don't make five (and nothing underflows)...
+    back = every([ESC] * 3, 100, 10 * S) + every([ESC] * 2, 100, 1 * S)
+    check("clock backwards", esc, back, [])
+    # ...but five after the jump do.
+    check("burst after jump", esc, every([ESC] * 3, 100, 10 * S) + every([ESC] * 5, 100, 1 * S), [7])
+    # Four presses, an hour asleep, one more: not a burst.
+    check("forward gap", esc, every([ESC] * 4, 100) + [(ESC, 3610 * S)], [])
+    print("  ✓ jumps    : wall clock ±1 day ignored · backwards event clock resets · gaps don't count")
+
+
+def model(presses: list[Press], patterns: list[tuple[int, ...]], taps: int, window_ns: int) -> list[int]:
+    """The rules, spelled out with plain lists."""
+    state = [{"times": [], "next": 0, "last": 0} for _ in patterns]
+    fired = []
+    for i, (keycode, ts) in enumerate(presses):
+        for pattern, s in zip(patterns, state):
+            if keycode not in pattern:
+                continue
+            if ts < s["last"]:
+                s.update(times=[], next=0, last=0)
+            if keycode != pattern[s["next"]]:
+                s.update(times=[], next=0, last=0)
+                if keycode != pattern[0]:
+                    continue
+            s["last"] = ts
+            s["times"] = (s["times"] + [ts])[-taps:]
+            s["next"] = (s["next"] + 1) % len(pattern)
+            if len(s["times"]) == taps and ts - s["times"][0] <= window_ns:
+                s.update(times=[], next=0, last=0)
+                fired.append(i)
+                break
+    return fired
+
+
+def check_random(sequences: int, seed: int) -> None:
+    rng = random.Random(seed)
+    keys = [ESC, F1, F2, F12, A]
+    choices = [["escape"], ["escape", "f12"], ["f1 f2"], ["escape", "f1 f2"], ["f12 escape f1"]]
+    total = fired = 0
+    for n in range(sequences):
+        panic_key = choices[n % len(choices)]
+        taps = rng.randint(1, 6)
+        session = Session(panic_key, taps=taps, window=1.0)
+        ts = rng.randint(0, 100) * S
+        presses = []
+        for _ in range(rng.randint(1, 200)):
+            roll = rng.random()
+            if roll < 0.03:
+                ts = max(0, ts - rng.randint(1, 60) * S)  # clock jumps back
+            elif roll < 0.06:
+                ts += rng.randint(1, 3600) * S             # asleep
+            else:
+                ts += rng.choice((0, 50, 150, 300, 600)) * MS
+            presses.append((rng.choice(keys), ts))
+        expected = model(presses, [parse_pattern(p) for p in panic_key], taps, 1 * S)
+        got = session.replay(presses)
+        if got != expected:
+            fail(f"sequence {n} ({panic_key}, {taps} taps): reset on {got}, model says {expected}")
+        total += len(presses)
+        fired += len(got)
+    print(f"  ✓ random   : {sequences} sequences, {total:,} presses, {fired} resets — "
+          "all match the model")
+
+
+def per_press_ns(session: Session, n: int) -> float:
+    callback = session.callback
+    # Spaced out so no burst completes: only the detector bookkeeping is timed.
+    events = [simulate.FakeEvent(ESC, 0, i * 3 * S) for i in range(n)]
+    start = time.perf_counter_ns()
+    for event in events:
+        callback(None, simulate.kCGEventKeyDown, event, None)
+    return (time.perf_counter_ns() - start) / n
+
+
+def check_cost(patterns: int, n: int) -> None:
+    names = [k for k in KEY_MAP if k != "escape"][: patterns - 1]
+    one = Session("escape")
+    many = Session(["escape"] + names)
+    a = min(per_press_ns(one, n) for _ in range(5))
+    b = min(per_press_ns(many, n) for _ in range(5))
+    print(f"  ✓ cost     : {a:.0f} ns per panic-key press with 1 pattern, "
+          f"{b:.0f} ns with {patterns}")
+    if b > a * 1.5 + 100:
+        fail(f"cost grows with the number of patterns ({a:.0f} → {b:.0f} ns)")
+
+    events = [simulate.FakeEvent(ESC, 0, i * 3 * S) for i in range(n)]
+    callback = many.callback
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for event in events:
+        callback(None, simulate.kCGEventKeyDown, event, None)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if after - before > 1024:
+        fail(f"{after - before} bytes left allocated by {n:,} panic-key presses")
+    print(f"  ✓ alloc    : +{after - before} bytes over {n:,} presses")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Panic reset detector check")
+    parser.add_argument("--sequences", type=int, default=500, help="random sequences")
+    parser.add_argument("--patterns", type=int, default=20, help="patterns for the cost check")
+    parser.add_argument("-n", type=int, default=100_000, help="presses per cost run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    check_scripted()
+    check_timebase()
+    check_jumps()
+    check_random(args.sequences, args.seed)
+    check_cost(args.patterns, args.n)
+
+
+if __name__ == "__main__":
+    main()
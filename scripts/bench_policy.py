@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Check and time the passthrough policy through a simulated event tap.
+
+Compiles a sample [passthrough] policy, fires a random event stream through
+the stand-in tap (which honours the tap mask like the window server does),
+and checks every allow/deny decision against Passthrough.allows().  Then it
+times allowed and denied events so the cost of rules can be compared.
+
+Usage:
+    python scripts/bench_policy.py
+    python scripts/bench_policy.py -n 500000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.keys import KEY_MAP  # noqa: E402
+from vegitate.policy import LOCKED_TYPES  # noqa: E402
+
+POLICY = {
+    "events": ["scroll"],
+    "keys": ["volume_up", "volume_down", "mute"],
+    "click_regions": [[0, 0, 200, 100], [1000, 700, 80, 80]],
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Passthrough policy check")
+    parser.add_argument("-n", type=int, default=200_000, help="events per case")
+    args = parser.parse_args()
+
+    vegitate = Vegitate(stats_path=None, panic_taps=0, passthrough=POLICY)
+    vegitate._unlock = lambda: None  # type: ignore[method-assign]
+    vegitate._compile_policy()
+    vegitate._create_event_tap()
+    tap = simulate.taps[-1]
+    policy = vegitate.policy
+
+    # 1. Decisions match the policy.
+    rng = random.Random(0)
+    keycodes = list(KEY_MAP.values())
+    for _ in range(args.n):
+        event_type = rng.choice(LOCKED_TYPES)
+        event = simulate.FakeEvent(
+            rng.choice(keycodes), 0, 0, rng.uniform(0, 1500), rng.uniform(0, 900),
+        )
+        allowed = tap.post(event_type, event) is not None
+        expected = policy.allows(
+            event_type, event.keycode, event.location.x, event.location.y,
+        )
+        if allowed != expected:
+            print(f"  ✗ type {event_type} keycode {event.keycode} at "
+                  f"({event.location.x:.0f}, {event.location.y:.0f}): "
+                  f"got {allowed}, policy says {expected}")
+            sys.exit(1)
+    print(f"  ✓ {args.n:,} random events decided as the policy says")
+
+    # 2. Cost per decision, straight through the callback.
+    callback = vegitate._event_callback
+    cases = [
+        ("mouse move (deny)", simulate.kCGEventMouseMoved, simulate.FakeEvent()),
+        ("key down (deny)", simulate.kCGEventKeyDown, simulate.FakeEvent(KEY_MAP["a"])),
+        ("key down (allow)", simulate.kCGEventKeyDown, simulate.FakeEvent(KEY_MAP["mute"])),
+        ("click (deny)", simulate.kCGEventLeftMouseDown, simulate.FakeEvent(x=500, y=500)),
+        ("click (allow)", simulate.kCGEventLeftMouseDown, simulate.FakeEvent(x=10, y=10)),
+    ]
+    print(f"  {'event':<20} {'ns/event':>10}")
+    for label, event_type, event in cases:
+        start = time.perf_counter_ns()
+        for _ in range(args.n):
+            callback(None, event_type, event, None)
+        print(f"  {label:<20} {(time.perf_counter_ns() - start) / args.n:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Check that `vegitate --record` never writes to disk inside the tap callback.
+
+  1. roundtrip — records packed across many buffer hand-offs read back
+                 exactly, in order;
+  2. slow disk — with every file write taking --write-ms, Recorder.record()
+                 stays fast (a synchronous flush would stall the callback
+                 for the whole write) and nothing is lost;
+  3. session   — Vegitate's recording callback, through the stand-in Quartz
+                 backend: the recording holds every event it was given;
+  4. threads   — two taps recording at once (split taps), with a tiny switch
+                 interval: every record in the file exactly once, each
+                 thread's in order, and record() never raises;
+  5. disk full — every write fails with ENOSPC: record() still never raises,
+                 close() reports the error, and the session's cleanup carries
+                 on past it (stats dumped, history queued, reported as a step).
+
+Usage:
+    python scripts/bench_recording.py
+    python scripts/bench_recording.py -n 500000 --write-ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import errno
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.recording import Recorder, read_records  # noqa: E402
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+def stream(n: int) -> list[tuple[int, int, int, int]]:
+    """*n* deterministic (event_type, keycode, flags, timestamp) records."""
+    return [
+        (simulate.kCGEventKeyDown + (i % 3), i % 128, (i * 2654435761) & 0xFFFFFFFF, 1_000 + i * 37)
+        for i in range(n)
+    ]
+
+
+class SlowFile:
+    """A file whose writes each take *delay* seconds, like a stalled disk."""
+
+    def __init__(self, file, delay: float) -> None:  # noqa: ANN001
+        self._file = file
+        self.delay = delay
+        self.writes = 0
+
+    def write(self, data: memoryview) -> int:
+        time.sleep(self.delay)
+        self.writes += 1
+        return self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+
+class FullFile(SlowFile):
+    """A file on a full disk: every write fails with ENOSPC."""
+
+    def write(self, data: memoryview) -> int:
+        raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+
+
+class FakeDisplay:
+    def __init__(self) -> None:
+        self.steps: list[str] = []
+
+    def show_step(self, msg: str) -> None:
+        self.steps.append(msg)
+
+
+def check_roundtrip(tmp: Path, n: int) -> None:
+    path = tmp / "roundtrip.bin"
+    records = stream(n)
+    recorder = Recorder(path, batch=64)
+    for rec in records:
+        recorder.record(*rec)
+    recorder.close()
+    got = list(read_records(path))
+    if got != records:
+        first = next(i for i, (a, b) in enumerate(zip(got, records)) if a != b) if got else 0
+        fail(f"read back {len(got):,} records for {n:,}, first difference at {first}")
+    if recorder.count != n:
+        fail(f"counted {recorder.count:,} records for {n:,}")
+    print(f"  ✓ roundtrip : {n:,} records through {n // 64:,} buffer hand-offs read back exactly")
+
+
+def check_slow_disk(tmp: Path, n: int, write_ms: float) -> None:
+    path = tmp / "slow.bin"
+    records = stream(n)
+    recorder = Recorder(path)
+    slow = recorder._file = SlowFile(recorder._file, write_ms / 1e3)  # type: ignore[assignment]
+    times = []
+    clock = time.perf_counter_ns
+    for rec in records:
+        start = clock()
+        recorder.record(*rec)
+        times.append(clock() - start)
+    start = time.monotonic()
+    recorder.close()
+    closed = time.monotonic() - start
+    times.sort()
+    worst = times[-1]
+    if worst > write_ms * 1e6 / 2:
+        fail(f"record() took {worst / 1e6:.1f} ms with {write_ms:g} ms writes — "
+             "it waited on the disk")
+    if list(read_records(path)) != records:
+        fail("records lost or reordered behind a slow disk")
+    print(f"  ✓ slow disk : {n:,} records, {slow.writes} writes of {write_ms:g} ms each · "
+          f"record() p99 {times[int(n * 0.99)] / 1e3:.1f} µs, worst {worst / 1e3:.0f} µs · "
+          f"{recorder.buffers} buffers · close() {closed * 1e3:.0f} ms")
+
+
+def check_session(tmp: Path, n: int) -> None:
+    path = tmp / "session.bin"
+    vegitate = Vegitate(record_path=path, stats_path=None)
+    vegitate._compile_policy()
+    vegitate.recorder = Recorder(path)
+    records = stream(n)
+    for event_type, keycode, flags, timestamp in records:
+        event = simulate.FakeEvent(keycode, flags, timestamp)
+        vegitate._recording_callback(None, event_type, event, None)
+    vegitate.recorder.close()
+    got = list(read_records(path))
+    if got != records:
+        fail(f"session recording holds {len(got):,} records for {n:,} events, or differs")
+    print(f"  ✓ session   : {n:,} events through the recording callback, all in the file")
+
+
+def check_threads(tmp: Path, n: int) -> None:
+    path = tmp / "threads.bin"
+    recorder = Recorder(path, batch=64)
+    errors: list[BaseException] = []
+
+    def tap(keycode: int) -> None:
+        try:
+            for i in range(n):
+                recorder.record(simulate.kCGEventKeyDown, keycode, 0, i)
+        except BaseException as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=tap, args=(keycode,)) for keycode in (1, 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    recorder.close()
+    if errors:
+        fail(f"record() raised {type(errors[0]).__name__}: {errors[0]}")
+    got = list(read_records(path))
+    for keycode in (1, 2):
+        stamps = [ts for _, key, _, ts in got if key == keycode]
+        if stamps != list(range(n)):
+            fail(f"thread {keycode}: {len(stamps):,} records for {n:,}, "
+                 f"{len(set(stamps)):,} distinct, or out of order")
+    print(f"  ✓ threads   : 2 × {n:,} records from two threads, each exactly once, in order")
+
+
+def check_disk_full(tmp: Path, n: int) -> None:
+    recorder = Recorder(tmp / "full.bin", batch=64)
+    recorder._file = FullFile(recorder._file, 0)  # type: ignore[assignment]
+    for rec in stream(n):
+        recorder.record(*rec)
+    try:
+        recorder.close()
+    except OSError as exc:
+        if exc.errno != errno.ENOSPC:
+            fail(f"close() raised {exc!r}, expected ENOSPC")
+    else:
+        fail("close() didn't report the failed writes")
+
+    stats = tmp / "stats.json"
+    vegitate = Vegitate(record_path=tmp / "full-session.bin", stats_path=stats)
+    display = vegitate.display = FakeDisplay()  # type: ignore[assignment]
+    vegitate._compile_policy()
+    vegitate._create_event_tap()
+    vegitate.recorder._file = FullFile(vegitate.recorder._file, 0)  # type: ignore[union-attr]
+    sessions = []
+    vegitate._record_session = lambda *args: sessions.append(args)  # type: ignore[method-assign]
+    vegitate.locked_since = time.time()
+    click = simulate.FakeEvent()
+    for _ in range(n):
+        vegitate.event_tap.post(simulate.kCGEventLeftMouseDown, click)
+    try:
+        vegitate._cleanup()
+    except Exception as exc:
+        fail(f"cleanup raised {type(exc).__name__}: {exc}")
+    if not stats.exists() or len(sessions) != 1:
+        fail("cleanup stopped at the recording: stats not dumped or session not recorded")
+    if not any(step.startswith("Recording") for step in display.steps):
+        fail(f"failed recording not reported: {display.steps}")
+    print(f"  ✓ disk full : {n:,} records to a full disk · close() reports ENOSPC, "
+          "cleanup finishes and reports it")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Event recording check")
+    parser.add_argument("-n", type=int, default=200_000, help="records per check")
+    parser.add_argument("--write-ms", type=float, default=20.0, help="simulated write latency")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        check_roundtrip(Path(tmp), args.n)
+        check_slow_disk(Path(tmp), args.n, args.write_ms)
+        check_session(Path(tmp), min(args.n, 50_000))
+        check_threads(Path(tmp), min(args.n, 100_000))
+        check_disk_full(Path(tmp), min(args.n, 10_000))
+
+
+if __name__ == "__main__":
+    main()
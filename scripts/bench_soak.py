@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Soak a lock session on the stand-in Quartz backend, in accelerated time.
+
+A real session runs — Vegitate.run() on the main thread, with the Rich lock
+screen refreshing (to /dev/null), the journal, history, metrics exporter,
+latency guard and a caffeinate child — while a driver thread pushes -n
+synthetic events through the tap: mouse moves, clicks, scrolls, keys, wrong
+chords and, now and then, a panic-key tap.  The wall clock (time.time) and
+the panic taps' event timestamps run --speed times faster than real time,
+so the lock screen's timer, the panic detector and the session history all
+see the session last for days; a panic tap every --panic-every events is
+far enough apart in that time never to trigger the reset.
+
+Every -n / --samples events it samples the process's RSS, allocated blocks
+(sys.getallocatedblocks), CPU per event on the driver (callback cost) and
+for the whole process (display, guard, exporter threads included), and the
+caffeinate child's RSS.  After the first --warmup samples, fails if:
+
+  * RSS grows by more than --rss-slack-mib, or allocated blocks by more
+    than --blocks-slack;
+  * the per-event callback cost in the last quarter of the run is more than
+    --creep over the first quarter (medians);
+  * the caffeinate child dies, is restarted or its RSS grows;
+  * the session doesn't end cleanly with the unlock combo.
+
+Without a caffeinate binary (Linux) a stand-in that just waits is put on
+PATH.
+
+Usage:
+    python scripts/bench_soak.py                          # 100M events
+    python scripts/bench_soak.py -n 300000000 --speed 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections.abc import Callable
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from rich.console import Console  # noqa: E402
+
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.display import _fmt_time  # noqa: E402
+from vegitate.keys import KEY_MAP, parse_combo  # noqa: E402
+
+PAGE = os.sysconf("SC_PAGE_SIZE")
+
+
+def fail(message: str) -> None:
+    print(f"  ✗ {message}")
+    sys.exit(1)
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident set size of *pid*, now (not the peak getrusage reports)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE
+    except FileNotFoundError:
+        out = subprocess.run(
+            ["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True,
+        ).stdout
+        return int(out or 0) * 1024
+
+
+def rich_caches() -> list:
+    """Rich's lru_caches — bounded, but they fill with every new timer text."""
+    import rich
+
+    return [
+        value
+        for name, module in list(sys.modules.items())
+        if name.startswith("rich.") or module is rich
+        for value in vars(module).values()
+        if hasattr(value, "cache_clear") and hasattr(value, "cache_info")
+    ]
+
+
+def accelerate(speed: float) -> Callable[[], int]:
+    """Make time.time() run *speed* times faster from now on.
+
+    Returns a clock for event timestamps (ns) that runs as fast.
+    """
+    real = time.time
+    t0, m0 = real(), time.monotonic()
+    time.time = lambda: t0 + (time.monotonic() - m0) * speed  # type: ignore[assignment]
+    ns0 = simulate.now_ns()
+    return lambda: ns0 + int((time.monotonic() - m0) * speed * 1e9)
+
+
+def fake_caffeinate(tmp: Path) -> None:
+    """Put a stand-in `caffeinate` (it just waits to be killed) on PATH."""
+    script = tmp / "caffeinate"
+    script.write_text("#!/bin/sh\nexec tail -f /dev/null\n")
+    script.chmod(0o755)
+    os.environ["PATH"] = f"{tmp}{os.pathsep}{os.environ['PATH']}"
+
+
+def traffic() -> list[tuple[int, simulate.FakeEvent]]:
+    """One round of ordinary input: pointer, clicks, scrolls, keys, chords."""
+    a, cmd = KEY_MAP["a"], simulate.kCGEventFlagMaskCommand
+    events = []
+    for i in range(40):
+        events.append((simulate.kCGEventMouseMoved, simulate.FakeEvent(x=i, y=i)))
+    for down, up in (
+        (simulate.kCGEventLeftMouseDown, simulate.kCGEventLeftMouseUp),
+        (simulate.kCGEventRightMouseDown, simulate.kCGEventRightMouseUp),
+    ):
+        events += [(down, simulate.FakeEvent()), (up, simulate.FakeEvent())]
+    events += [(simulate.kCGEventScrollWheel, simulate.FakeEvent())] * 8
+    for keycode in range(12):
+        events += [
+            (simulate.kCGEventKeyDown, simulate.FakeEvent(keycode)),
+            (simulate.kCGEventKeyUp, simulate.FakeEvent(keycode)),
+        ]
+    events.append((simulate.kCGEventKeyDown, simulate.FakeEvent(a, cmd)))  # wrong combo
+    return events
+
+
+FIELDS = ("events", "rss", "blocks", "thread_cpu", "process_cpu", "caffeinate",
+          "caffeinate_rss", "locked_for")
+
+
+class Soak:
+    def __init__(self, vegitate: Vegitate, args: argparse.Namespace) -> None:
+        self.vegitate = vegitate
+        self.args = args
+        # Preallocated, so taking samples doesn't show up as growth.
+        self.columns = {name: array("d", bytes(8 * (args.samples + 2))) for name in FIELDS}
+        self.taken = 0
+        self.caches = rich_caches()
+        self.error: BaseException | None = None
+        self.now_ns: Callable[[], int] = simulate.now_ns
+
+    def sample(self, events: int, thread_cpu: float, process_cpu: float) -> None:
+        proc = getattr(self.vegitate._awake, "proc", None)
+        # Emptied before counting, so a cache filling up to its bound, or
+        # garbage the collector hasn't got to yet, isn't mistaken for a leak.
+        for cache in self.caches:
+            cache.cache_clear()
+        gc.collect()
+        row = (
+            events,
+            rss_bytes(os.getpid()),
+            sys.getallocatedblocks(),
+            thread_cpu,
+            process_cpu,
+            proc is not None and proc.poll() is None,
+            rss_bytes(proc.pid) if proc is not None else 0,
+            time.time() - (self.vegitate.locked_since or time.time()),
+        )
+        for name, value in zip(FIELDS, row):
+            self.columns[name][self.taken] = value
+        self.taken += 1
+
+    @property
+    def samples(self) -> list[dict[str, float]]:
+        return [
+            {name: column[i] for name, column in self.columns.items()}
+            for i in range(self.taken)
+        ]
+
+    def drive(self) -> None:
+        try:
+            self._drive()
+        except BaseException as exc:  # reported from the main thread
+            self.error = exc
+            self.vegitate._unlock()
+
+    def _drive(self) -> None:
+        vegitate, args = self.vegitate, self.args
+        # Wait for the lock screen, so the display is part of the soak.
+        deadline = time.monotonic() + 10
+        while vegitate.display._thread is None:
+            if time.monotonic() > deadline:
+                raise RuntimeError("lock screen never came up")
+            time.sleep(0.01)
+
+        round_ = traffic()
+        panic = simulate.FakeEvent(KEY_MAP["escape"])
+        chunk = max(args.events // args.samples, len(round_))
+        rounds = max(chunk // len(round_), 1)
+        panic_every = max(args.panic_every // len(round_), 1)
+        done = 0
+        self.sample(0, 0.0, 0.0)
+        while done < args.events and self.taken <= args.samples:
+            tap = vegitate.event_tap  # the guard may have swapped it
+            post = tap.post
+            thread0, process0 = time.thread_time(), time.process_time()
+            for r in range(rounds):
+                for event_type, event in round_:
+                    post(event_type, event)
+                if r % panic_every == 0:
+                    panic.timestamp = self.now_ns()
+                    post(simulate.kCGEventKeyDown, panic)
+            n = rounds * len(round_)
+            done += n
+            self.sample(
+                done,
+                (time.thread_time() - thread0) / n * 1e9,
+                (time.process_time() - process0) / n * 1e9,
+            )
+            if vegitate._unlock_requested.is_set():
+                raise RuntimeError(f"session ended after {done:,} events "
+                                   f"({vegitate.unlock_method})")
+
+        keycode, flags = parse_combo("ctrl+cmd+u")
+        vegitate.event_tap.post(simulate.kCGEventKeyDown, simulate.FakeEvent(keycode, flags))
+
+
+def mib(n: float) -> str:
+    return f"{n / 2**20:7.1f} MiB"
+
+
+def report(samples: list[dict[str, float]], args: argparse.Namespace, real_s: float) -> None:
+    print(f"  {'events':>13} {'locked for':>12} {'RSS':>11} {'blocks':>9} "
+          f"{'ns/event':>9} {'process':>9} {'caffeinate':>11}")
+    step = max(len(samples) // 10, 1)
+    for s in samples[::step] + ([samples[-1]] if (len(samples) - 1) % step else []):
+        print(f"  {s['events']:>13,.0f} {_fmt_time(s['locked_for']):>12} {mib(s['rss']):>11} "
+              f"{s['blocks']:>9,.0f} {s['thread_cpu']:>9.0f} {s['process_cpu']:>9.0f} "
+              f"{mib(s['caffeinate_rss']):>11}")
+
+    base = samples[args.warmup]
+    steady = samples[args.warmup:]
+    events = samples[-1]["events"]
+    print(f"  {events:,.0f} events in {real_s:.0f} s real · "
+          f"{_fmt_time(samples[-1]['locked_for'])} locked at {args.speed:g}x")
+
+    rss_growth = max(s["rss"] for s in steady) - base["rss"]
+    blocks_growth = max(s["blocks"] for s in steady) - base["blocks"]
+    if rss_growth > args.rss_slack_mib * 2**20:
+        fail(f"RSS grew {rss_growth / 2**20:.1f} MiB after warm-up "
+             f"(slack {args.rss_slack_mib:g} MiB)")
+    if blocks_growth > args.blocks_slack:
+        fail(f"{blocks_growth:,.0f} more allocated blocks after warm-up "
+             f"(slack {args.blocks_slack:,})")
+    print(f"  ✓ memory     : RSS +{rss_growth / 2**20:.1f} MiB, "
+          f"blocks +{blocks_growth:,.0f} after warm-up")
+
+    measured = [s for s in steady if s["events"]]
+    quarter = max(len(measured) // 4, 1)
+    first = statistics.median(s["thread_cpu"] for s in measured[:quarter])
+    last = statistics.median(s["thread_cpu"] for s in measured[-quarter:])
+    process = statistics.median(s["process_cpu"] for s in measured)
+    if last > first * (1 + args.creep):
+        fail(f"callback cost crept from {first:.0f} to {last:.0f} ns/event "
+             f"(allowed +{args.creep:.0%})")
+    print(f"  ✓ cpu        : {first:.0f} → {last:.0f} ns/event on the callback, "
+          f"{process:.0f} ns/event for the whole process")
+
+    if args.caffeinate:
+        if not all(s["caffeinate"] for s in samples):
+            fail("caffeinate child died during the session")
+        child = [s["caffeinate_rss"] for s in steady]
+        if max(child) > child[0] + 2**20:
+            fail(f"caffeinate child grew from {mib(child[0])} to {mib(max(child))}")
+        print(f"  ✓ caffeinate : alive throughout, RSS {mib(child[0]).strip()} flat")
+
+
+def check_restarts(vegitate: Vegitate) -> None:
+    restarts = vegitate._awake.restarts if vegitate._awake is not None else 0
+    if restarts:
+        fail(f"caffeinate child restarted {restarts} time(s) during the session")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lock session soak benchmark")
+    parser.add_argument("-n", "--events", type=int, default=100_000_000,
+                        help="synthetic events to drive through the callback")
+    parser.add_argument("--samples", type=int, default=200, help="resource samples to take")
+    parser.add_argument("--warmup", type=int, default=2, help="samples before the baseline")
+    parser.add_argument("--speed", type=float, default=5000.0,
+                        help="how much faster than real time the wall clock runs")
+    parser.add_argument("--panic-every", type=int, default=50_000,
+                        help="events between panic-key taps")
+    parser.add_argument("--rss-slack-mib", type=float, default=8.0,
+                        help="allowed RSS growth after warm-up")
+    parser.add_argument("--blocks-slack", type=int, default=2000,
+                        help="allowed growth in allocated blocks after warm-up")
+    parser.add_argument("--creep", type=float, default=0.3,
+                        help="allowed rise in per-event cost, first to last quarter")
+    parser.add_argument("--no-caffeinate", dest="caffeinate", action="store_false",
+                        help="don't run a caffeinate child")
+    args = parser.parse_args()
+    args.warmup = min(args.warmup, args.samples - 1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        if args.caffeinate and shutil.which("caffeinate") is None:
+            fake_caffeinate(tmp)
+        vegitate = Vegitate(
+            use_caffeinate=args.caffeinate,
+            keep_awake="caffeinate",
+            stats_path=tmp / "stats.json",
+            journal_path=tmp / "journal.bin",
+            history_path=tmp / "history.db",
+            metrics_path=tmp / "vegitate.prom",
+            metrics_interval=0.5,
+        )
+        with open(os.devnull, "w") as devnull:
+            vegitate.display.console = Console(
+                file=devnull, force_terminal=True, width=100, height=40,
+            )
+            soak = Soak(vegitate, args)
+            driver = threading.Thread(target=soak.drive, name="soak-driver", daemon=True)
+            soak.now_ns = accelerate(args.speed)
+            start = time.monotonic()
+            driver.start()
+            vegitate.run()
+            driver.join()
+            real_s = time.monotonic() - start
+
+    if soak.error is not None:
+        fail(f"driver: {soak.error}")
+    if vegitate.unlock_method != "combo":
+        fail(f"session ended by {vegitate.unlock_method}, not the combo")
+    if vegitate.keep_awake_active:
+        fail("caffeinate child still running after unlock")
+    check_restarts(vegitate)
+    report(soak.samples, args, real_s)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Unlock-detection latency under a 1 kHz mouse flood: one tap vs split taps.
+
+The stand-in backend delivers events to each tap serially on that tap's run
+loop, like the window server.  Pointer handling is made artificially slow
+(--pointer-cost-us, default longer than the 1 ms flood interval) to model a
+loaded machine, so a backlog of mouse events builds up.  With a single tap
+the unlock keystroke has to wait behind that backlog; with split taps it
+goes to the keyboard tap's own run loop.
+
+Fails unless the split-tap unlock is handled within --max-ms, however long
+the single-tap backlog gets.
+
+Usage:
+    python scripts/bench_split_taps.py
+    python scripts/bench_split_taps.py --flood-ms 500 --pointer-cost-us 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.keys import parse_combo  # noqa: E402
+
+
+def unlock_latency(split: bool, flood_ms: int, pointer_cost: float) -> float:
+    """Milliseconds from the unlock keystroke arriving to it being handled."""
+    simulate.reset()
+    vegitate = Vegitate(use_caffeinate=False, stats_path=None, split_taps=split)
+    vegitate._notify = lambda title, message: None  # type: ignore[method-assign]
+    vegitate.display.show_unlocked = lambda timings=None: None  # type: ignore[method-assign]
+
+    fast_callback = vegitate._event_callback
+
+    def loaded_callback(proxy, event_type, event, refcon):  # noqa: ANN001, ANN202
+        if event_type == simulate.kCGEventMouseMoved:
+            time.sleep(pointer_cost)
+        return fast_callback(proxy, event_type, event, refcon)
+
+    vegitate._event_callback = loaded_callback  # type: ignore[method-assign]
+    vegitate._compile_policy()
+    vegitate._start_unlock_worker()
+    vegitate._create_event_tap()
+
+    def tap_for(event_type: int) -> simulate.FakeTap:
+        return next(t for t in simulate.taps if (t.mask >> event_type) & 1)
+
+    pointer_tap = tap_for(simulate.kCGEventMouseMoved)
+    keyboard_tap = tap_for(simulate.kCGEventKeyDown)
+    keycode, modifiers = parse_combo(vegitate.combos[0])
+    handled = threading.Event()
+    sent_at = 0.0
+    latency = 0.0
+
+    def on_unlock_handled(result: object) -> None:
+        nonlocal latency
+        latency = time.perf_counter() - sent_at
+        handled.set()
+
+    def flood() -> None:
+        nonlocal sent_at
+        mouse = simulate.FakeEvent()
+        start = time.perf_counter()
+        tick = 0
+        while not handled.is_set():
+            tick += 1
+            pointer_tap.enqueue(simulate.kCGEventMouseMoved, mouse)
+            if tick == flood_ms:
+                sent_at = time.perf_counter()
+                keyboard_tap.enqueue(
+                    simulate.kCGEventKeyDown,
+                    simulate.FakeEvent(keycode, modifiers),
+                    on_unlock_handled,
+                )
+            # 1 kHz, paced against the start time rather than sleep drift.
+            delay = start + tick / 1000 - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    flooder = threading.Thread(target=flood, daemon=True)
+    flooder.start()
+    simulate.CFRunLoopRun()
+    flooder.join()
+    return latency * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Split-tap unlock latency benchmark")
+    parser.add_argument("--flood-ms", type=int, default=300, help="flood before the unlock")
+    parser.add_argument(
+        "--pointer-cost-us",
+        type=float,
+        default=1500,
+        help="simulated cost of handling each mouse event",
+    )
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=10.0,
+        help="fail if the split-tap unlock takes longer than this",
+    )
+    args = parser.parse_args()
+
+    cost = args.pointer_cost_us / 1e6
+    single = unlock_latency(False, args.flood_ms, cost)
+    split = unlock_latency(True, args.flood_ms, cost)
+    print(f"    mouse flood        : 1 kHz for {args.flood_ms} ms, "
+          f"{args.pointer_cost_us:g} µs per event")
+    print(f"    single tap unlock  : {single:8.2f} ms")
+    if split > args.max_ms:
+        print(f"  ✗ split taps unlock  : {split:8.2f} ms, over the {args.max_ms:g} ms limit")
+        sys.exit(1)
+    print(f"  ✓ split taps unlock  : {split:8.2f} ms (limit {args.max_ms:g} ms, "
+          f"{single / max(split, 1e-3):,.0f}x faster than one tap)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Cold-start budget check for the non-locking subcommands.
+
+Two checks, both in fresh interpreters:
+
+  1. `python -X importtime` on vegitate.cli — fails if the cumulative import
+     time is over budget, or if a heavy module (pyobjc, rich, the lock core)
+     gets imported just to parse arguments.
+  2. Wall-clock time of `vegitate --version`, `--help` and `init`, minus a bare
+     `python -c pass`, best of several runs.
+
+Usage:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --import-budget-ms 20 --run-budget-ms 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+
+# Modules that must not be imported before we know we're going to lock.
+HEAVY = (
+    "Quartz", "objc", "rich", "vegitate.core", "vegitate.display", "vegitate.awake", "tomllib",
+    "ctypes", "subprocess",
+)
+
+
+def _env(extra: dict[str, str] | None = None) -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    env.update(extra or {})
+    return env
+
+
+def import_time() -> tuple[float, list[str]]:
+    """Return (cumulative ms for vegitate.cli, heavy modules that were imported)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import vegitate.cli"],
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = 0.0
+    imported: list[str] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = (p.strip() for p in line[len("import time:"):].split("|"))
+        if not cum.isdigit():
+            continue  # header row
+        if name == "vegitate.cli":
+            cumulative = int(cum) / 1000
+        if name in HEAVY or name.split(".")[0] in ("Quartz", "objc", "rich"):
+            imported.append(name)
+    return cumulative, imported
+
+
+def best_of(argv: list[str], runs: int, env: dict[str, str], reset: Path | None = None) -> float:
+    """Fastest wall-clock time of *argv* over *runs* runs, in ms.
+
+    *reset*, if given, is deleted before each run.
+    """
+    best = float("inf")
+    for _ in range(runs):
+        if reset is not None:
+            reset.unlink(missing_ok=True)
+        start = time.perf_counter()
+        subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Startup time budget check")
+    parser.add_argument("--import-budget-ms", type=float, default=25.0)
+    parser.add_argument("--run-budget-ms", type=float, default=50.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+
+    cumulative, heavy = import_time()
+    print(f"  import vegitate.cli : {cumulative:7.1f} ms  (budget {args.import_budget_ms:g} ms)")
+    if cumulative > args.import_budget_ms:
+        print("    ✗ over budget")
+        failed = True
+    if heavy:
+        print(f"    ✗ heavy modules imported eagerly: {', '.join(heavy)}")
+        failed = True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env({"XDG_CONFIG_HOME": tmp})
+        baseline = best_of([sys.executable, "-c", "pass"], args.runs, env)
+        print(f"  python -c pass      : {baseline:7.1f} ms  (baseline)")
+
+        # `init` refuses to overwrite, so its config is cleared between runs.
+        config = Path(tmp) / "vegitate" / "config.toml"
+        for label, extra, reset in (
+            ("--version", ["--version"], None),
+            ("--help", ["--help"], None),
+            ("init", ["init"], config),
+        ):
+            argv = [sys.executable, "-m", "vegitate", *extra]
+            cost = best_of(argv, args.runs, env, reset) - baseline
+            print(f"  vegitate {label:<10} : {cost:7.1f} ms  (budget {args.run_budget_ms:g} ms)")
+            if cost > args.run_budget_ms:
+                print("    ✗ over budget")
+                failed = True
+
+    if failed:
+        sys.exit(1)
+    print("  ✓ within budget")
+
+
+if __name__ == "__main__":
+    main()
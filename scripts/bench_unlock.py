@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Check that unlocking never blocks the event-tap callback.
+
+Runs a full lock session against the stand-in Quartz backend with a slow
+teardown (caffeinate stop, notification and unlock screen each made to sleep),
+floods the tap with events, sends the unlock combo mid-flood, and records the
+worst callback latency seen.  Exits non-zero if it is over budget.
+
+Usage:
+    python scripts/bench_unlock.py                   # 5 ms budget
+    python scripts/bench_unlock.py --budget-ms 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from vegitate import simulate  # noqa: E402
+
+simulate.install()
+
+from vegitate.core import Vegitate  # noqa: E402
+from vegitate.keys import parse_combo  # noqa: E402
+
+# How long each stubbed teardown step takes.
+SLOW_STEP = 0.25
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Unlock latency budget check")
+    parser.add_argument("--budget-ms", type=float, default=5.0)
+    parser.add_argument("--events", type=int, default=20_000, help="events around the unlock")
+    args = parser.parse_args()
+
+    vegitate = Vegitate(use_caffeinate=False, stats_path=None)
+    vegitate._stop_keep_awake = lambda: time.sleep(SLOW_STEP)  # type: ignore[method-assign]
+    vegitate._notify = lambda title, message: time.sleep(SLOW_STEP)  # type: ignore[method-assign]
+    vegitate.display.show_unlocked = lambda timings=None: time.sleep(SLOW_STEP)  # type: ignore[method-assign]
+
+    vegitate._compile_policy()
+    vegitate._start_unlock_worker()
+    vegitate._create_event_tap()
+    tap = simulate.taps[-1]
+
+    keycode, modifiers = parse_combo(vegitate.combos[0])
+    mouse = simulate.FakeEvent()
+    unlock = simulate.FakeEvent(keycode, modifiers)
+    worst = 0
+    unlock_cost = 0
+
+    def drive() -> None:
+        nonlocal worst, unlock_cost
+        half = args.events // 2
+        for i in range(args.events):
+            if i == half:
+                start = time.perf_counter_ns()
+                tap.post(simulate.kCGEventKeyDown, unlock)
+                unlock_cost = time.perf_counter_ns() - start
+                worst = max(worst, unlock_cost)
+                continue
+            start = time.perf_counter_ns()
+            tap.post(simulate.kCGEventMouseMoved, mouse)
+            worst = max(worst, time.perf_counter_ns() - start)
+
+    driver = threading.Thread(target=drive)
+    started = time.perf_counter()
+    driver.start()
+    simulate.CFRunLoopRun()
+    driver.join()
+    total = time.perf_counter() - started
+
+    budget_ns = args.budget_ms * 1e6
+    print(f"  unlock keystroke   : {unlock_cost / 1e3:9.1f} µs")
+    print(f"  worst callback     : {worst / 1e3:9.1f} µs  (budget {args.budget_ms:g} ms)")
+    print(f"  run loop stopped in: {total * 1e3:9.1f} ms")
+
+    if worst > budget_ns:
+        print("  ✗ callback latency over budget")
+        sys.exit(1)
+    print("  ✓ within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,25 +2,63 @@
 """
 Generate / update the Homebrew formula for vegitate.
 
-Pulls real sdist URLs and sha256 hashes from PyPI for every dependency,
-then writes a complete Formula/vegitate.rb.
+Pulls real sdist URLs and sha256 hashes from PyPI for every dependency
+and writes Formula/vegitate.rb.
+
+Resolved dependencies (name, version, url, sha256) are pinned in
+Formula/vegitate.lock.json. A run only re-resolves packages whose latest
+version differs from the lock and patches just those resource blocks, so
+the rest of the formula (including the release sha256) is left alone and
+the output is byte-identical when nothing upstream moved.
+
+Metadata is fetched concurrently over keep-alive connections and cached on
+disk (~/.cache/vegitate/pypi). Cached entries are revalidated with ETags,
+so unchanged packages cost a 304, or nothing at all within --cache-ttl.
+
+With --verify every sdist is downloaded (streamed, concurrently) and its
+sha256 checked against the lock before anything is written. Verified
+files are kept in a content-addressed cache (~/.cache/vegitate/sdists),
+so repeat runs only download sdists they haven't seen before.
 
 Usage:
     python scripts/generate_formula.py                 # uses version from __init__.py
     python scripts/generate_formula.py --version 0.2.0 # override version
     python scripts/generate_formula.py --head-only      # HEAD-only formula (no release tarball)
+    python scripts/generate_formula.py --index-url http://127.0.0.1:8000/pypi  # stub index
+    python scripts/generate_formula.py --diff --dry-run  # show what would change; exit 1 if anything would
+    python scripts/generate_formula.py --offline        # render from the lockfile only
+    python scripts/generate_formula.py --full           # rewrite the whole formula
+    python scripts/generate_formula.py --verify         # download and check every sdist
 """
 
 from __future__ import annotations
 
 import argparse
+import difflib
+import hashlib
+import http.client
 import json
+import os
+import re
+import sys
 import textwrap
-import urllib.request
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import urljoin, urlsplit
 
 ROOT = Path(__file__).resolve().parent.parent
 FORMULA_PATH = ROOT / "Formula" / "vegitate.rb"
+LOCK_PATH = ROOT / "Formula" / "vegitate.lock.json"
+LOCK_VERSION = 1
+
+DEFAULT_INDEX_URL = "https://pypi.org/pypi"
+CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "vegitate" / "pypi"
+)
+ARTIFACT_DIR = CACHE_DIR.parent / "sdists"
+DOWNLOAD_CHUNK = 64 * 1024
 
 # All runtime dependencies (including transitive) that aren't in Homebrew's
 # Python and therefore need resource blocks.
@@ -43,16 +81,248 @@ def get_version_from_source() -> str:
     raise RuntimeError("Could not read __version__")
 
 
-def fetch_sdist_info(package: str) -> tuple[str, str, str]:
-    """Return (display_name, sdist_url, sha256) for the latest version on PyPI.
+class PyPIClient:
+    """Fetch PyPI JSON metadata with pooled connections and an ETag cache.
+
+    Each worker thread keeps one keep-alive connection to the index host.
+    Responses are cached per package as ``{etag, fetched_at, data}``; a
+    cache entry younger than *cache_ttl* seconds is used without asking,
+    anything older is revalidated with ``If-None-Match``.
+
+    Downloaded sdists are verified and stored by sha256 under
+    *artifact_dir* (``<dir>/<sha[:2]>/<sha>``).
+    """
+
+    def __init__(
+        self,
+        index_url: str = DEFAULT_INDEX_URL,
+        cache_dir: Path | None = CACHE_DIR,
+        cache_ttl: float = 0.0,
+        timeout: float = 30.0,
+        artifact_dir: Path | None = ARTIFACT_DIR,
+    ) -> None:
+        self.index_url = index_url.rstrip("/")
+        self.cache_dir = cache_dir
+        self.artifact_dir = artifact_dir
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[http.client.HTTPConnection] = []
+        self.requests = 0
+        self.not_modified = 0
+        self.cache_hits = 0
+        self.downloads = 0
+        self.downloaded_bytes = 0
+        self.artifact_hits = 0
+
+    # ---- connections ----
+
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        key = (scheme, netloc)
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(key)
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = conns[key] = cls(netloc, timeout=self.timeout)
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _drop_connection(self, scheme: str, netloc: str) -> None:
+        conn = getattr(self._local, "conns", {}).pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def _get(
+        self, url: str, headers: dict[str, str],
+    ) -> tuple[http.client.HTTPResponse, tuple[str, str]]:
+        """GET *url*, following redirects.
+
+        Returns the response unread, and the (scheme, netloc) of the pooled
+        connection it arrived on, for :meth:`_read`.
+        """
+        for _ in range(5):
+            parts = urlsplit(url)
+            key = (parts.scheme, parts.netloc)
+            path = parts.path + (f"?{parts.query}" if parts.query else "")
+            # A pooled connection may have been closed by the server while
+            # idle — retry once on a fresh one.
+            for attempt in (1, 2):
+                conn = self._connection(*key)
+                try:
+                    conn.request("GET", path, headers=headers)
+                    resp = conn.getresponse()
+                    break
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    self._drop_connection(*key)
+                    if attempt == 2:
+                        raise
+                except (OSError, http.client.HTTPException):
+                    # Timed out or broken mid-exchange: a late response
+                    # could still arrive on it, so it's never reused.
+                    self._drop_connection(*key)
+                    raise
+            with self._lock:
+                self.requests += 1
+            if resp.status in (301, 302, 303, 307, 308) and resp.getheader("Location"):
+                self._read(resp, key)
+                url = urljoin(url, resp.getheader("Location"))
+                continue
+            return resp, key
+        raise RuntimeError(f"Too many redirects fetching {url}")
+
+    def _read(
+        self, resp: http.client.HTTPResponse, key: tuple[str, str], amt: int | None = None,
+    ) -> bytes:
+        """``resp.read(amt)``, dropping the connection if the read fails."""
+        try:
+            return resp.read(amt)
+        except (OSError, http.client.HTTPException):
+            self._drop_connection(*key)
+            raise
+
+    def request(self, url: str, headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+        """GET *url*, following redirects; returns (status, headers, body)."""
+        resp, key = self._get(url, headers)
+        body = self._read(resp, key)
+        return resp.status, {k.lower(): v for k, v in resp.getheaders()}, body
+
+    def download(self, url: str, sha256: str) -> Path | None:
+        """Stream *url* and check it against *sha256*.
+
+        The body is hashed chunk by chunk as it arrives, never held in
+        memory whole.  Verified artifacts are kept in the content-addressed
+        artifact cache and returned from there on later calls without a
+        download; returns the cached path, or None with caching off.
+        Raises RuntimeError on an HTTP error or a digest mismatch.
+        """
+        dest = self._artifact_path(sha256)
+        if dest is not None and dest.exists():
+            with self._lock:
+                self.artifact_hits += 1
+            return dest
+
+        resp, key = self._get(url, {"User-Agent": "vegitate-generate-formula"})
+        if resp.status != 200:
+            self._read(resp, key)
+            raise RuntimeError(f"HTTP {resp.status} from {url}")
+
+        digest = hashlib.sha256()
+        tmp = None
+        out = None
+        if dest is not None:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(f"{dest.name}.{threading.get_ident()}.part")
+            out = tmp.open("wb")
+        size = 0
+        try:
+            try:
+                while chunk := self._read(resp, key, DOWNLOAD_CHUNK):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    if out is not None:
+                        out.write(chunk)
+            finally:
+                if out is not None:
+                    out.close()
+
+            actual = digest.hexdigest()
+            if actual != sha256:
+                raise RuntimeError(
+                    f"sha256 mismatch for {url}\n"
+                    f"  expected {sha256}\n"
+                    f"  got      {actual}"
+                )
+            if tmp is not None:
+                os.replace(tmp, dest)
+        except BaseException:
+            # A mismatch, a dropped connection, a full disk or Ctrl-C: never
+            # leave a partial download behind in the artifact cache.
+            if tmp is not None:
+                tmp.unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self.downloads += 1
+            self.downloaded_bytes += size
+        return dest
+
+    def _artifact_path(self, sha256: str) -> Path | None:
+        if self.artifact_dir is None:
+            return None
+        return self.artifact_dir / sha256[:2] / sha256
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    # ---- metadata ----
+
+    def _cache_path(self, package: str) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{package.lower()}.json"
+
+    def _write_cache(self, path: Path | None, entry: dict) -> None:
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(entry))
+        os.replace(tmp, path)
+
+    def get_json(self, package: str) -> dict:
+        """Return the index's JSON metadata for *package*."""
+        cache_path = self._cache_path(package)
+        cached: dict | None = None
+        if cache_path is not None and cache_path.exists():
+            try:
+                cached = json.loads(cache_path.read_text())
+            except ValueError:
+                cached = None
+
+        if cached and time.time() - cached.get("fetched_at", 0) < self.cache_ttl:
+            with self._lock:
+                self.cache_hits += 1
+            return cached["data"]
+
+        headers = {"Accept": "application/json", "User-Agent": "vegitate-generate-formula"}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        url = f"{self.index_url}/{package}/json"
+        status, resp_headers, body = self.request(url, headers)
+
+        if status == 304 and cached:
+            with self._lock:
+                self.not_modified += 1
+            cached["fetched_at"] = time.time()
+            self._write_cache(cache_path, cached)
+            return cached["data"]
+        if status != 200:
+            raise RuntimeError(f"HTTP {status} from {url}")
+
+        data = json.loads(body)
+        self._write_cache(
+            cache_path,
+            {"etag": resp_headers.get("etag"), "fetched_at": time.time(), "data": data},
+        )
+        return data
+
+
+def fetch_metadata(package: str, client: PyPIClient) -> dict:
+    """Return the index's JSON metadata for *package*.
 
     Raises immediately on network/SSL errors instead of silently falling back.
     """
-    url = f"https://pypi.org/pypi/{package}/json"
     try:
-        with urllib.request.urlopen(url, timeout=30) as resp:
-            data = json.loads(resp.read())
+        return client.get_json(package)
     except Exception as exc:
+        url = f"{client.index_url}/{package}/json"
         raise RuntimeError(
             f"Failed to fetch PyPI metadata for '{package}' from {url}\n"
             f"  → {type(exc).__name__}: {exc}\n"
@@ -62,6 +332,9 @@ def fetch_sdist_info(package: str) -> tuple[str, str, str]:
             f"  (replace 3.XX with your Python version)"
         ) from exc
 
+
+def sdist_from_metadata(package: str, data: dict) -> tuple[str, str, str]:
+    """Pick the sdist (name, url, sha256) for the latest version out of *data*."""
     version = data["info"]["version"]
     name = data["info"]["name"]
 
@@ -86,23 +359,126 @@ def fetch_sdist_info(package: str) -> tuple[str, str, str]:
     raise RuntimeError(f"No sdist found for {package} {version}")
 
 
-def build_formula(version: str, head_only: bool = False) -> str:
-    # Fetch all resource blocks
-    resources: list[str] = []
-    for dep in PYPI_DEPS:
-        print(f"  Fetching {dep} ...")
-        name, url, sha = fetch_sdist_info(dep)
-        resources.append(
-            f'  resource "{name}" do\n'
-            f'    url "{url}"\n'
-            f'    sha256 "{sha}"\n'
-            f"  end"
+# ---------------------------------------------------------------------------
+# Lockfile
+# ---------------------------------------------------------------------------
+
+def resolve_dep(
+    package: str, client: PyPIClient, locked: dict | None,
+) -> tuple[dict, bool]:
+    """Resolve *package* to a lock entry; returns (entry, changed).
+
+    The locked entry is kept as-is while PyPI's latest version matches it,
+    so url and sha256 only ever change when the version does.
+    """
+    data = fetch_metadata(package, client)
+    version = data["info"]["version"]
+    if locked is not None and locked["version"] == version:
+        return locked, False
+    name, url, sha = sdist_from_metadata(package, data)
+    return {"name": name, "version": version, "url": url, "sha256": sha}, True
+
+
+def read_lock(path: Path) -> dict[str, dict]:
+    """Return the lockfile's entries keyed by dependency, or {} if absent."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())["dependencies"]
+
+
+def render_lock(entries: dict[str, dict]) -> str:
+    # PYPI_DEPS order and fixed formatting, so an unchanged lock is
+    # byte-for-byte identical and never shows up in git.
+    payload = {
+        "version": LOCK_VERSION,
+        "dependencies": {
+            dep: {k: entries[dep][k] for k in ("name", "version", "url", "sha256")}
+            for dep in PYPI_DEPS
+        },
+    }
+    return json.dumps(payload, indent=2) + "\n"
+
+
+def write_lock(path: Path, entries: dict[str, dict]) -> None:
+    path.write_text(render_lock(entries))
+
+
+def lock_from_formula(text: str) -> dict[str, dict]:
+    """Seed a lock from the resource blocks of an existing formula.
+
+    Versions are read back out of the sdist filenames
+    (``<name>-<version>.tar.gz``), which is what PyPI serves for sdists.
+    """
+    by_name = {dep.lower(): dep for dep in PYPI_DEPS}
+    entries: dict[str, dict] = {}
+    for match in RESOURCE_RE.finditer(text):
+        dep = by_name.get(match["name"].lower())
+        if dep is None:
+            continue
+        filename = match["url"].rsplit("/", 1)[-1]
+        stem = filename.removesuffix(".tar.gz").removesuffix(".zip")
+        entries[dep] = {
+            "name": match["name"],
+            "version": stem.rpartition("-")[2],
+            "url": match["url"],
+            "sha256": match["sha256"],
+        }
+    return entries
+
+
+# ---------------------------------------------------------------------------
+# Formula
+# ---------------------------------------------------------------------------
+
+RESOURCE_RE = re.compile(
+    r'^  resource "(?P<name>[^"]+)" do\n'
+    r'    url "(?P<url>[^"]+)"\n'
+    r'    sha256 "(?P<sha256>[^"]+)"\n'
+    r"  end$",
+    re.MULTILINE,
+)
+
+
+def render_resource(entry: dict) -> str:
+    return (
+        f'  resource "{entry["name"]}" do\n'
+        f'    url "{entry["url"]}"\n'
+        f'    sha256 "{entry["sha256"]}"\n'
+        f"  end"
+    )
+
+
+def verify_artifacts(entries: dict[str, dict], client: PyPIClient, jobs: int = 4) -> None:
+    """Download every locked sdist concurrently and check its sha256.
+
+    Artifacts already in the cache were verified when they were stored and
+    are not downloaded again.  Raises RuntimeError naming every mismatch.
+    """
+    print(f"  Verifying {len(entries)} sdists ...")
+
+    def verify(dep: str) -> str | None:
+        entry = entries[dep]
+        try:
+            client.download(entry["url"], entry["sha256"])
+        except Exception as exc:
+            return f"{dep} {entry['version']}: {exc}"
+        return None
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        failures = [f for f in pool.map(verify, PYPI_DEPS) if f is not None]
+    print(
+        f"  {client.downloads} downloaded ({client.downloaded_bytes / 1e6:.1f} MB), "
+        f"{client.artifact_hits} already verified in cache"
+    )
+    if failures:
+        raise RuntimeError(
+            "sdist verification failed:\n  " + "\n  ".join(failures)
         )
 
-    resource_block = "\n\n".join(resources)
 
+def check_unique_shas(entries: dict[str, dict]) -> None:
     # Sanity check: every resource must have a unique SHA.
-    shas = [line.split('"')[1] for r in resources for line in r.splitlines() if "sha256" in line]
+    shas = [entries[dep]["sha256"] for dep in PYPI_DEPS]
     if len(shas) != len(set(shas)):
         raise RuntimeError(
             "BUG: duplicate SHA256 detected across resources — "
@@ -110,26 +486,58 @@ def build_formula(version: str, head_only: bool = False) -> str:
             f"  SHAs: {shas}"
         )
 
+
+def patch_formula(text: str, old: dict[str, dict], new: dict[str, dict]) -> str | None:
+    """Rewrite only the resource blocks whose lock entry changed.
+
+    Everything else — including the release url/sha256 filled in by
+    release.sh — is left untouched.  Returns None if a changed resource
+    has no block in *text* to patch, so the caller can fall back to
+    regenerating the whole formula.
+    """
+    blocks = {m["name"].lower(): m for m in RESOURCE_RE.finditer(text)}
+    edits: list[tuple[int, int, str]] = []
+    for dep in PYPI_DEPS:
+        if old.get(dep) == new[dep]:
+            continue
+        previous = old.get(dep, new[dep])
+        match = blocks.get(previous["name"].lower())
+        if match is None:
+            return None
+        edits.append((match.start(), match.end(), render_resource(new[dep])))
+
+    # Apply back to front so earlier offsets stay valid.
+    for start, end, block in sorted(edits, reverse=True):
+        text = text[:start] + block + text[end:]
+    return text
+
+
+def build_formula(version: str, entries: dict[str, dict], head_only: bool = False) -> str:
+    resource_block = "\n\n".join(render_resource(entries[dep]) for dep in PYPI_DEPS)
+
     if head_only:
         url_block = '  head "https://github.com/silent-lad/homebrew-vegitate.git", branch: "main"'
     else:
-        url_block = textwrap.dedent(f"""\
-          url "https://github.com/silent-lad/homebrew-vegitate/archive/refs/tags/v{version}.tar.gz"
-          # After creating the GitHub release, fill in the real sha256 with:
-          #   brew fetch --force vegitate
-          # or:
-          #   curl -sL <url> | shasum -a 256
-          sha256 "RELEASE_SHA256"
-          license "MIT"
-          head "https://github.com/silent-lad/homebrew-vegitate.git", branch: "main\"""")
-
-    formula = textwrap.dedent(f"""\
+        url_block = textwrap.indent(textwrap.dedent(f"""\
+            url "https://github.com/silent-lad/homebrew-vegitate/archive/refs/tags/v{version}.tar.gz"
+            # After creating the GitHub release, fill in the real sha256 with:
+            #   brew fetch --force vegitate
+            # or:
+            #   curl -sL <url> | shasum -a 256
+            sha256 "RELEASE_SHA256"
+            license "MIT"
+            head "https://github.com/silent-lad/homebrew-vegitate.git", branch: "main\""""), "  ")
+
+    # Dedent the template *before* filling it in: the blocks span several
+    # lines and would otherwise throw off dedent's common-prefix detection.
+
+    formula = textwrap.dedent("""\
         class Vegitate < Formula
           include Language::Python::Virtualenv
 
           desc "Keep your Mac caffeinated while locking all keyboard and mouse input"
           homepage "https://github.com/silent-lad/homebrew-vegitate"
-          {url_block}
+        {url_block}
 
           depends_on :macos
           depends_on "python@3.13"
@@ -156,7 +564,7 @@ def build_formula(version: str, head_only: bool = False) -> str:
             assert_match version.to_s, shell_output("#{{bin}}/vegitate --version")
           end
         end
-    """)
+    """).format(url_block=url_block, resource_block=resource_block)
     return formula
 
 
@@ -168,16 +576,161 @@ def main() -> None:
         action="store_true",
         help="Generate HEAD-only formula (no release tarball needed)",
     )
+    parser.add_argument(
+        "--index-url",
+        default=DEFAULT_INDEX_URL,
+        help=f"PyPI JSON API base URL (default: {DEFAULT_INDEX_URL})",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="use cached metadata younger than this without revalidating (default: 0)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="don't read or write the on-disk metadata cache",
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=4,
+        help="concurrent fetches / pooled connections (default: 4)",
+    )
+    parser.add_argument(
+        "-o", "--output",
+        type=Path,
+        default=FORMULA_PATH,
+        help=f"where to write the formula (default: {FORMULA_PATH.relative_to(ROOT)})",
+    )
+    parser.add_argument(
+        "--lockfile",
+        type=Path,
+        default=LOCK_PATH,
+        help=f"resolved-dependency lockfile (default: {LOCK_PATH.relative_to(ROOT)})",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="don't query the index; render straight from the lockfile",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="download every sdist and check its sha256 before writing anything",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="regenerate the whole formula instead of patching changed resources",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="print a unified diff of the formula changes; like diff(1), exit 1 "
+             "if the formula or the lockfile changed (or would, with --dry-run)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="don't write the formula or the lockfile",
+    )
     args = parser.parse_args()
 
     version = args.version or get_version_from_source()
     print(f"Generating formula for vegitate v{version}")
     print()
 
-    formula = build_formula(version, head_only=args.head_only)
-    FORMULA_PATH.write_text(formula)
+    current = args.output.read_text() if args.output.exists() else None
+    locked = read_lock(args.lockfile)
+    if not locked and current is not None:
+        locked = lock_from_formula(current)
+        print(f"  No lockfile — seeded {len(locked)} entries from {args.output.name}")
+
+    client = PyPIClient(
+        args.index_url,
+        cache_dir=None if args.no_cache else CACHE_DIR,
+        cache_ttl=args.cache_ttl,
+        artifact_dir=None if args.no_cache else ARTIFACT_DIR,
+    )
+    try:
+        if args.offline:
+            missing = [dep for dep in PYPI_DEPS if dep not in locked]
+            if missing:
+                raise SystemExit(
+                    f"  Error: --offline but not locked: {', '.join(missing)}"
+                )
+            entries = {dep: locked[dep] for dep in PYPI_DEPS}
+        else:
+            # Resolve all dependencies concurrently; each worker reuses its
+            # keep-alive connection for the packages it gets.
+            print(f"  Checking {len(PYPI_DEPS)} packages on {client.index_url} ...")
+            with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+                try:
+                    resolved = list(pool.map(
+                        lambda dep: resolve_dep(dep, client, locked.get(dep)), PYPI_DEPS,
+                    ))
+                except RuntimeError as exc:
+                    raise SystemExit(f"  Error: {exc}") from None
+            print(
+                f"  {client.requests} request(s), {client.not_modified} not modified, "
+                f"{client.cache_hits} served from cache"
+            )
+            entries = {dep: entry for dep, (entry, _) in zip(PYPI_DEPS, resolved)}
+
+        check_unique_shas(entries)
+        if args.verify:
+            verify_artifacts(entries, client, jobs=args.jobs)
+    finally:
+        client.close()
+
+    for dep in PYPI_DEPS:
+        before = locked.get(dep)
+        if before is None:
+            print(f"  + {dep} {entries[dep]['version']}")
+        elif before != entries[dep]:
+            print(f"  ↑ {dep} {before['version']} → {entries[dep]['version']}")
+
+    # Patch in place unless the formula's frame itself has to change.
+    formula = None
+    if current is not None and not (args.full or args.version or args.head_only):
+        formula = patch_formula(current, locked, entries)
+        if formula is None:
+            print("  Resource blocks don't match the lockfile — regenerating")
+    if formula is None:
+        formula = build_formula(version, entries, head_only=args.head_only)
+
+    if args.diff:
+        print()
+        sys.stdout.writelines(difflib.unified_diff(
+            (current or "").splitlines(keepends=True),
+            formula.splitlines(keepends=True),
+            fromfile=f"a/{args.output.name}",
+            tofile=f"b/{args.output.name}",
+        ))
+
+    lock = render_lock(entries)
+    lock_current = args.lockfile.read_text() if args.lockfile.exists() else None
+
     print()
-    print(f"Written to {FORMULA_PATH}")
+    if formula == current:
+        print(f"{args.output} is up to date")
+    elif args.dry_run:
+        print(f"{args.output} would change (dry run, nothing written)")
+    else:
+        args.output.write_text(formula)
+        print(f"Written to {args.output}")
+    if lock != lock_current:
+        if args.dry_run:
+            print(f"{args.lockfile} would change (dry run, nothing written)")
+        else:
+            write_lock(args.lockfile, entries)
+            print(f"Written to {args.lockfile}")
+
+    if args.diff and (formula != current or lock != lock_current):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,244 @@
+"""Keep the Mac awake while input is locked — pluggable backends.
+
+Every backend has the same small interface: :meth:`start` at lock,
+:meth:`stop` at unlock, :attr:`active` while it's holding the Mac awake, and
+a :attr:`restarts` count.  :func:`open_backend` picks one by name:
+
+``assertion``
+    IOKit power assertions, created in-process through ctypes — the same
+    three ``caffeinate -dis`` takes (display, idle and system sleep).  Taking
+    and releasing them is a couple of Mach calls, no fork/exec, and the
+    kernel drops them by itself if vegitate dies, so nothing is left behind.
+``caffeinate``
+    The ``caffeinate -dis`` child, supervised: a thread waits on it, and if
+    it exits while the session is on it's started again (and reported).
+``fake``
+    Only remembers whether it's on.  For the stand-in Quartz backend, Linux
+    and tests.
+``auto``
+    ``assertion`` on macOS, falling back to ``caffeinate`` if IOKit can't be
+    loaded; ``fake`` anywhere else, where there's no Mac to keep awake.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from typing import Protocol
+
+from .config import KEEP_AWAKE_BACKENDS as BACKENDS
+
+# What `caffeinate -dis` asserts.
+_ASSERTION_TYPES = (
+    b"PreventUserIdleDisplaySleep",
+    b"PreventUserIdleSystemSleep",
+    b"PreventSystemSleep",
+)
+_ASSERTION_LEVEL_ON = 255
+_CF_STRING_ENCODING_UTF8 = 0x08000100
+
+# A caffeinate child that lived less than this is restarted only after it,
+# so one that can't start doesn't turn into a fork loop.
+_RESTART_BACKOFF = 1.0
+
+
+class KeepAwake(Protocol):
+    name: str
+    restarts: int
+
+    @property
+    def active(self) -> bool: ...
+
+    def start(self) -> None: ...
+
+    def stop(self) -> None: ...
+
+
+class AssertionBackend:
+    """IOKit power assertions held by this process.
+
+    Raises :class:`OSError` if IOKit can't be loaded (not macOS), or from
+    :meth:`start` if an assertion is refused.
+    """
+
+    name = "assertion"
+
+    def __init__(self) -> None:
+        try:
+            iokit = ctypes.CDLL("/System/Library/Frameworks/IOKit.framework/IOKit")
+            cf = ctypes.CDLL(
+                "/System/Library/Frameworks/CoreFoundation.framework/CoreFoundation"
+            )
+        except OSError as exc:
+            raise OSError(f"IOKit unavailable: {exc}") from None
+
+        self._create = iokit.IOPMAssertionCreateWithName
+        self._create.argtypes = [
+            ctypes.c_void_p, ctypes.c_uint32, ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint32),
+        ]
+        self._create.restype = ctypes.c_int32
+        self._release = iokit.IOPMAssertionRelease
+        self._release.argtypes = [ctypes.c_uint32]
+        self._release.restype = ctypes.c_int32
+        make_string = cf.CFStringCreateWithCString
+        make_string.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_uint32]
+        make_string.restype = ctypes.c_void_p
+
+        # Made once and kept for the life of the process.
+        self._types = [
+            make_string(None, t, _CF_STRING_ENCODING_UTF8) for t in _ASSERTION_TYPES
+        ]
+        self._reason = make_string(None, b"vegitate: input locked", _CF_STRING_ENCODING_UTF8)
+        self._ids: list[int] = []
+        self.restarts = 0
+
+    @property
+    def active(self) -> bool:
+        return bool(self._ids)
+
+    def start(self) -> None:
+        if self._ids:
+            return
+        for kind in self._types:
+            assertion = ctypes.c_uint32(0)
+            result = self._create(kind, _ASSERTION_LEVEL_ON, self._reason, ctypes.byref(assertion))
+            if result != 0:
+                self.stop()
+                raise OSError(f"IOPMAssertionCreateWithName failed (0x{result & 0xFFFFFFFF:x})")
+            self._ids.append(assertion.value)
+
+    def stop(self) -> None:
+        ids, self._ids = self._ids, []
+        for assertion in ids:
+            self._release(assertion)
+
+
+class CaffeinateBackend:
+    """A supervised ``caffeinate`` child.
+
+    *on_restart* is called (from the supervising thread) with the exit
+    status of a child that died during the session and was replaced.
+    :meth:`start` raises :class:`OSError` if the command can't be run.
+    """
+
+    name = "caffeinate"
+
+    def __init__(
+        self,
+        on_restart: Callable[[int], None] | None = None,
+        command: tuple[str, ...] = ("caffeinate", "-dis"),
+    ) -> None:
+        self.on_restart = on_restart
+        self.command = command
+        self.proc: subprocess.Popen | None = None
+        self.restarts = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._supervisor: threading.Thread | None = None
+
+    @property
+    def active(self) -> bool:
+        proc = self.proc
+        return proc is not None and proc.poll() is None
+
+    def start(self) -> None:
+        with self._lock:
+            if self.proc is not None:
+                return
+            self._stopped.clear()
+            self.proc = self._spawn()
+            self._supervisor = threading.Thread(
+                target=self._supervise, args=(self.proc,),
+                name="vegitate-caffeinate", daemon=True,
+            )
+            self._supervisor.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped.set()
+            proc, self.proc = self.proc, None
+            supervisor, self._supervisor = self._supervisor, None
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        if supervisor is not None and supervisor is not threading.current_thread():
+            supervisor.join(timeout=1)
+
+    def _spawn(self) -> subprocess.Popen:
+        return subprocess.Popen(
+            self.command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def _supervise(self, proc: subprocess.Popen) -> None:
+        while True:
+            started = time.monotonic()
+            status = proc.wait()
+            if time.monotonic() - started < _RESTART_BACKOFF:
+                if self._stopped.wait(_RESTART_BACKOFF):
+                    return
+            with self._lock:
+                if self._stopped.is_set() or self.proc is not proc:
+                    return  # stopped on purpose
+                try:
+                    proc = self.proc = self._spawn()
+                except OSError:
+                    self.proc = None
+                    return
+                self.restarts += 1
+            if self.on_restart is not None:
+                self.on_restart(status)
+
+
+class FakeBackend:
+    """Keeps nothing awake; records what it was asked to do."""
+
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.active = False
+        self.starts = 0
+        self.stops = 0
+        self.restarts = 0
+
+    def start(self) -> None:
+        self.active = True
+        self.starts += 1
+
+    def stop(self) -> None:
+        self.active = False
+        self.stops += 1
+
+
+def open_backend(
+    name: str = "auto", on_restart: Callable[[int], None] | None = None,
+) -> KeepAwake:
+    """The keep-awake backend called *name* (one of :data:`BACKENDS`).
+
+    Raises :class:`ValueError` on an unknown name, and :class:`OSError` if
+    ``assertion`` was asked for explicitly and IOKit isn't there.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown keep-awake backend '{name}' (one of {', '.join(BACKENDS)})")
+    if name == "auto":
+        if sys.platform != "darwin":
+            return FakeBackend()
+        try:
+            return AssertionBackend()
+        except OSError:
+            return CaffeinateBackend(on_restart)
+    if name == "assertion":
+        return AssertionBackend()
+    if name == "caffeinate":
+        return CaffeinateBackend(on_restart)
+    return FakeBackend()
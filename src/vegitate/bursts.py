@@ -0,0 +1,155 @@
+"""Rate detectors: "N presses of key K within W seconds", on event timestamps.
+
+The panic reset is one of these.  Each configured pattern — a single key, or
+keys that have to alternate (``"f1 f2"``: f1, f2, f1, f2, ...) — gets a
+:class:`RateDetector` holding the timestamps of its last N presses in a ring
+preallocated when it's compiled; :func:`compile_detectors` indexes them by
+keycode::
+
+    table = compile_detectors(["escape", "f1 f2"], taps=5, window=2.0)
+    for detector in table.get(keycode, ()):
+        if detector.press(keycode, CGEventGetTimestamp(event)):
+            ...  # N presses inside the window
+
+A key-down costs one dict lookup plus constant work per detector watching
+that key, however many patterns are configured, and allocates nothing.
+
+Times come from the event itself (``CGEventGetTimestamp``: system uptime in
+mach absolute time units), not the wall clock, so NTP corrections or a user
+changing the time can't trip or block a detector, and there's no syscall per
+press.  Those units are nanoseconds on Intel Macs but about 41.67 ns ticks on
+Apple Silicon, so the window is converted to them once, when the detectors
+are compiled, with the ``mach_timebase_info`` ratio — never per press.
+Should timestamps ever go backwards (a replayed stream starting over), the
+presses before the jump are forgotten rather than compared against.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+
+from .keys import KEY_MAP
+
+_timebase: tuple[int, int] | None = None
+
+
+def parse_pattern(text: str) -> tuple[int, ...]:
+    """Keycodes of a pattern like ``"escape"`` or ``"f1 f2"`` (alternating).
+
+    Raises :class:`ValueError` on an unknown or missing key.
+    """
+    names = text.lower().split()
+    if not names:
+        raise ValueError("Panic key is empty.")
+    for name in names:
+        if name not in KEY_MAP:
+            raise ValueError(f"Unknown panic key '{name}'")
+    return tuple(KEY_MAP[name] for name in names)
+
+
+def mach_timebase() -> tuple[int, int]:
+    """``(numer, denom)`` with ``ns = ticks * numer / denom`` for event timestamps.
+
+    ``(1, 1)`` off macOS, where the stand-in backend's timestamps are
+    nanoseconds already.  Read once per process.
+    """
+    global _timebase
+    if _timebase is None:
+        _timebase = _read_timebase() if sys.platform == "darwin" else (1, 1)
+    return _timebase
+
+
+def _read_timebase() -> tuple[int, int]:
+    import ctypes
+
+    class TimebaseInfo(ctypes.Structure):
+        _fields_ = [("numer", ctypes.c_uint32), ("denom", ctypes.c_uint32)]
+
+    info = TimebaseInfo()
+    try:
+        libsystem = ctypes.CDLL("/usr/lib/libSystem.B.dylib")
+        if libsystem.mach_timebase_info(ctypes.byref(info)) != 0 or not info.numer or not info.denom:
+            return 1, 1
+    except (OSError, AttributeError):
+        return 1, 1
+    return info.numer, info.denom
+
+
+class RateDetector:
+    """Fire on *taps* presses following *pattern* within *window* ticks.
+
+    *window* is in the units of the timestamps passed to :meth:`press`.
+
+    Presses must follow the pattern in turn; one out of turn starts the
+    count over (from that press, if it's the pattern's first key).
+    """
+
+    __slots__ = ("pattern", "taps", "window", "_times", "_head", "_seen", "_next", "_last")
+
+    def __init__(self, pattern: tuple[int, ...], taps: int, window: int) -> None:
+        self.pattern = pattern
+        self.taps = taps
+        self.window = window
+        self._times = array("Q", bytes(8 * taps))
+        self.reset()
+
+    def reset(self) -> None:
+        self._head = 0   # next slot to write; once full, the oldest press
+        self._seen = 0   # presses in the ring, up to taps
+        self._next = 0   # index into pattern of the key expected next
+        self._last = 0
+
+    def press(self, keycode: int, timestamp: int) -> bool:
+        """Count a key-down at *timestamp* (ticks); True if the burst is complete."""
+        if timestamp < self._last:
+            self.reset()  # the clock went backwards: start over
+        pattern = self.pattern
+        if keycode != pattern[self._next]:
+            self.reset()
+            if keycode != pattern[0]:
+                return False
+        self._last = timestamp
+
+        times = self._times
+        head = self._head
+        times[head] = timestamp
+        head += 1
+        if head == self.taps:
+            head = 0
+        self._head = head
+        nxt = self._next + 1
+        self._next = 0 if nxt == len(pattern) else nxt
+        if self._seen < self.taps:
+            self._seen += 1
+            if self._seen < self.taps:
+                return False
+        # times[head] is now the first of the last `taps` presses.
+        if timestamp - times[head] <= self.window:
+            self.reset()
+            return True
+        return False
+
+
+def compile_detectors(
+    patterns: list[str], taps: int, window: float,
+    timebase: tuple[int, int] | None = None,
+) -> dict[int, tuple[RateDetector, ...]]:
+    """One :class:`RateDetector` per pattern, indexed by the keys it watches.
+
+    *window* is in seconds; it's converted to event timestamp ticks with
+    *timebase* (``(numer, denom)``, default :func:`mach_timebase`).  Empty
+    if *taps* is 0 (detection off).  Raises :class:`ValueError` if a pattern
+    doesn't parse.
+    """
+    parsed = [parse_pattern(p) for p in patterns]
+    if taps <= 0:
+        return {}
+    numer, denom = timebase or mach_timebase()
+    ticks = int(window * 1_000_000_000) * denom // numer
+    table: dict[int, tuple[RateDetector, ...]] = {}
+    for pattern in parsed:
+        detector = RateDetector(pattern, taps, ticks)
+        for keycode in set(pattern):
+            table[keycode] = table.get(keycode, ()) + (detector,)
+    return table
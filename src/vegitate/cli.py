@@ -4,11 +4,23 @@ from __future__ import annotations
 
 import argparse
 import sys
+import time
+from pathlib import Path
 
 from . import __version__
-from .config import CONFIG_PATH, load_config, write_default_config
-from .keys import parse_combo
-from .core import Vegitate
+from .config import (
+    CONFIG_PATH,
+    DEFAULT_STATUS_PORT,
+    HISTORY_PATH,
+    JOURNAL_PATH,
+    KEEP_AWAKE_BACKENDS,
+    SOCKET_PATH,
+    STATS_PATH,
+    ConfigError,
+    load_config,
+    parse_address,
+    write_default_config,
+)
 
 
 def cmd_init() -> None:
@@ -23,38 +35,393 @@ def cmd_init() -> None:
     print("  Edit it to customise your unlock combo, panic key, etc.")
 
 
-def cmd_run(args: argparse.Namespace, config: dict) -> None:
-    """Main lock command."""
+def _combos(args: argparse.Namespace, config: dict) -> list[str]:
+    """Unlock combos from -c flags, else from config (a string or a list)."""
+    if args.combo is not None:
+        return list(args.combo)
+    combo = config["combo"]
+    if isinstance(combo, list):
+        return [str(c) for c in combo]
+    return [str(combo)]
+
+
+def _panic_keys(config: dict) -> list[str]:
+    """Panic keys (or alternating patterns) from config: a string or a list."""
+    panic_key = config.get("panic_key", "escape")
+    if isinstance(panic_key, list):
+        return [str(p) for p in panic_key]
+    return [str(panic_key)]
+
+
+def cmd_replay(args: argparse.Namespace, config: dict) -> None:
+    """Benchmark the tap callback against a recorded or synthetic stream."""
+    import json
+
+    # Must come first: installs the stand-in Quartz backend.
+    from .replay import load, replay, synthetic_session
+    from .recording import write_records
+
+    combos = _combos(args, config)
+    panic_keys = _panic_keys(config)
+
+    try:
+        if args.file is not None:
+            records = load(args.file)
+        else:
+            records = list(
+                synthetic_session(args.synthetic, combos[0], panic_keys[0], seed=args.seed)
+            )
+    except (OSError, ValueError) as exc:
+        print(f"  Error: {exc}")
+        sys.exit(1)
+
+    if args.save is not None:
+        write_records(args.save, records)
+        print(f"  Saved {len(records):,} events to {args.save}")
+
+    try:
+        result = replay(
+            records,
+            combo=combos,
+            allow_mouse_move=args.allow_mouse_move or bool(config["allow_mouse_move"]),
+            passthrough=dict(config.get("passthrough") or {}),
+            panic_key=panic_keys,
+            panic_taps=int(config.get("panic_taps", 5)),
+            panic_window=float(config.get("panic_window", 2.0)),
+        )
+    except ValueError as exc:
+        print(f"  Error: {exc}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"  Events     : {result['events']:,}")
+    print(f"  Throughput : {result['events_per_sec']:,.0f} events/sec")
+    print(
+        f"  Latency    : p50 {result['p50_us']:.2f} µs · "
+        f"p99 {result['p99_us']:.2f} µs · p999 {result['p999_us']:.2f} µs · "
+        f"max {result['max_us']:.2f} µs"
+    )
+    print(f"  Unlocks    : {result['unlocks']}")
+
+
+def _session_options(args: argparse.Namespace, config: dict) -> dict[str, object]:
+    """Vegitate() keyword arguments from CLI flags and config.
+
+    Raises :class:`ValueError` on a bad combo or passthrough rule.
+    """
+    from .combos import compile_sequences
+    from .policy import compile_passthrough
+
     # CLI flags override config. argparse defaults are None for optional args
     # so we can detect when a flag was explicitly passed.
-    combo = args.combo if args.combo is not None else str(config["combo"])
+    combos = _combos(args, config)
     allow_mouse = args.allow_mouse_move or bool(config["allow_mouse_move"])
     use_caffeinate = bool(config["caffeinate"]) if not args.no_caffeinate else False
+    keep_awake = args.keep_awake or str(config["keep_awake"])
+    split_taps = args.split_taps or bool(config["split_taps"])
 
     # Panic settings from config only (no CLI flags for these).
-    panic_key = str(config.get("panic_key", "escape"))
+    panic_key = _panic_keys(config)
     panic_taps = int(config.get("panic_taps", 5))
     panic_window = float(config.get("panic_window", 2.0))
 
-    # Validate combo early.
+    passthrough = dict(config.get("passthrough") or {})
+
+    metrics_path = args.metrics_file
+    if metrics_path is None and config["metrics_file"]:
+        metrics_path = Path(str(config["metrics_file"])).expanduser()
+    status_addr = args.status_addr or str(config["status_addr"])
+    status_address = parse_address(status_addr) if status_addr else None
+
+    metrics_interval = float(config["metrics_interval"])
+    if args.metrics_interval is not None:
+        if args.metrics_interval <= 0:
+            raise ValueError("--metrics-interval must be a positive number of seconds")
+        metrics_interval = args.metrics_interval
+
+    # Validate combos and passthrough rules early.
+    compile_sequences(combos)
+    compile_passthrough(passthrough, allow_mouse)
+
+    return {
+        "unlock_combo": combos,
+        "allow_mouse_move": allow_mouse,
+        "use_caffeinate": use_caffeinate,
+        "keep_awake": keep_awake,
+        "panic_key": panic_key,
+        "panic_taps": panic_taps,
+        "panic_window": panic_window,
+        "stats_path": args.stats_file,
+        "journal_path": args.journal_file if args.journal else None,
+        "history_path": None if args.no_history else args.history_file,
+        "metrics_path": metrics_path,
+        "metrics_interval": metrics_interval,
+        "status_address": status_address,
+        "guard_budget_ms": float(config["guard_budget_ms"]),
+        "passthrough": passthrough,
+        "split_taps": split_taps,
+    }
+
+
+def _checked_options(args: argparse.Namespace, config: dict) -> dict[str, object]:
+    """_session_options(), exiting with the error on bad input."""
     try:
-        parse_combo(combo)
+        options = _session_options(args, config)
     except ValueError as exc:
         print(f"  Error: {exc}")
         sys.exit(1)
+    if not args.no_watch:
+        # Re-read on every change to the config file; CLI flags still win.
+        options["reload_options"] = lambda: _session_options(args, load_config())
+    return options
+
+
+def cmd_run(args: argparse.Namespace, config: dict, started: float) -> None:
+    """Main lock command."""
+    from .stats import StartupTimings
+
+    startup = StartupTimings(started)
+    startup.mark("config loaded")
+    from .core import Vegitate
+
+    startup.mark("core imported")
+
+    options = _checked_options(args, config)
+    display_process = args.display_process or bool(config["display_process"])
 
     vegitate = Vegitate(
-        unlock_combo=combo,
-        allow_mouse_move=allow_mouse,
-        use_caffeinate=use_caffeinate,
-        panic_key=panic_key,
-        panic_taps=panic_taps,
-        panic_window=panic_window,
+        **options,
+        record_path=args.record,
+        display_process=display_process,
+        startup=startup,
+        show_timings=args.timings,
     )
     vegitate.run()
 
 
+def cmd_daemon(args: argparse.Namespace, config: dict) -> None:
+    """Run the pre-warmed lock daemon."""
+    if args.simulate:
+        # Must come before anything imports Quartz.
+        from . import simulate
+
+        simulate.install()
+    from .daemon import VegitateDaemon
+
+    VegitateDaemon(socket_path=args.socket, **_checked_options(args, config)).run()
+
+
+def cmd_control(args: argparse.Namespace) -> None:
+    """lock / unlock / status: one request to a running daemon."""
+    from .control import request
+
+    try:
+        reply = request(args.command, args.socket)
+    except OSError as exc:
+        print(f"  Error: no vegitate daemon on {args.socket} ({exc.strerror or exc})")
+        print("  Start one with: vegitate daemon")
+        sys.exit(1)
+    except ValueError as exc:
+        print(f"  Error: {exc}")
+        sys.exit(1)
+    if not reply.get("ok"):
+        print(f"  Error: {reply.get('error', 'request failed')}")
+        sys.exit(1)
+
+    if reply["locked"]:
+        since = time.strftime("%H:%M:%S", time.localtime(reply["locked_since"]))
+        print(f"  Locked since {since} · unlock with {reply['combo']}")
+    else:
+        print("  Unlocked")
+    if args.command == "status":
+        print(f"  Daemon pid {reply['pid']} · v{reply['version']} · "
+              f"{reply['sessions']} session(s)")
+
+
+def cmd_stats(args: argparse.Namespace) -> None:
+    """Summarise the event journal — works while a session is running."""
+    import json
+    import os
+
+    from .journal import summarize
+
+    try:
+        summary = summarize(args.journal_file)
+    except FileNotFoundError:
+        print(f"  Error: no journal at {args.journal_file}")
+        print("  Sessions only keep one when started with --journal.")
+        sys.exit(1)
+    except (OSError, ValueError) as exc:
+        print(f"  Error: {exc}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    try:
+        os.kill(summary["pid"], 0)
+        writer = f"pid {summary['pid']}, running"
+    except ProcessLookupError:
+        writer = f"pid {summary['pid']}, exited"
+    except PermissionError:
+        writer = f"pid {summary['pid']}"
+
+    def clock(ts: float | None) -> str:
+        return "—" if ts is None else time.strftime("%H:%M:%S", time.localtime(ts))
+
+    print(f"  Journal    : {summary['path']} ({writer})")
+    print(f"  Covers     : {clock(summary['from'])} – {clock(summary['to'])} · "
+          f"{summary['records']:,} records", end="")
+    if summary["overwritten"]:
+        print(f" ({summary['overwritten']:,} older ones overwritten)")
+    else:
+        print()
+    print(f"  Sessions   : {summary['sessions']} · unlocks {summary['unlocks']} · "
+          f"panic taps {summary['panic_taps']} · "
+          f"wrong-combo attempts {summary['wrong_combo_attempts']}")
+    print(f"  Suppressed : {summary['suppressed_total']:,} events")
+    if not summary["events"]:
+        return
+    print()
+    print(f"  {'event':<24} {'suppressed':>11} {'passed':>9} "
+          f"{'p50 µs':>8} {'p99 µs':>8} {'max µs':>9}")
+    for name, row in summary["events"].items():
+        print(f"  {name:<24} {row['suppressed']:>11,} {row['passed']:>9,} "
+              f"{row['p50_us']:>8g} {row['p99_us']:>8g} {row['max_us']:>9.1f}")
+
+
+def _fmt_duration(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+def cmd_history(args: argparse.Namespace) -> None:
+    """Past sessions: totals and locked time per day."""
+    import json
+    import sqlite3
+    from datetime import date, datetime, timedelta
+
+    from .history import summarize
+
+    try:
+        until = (
+            datetime.combine(date.fromisoformat(args.until), datetime.min.time())
+            if args.until else datetime.now()
+        )
+        since = (
+            datetime.combine(date.fromisoformat(args.since), datetime.min.time())
+            if args.since
+            else datetime.combine(until.date() - timedelta(days=args.days - 1), datetime.min.time())
+        )
+    except ValueError as exc:
+        print(f"  Error: {exc} (dates are YYYY-MM-DD)")
+        sys.exit(1)
+
+    try:
+        summary = summarize(args.history_file, since.timestamp(), until.timestamp())
+    except FileNotFoundError:
+        print(f"  No session history at {args.history_file} yet.")
+        return
+    except sqlite3.Error as exc:
+        print(f"  Error: can't read {args.history_file}: {exc}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    unlocks = summary["unlocks"]
+    print(f"  Range      : {since:%Y-%m-%d} – {until:%Y-%m-%d %H:%M}")
+    print(f"  Sessions   : {summary['sessions']:,} · locked "
+          f"{_fmt_duration(summary['locked_seconds'])} in total")
+    print(f"  Unlocked by: combo {unlocks['combo']} · panic {unlocks['panic']} "
+          f"({summary['panic_rate']:.1%}) · command {unlocks['command']} · "
+          f"signal {unlocks['signal']}")
+    if not summary["days"]:
+        return
+    print()
+    print(f"  {'day':<12} {'sessions':>8} {'locked':>9} {'panic':>6}")
+    for day in summary["days"]:
+        print(f"  {day['day']:<12} {day['sessions']:>8} "
+              f"{_fmt_duration(day['locked_seconds']):>9} {day['panic']:>6}")
+
+
+def cmd_fleet(args: argparse.Namespace) -> None:
+    """Poll many hosts' status endpoints concurrently; print one table."""
+    import asyncio
+    import json
+
+    from .fleet import FleetPoller, summarize
+
+    hosts = list(args.hosts)
+    if args.hosts_file is not None:
+        try:
+            lines = args.hosts_file.read_text().splitlines()
+        except OSError as exc:
+            print(f"  Error: can't read {args.hosts_file}: {exc.strerror or exc}")
+            sys.exit(1)
+        hosts += [h for h in (line.split("#")[0].strip() for line in lines) if h]
+    if not hosts:
+        print("  Error: no hosts given (pass HOST[:PORT]... or --hosts-file)")
+        sys.exit(1)
+    try:
+        poller = FleetPoller(hosts, timeout=args.timeout, concurrency=args.concurrency)
+    except ValueError as exc:
+        print(f"  Error: {exc}")
+        sys.exit(1)
+
+    def show(results: list[dict], elapsed: float) -> None:
+        if args.json:
+            print(json.dumps({"summary": summarize(results), "hosts": results}, indent=2))
+            return
+        width = max(len(r["host"]) for r in results)
+        print(f"  {'host':<{width}}  {'state':<8} {'locked for':>10}  "
+              f"{'caffeinate':<10} {'version':<8} {'latency':>9}")
+        for r in results:
+            status = r["status"]
+            if status is None:
+                print(f"  {r['host']:<{width}}  {'down':<8} {r['error']}")
+                continue
+            state = "LOCKED" if status["locked"] else "unlocked"
+            locked_for = status.get("locked_for")
+            since = "—" if locked_for is None else _fmt_duration(locked_for)
+            print(f"  {r['host']:<{width}}  {state:<8} {since:>10}  "
+                  f"{status.get('caffeinate', '?'):<10} {status.get('version', '?'):<8} "
+                  f"{r['latency_ms']:>6.1f} ms")
+        counts = summarize(results)
+        print(f"\n  {counts['hosts']} hosts · {counts['locked']} locked · "
+              f"{counts['unlocked']} unlocked · {counts['unreachable']} unreachable · "
+              f"polled in {elapsed:.2f} s")
+
+    async def run() -> list[dict]:
+        try:
+            while True:
+                start = time.perf_counter()
+                results = await poller.poll()
+                show(results, time.perf_counter() - start)
+                if args.watch is None:
+                    return results
+                await asyncio.sleep(args.watch)
+                print()
+        finally:
+            await poller.close()
+
+    try:
+        results = asyncio.run(run())
+    except KeyboardInterrupt:
+        return
+    if any(not r["ok"] for r in results):
+        sys.exit(1)
+
+
 def main() -> None:
+    # Startup phases (--timings) are measured from here.
+    started = time.perf_counter()
+
     parser = argparse.ArgumentParser(
         prog="vegitate",
         description="Keep your Mac caffeinated while locking all input.",
@@ -63,8 +430,18 @@ def main() -> None:
 \033[1mexamples:\033[0m
   vegitate                          # lock with config / default combo
   vegitate -c ctrl+shift+q          # override combo for this session
+  vegitate -c ctrl+shift+q -c ctrl+alt+l   # accept either combo
+  vegitate -c "ctrl+cmd+u g"        # sequence: ctrl+cmd+u, then g
   vegitate --allow-mouse-move       # let cursor move (clicks blocked)
   vegitate init                     # create config file
+  vegitate replay                   # benchmark the callback (synthetic traffic)
+  vegitate --record session.bin     # capture events for `vegitate replay`
+  vegitate daemon                   # pre-warmed lock process, then:
+  vegitate lock / unlock / status   #   control it over its socket
+  vegitate --journal                # keep a journal for `vegitate stats`
+  vegitate stats                    # what the current/last session blocked
+  vegitate history --days 7         # past sessions, locked time per day
+  vegitate fleet -f hosts.txt       # which of many Macs are locked
 
 \033[1mconfig:\033[0m
   %(prog)s reads from ~/.config/vegitate/config.toml
@@ -74,6 +451,7 @@ def main() -> None:
 \033[1mcombo format:\033[0m
   modifiers : ctrl, cmd (command), shift, alt (option, opt)
   keys      : a-z, 0-9, f1-f12, space, return, escape, tab, delete
+  sequence  : steps separated by spaces; only the first needs a modifier
 
 \033[1mnote:\033[0m
   Requires Accessibility permission in System Settings.
@@ -88,11 +466,92 @@ def main() -> None:
     sub = parser.add_subparsers(dest="command")
     sub.add_parser("init", help="create default config at ~/.config/vegitate/config.toml")
 
+    replay_parser = sub.add_parser(
+        "replay",
+        help="benchmark the event callback against a recording (no Mac needed)",
+    )
+    replay_parser.add_argument(
+        "file",
+        nargs="?",
+        type=Path,
+        help="recording made with --record (default: a synthetic stream)",
+    )
+    replay_parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=1_000_000,
+        metavar="N",
+        help="size of the synthetic stream when no file is given (default: 1000000)",
+    )
+    replay_parser.add_argument("--seed", type=int, default=0, help="synthetic stream seed")
+    replay_parser.add_argument(
+        "--save",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="also write the replayed stream to PATH as a recording",
+    )
+    replay_parser.add_argument("--json", action="store_true", help="print results as JSON")
+
+    daemon_parser = sub.add_parser(
+        "daemon",
+        help="run a pre-warmed lock daemon controlled with lock/unlock/status",
+    )
+    daemon_parser.add_argument(
+        "--simulate",
+        action="store_true",
+        help="use the stand-in input backend (no real input is locked; for testing)",
+    )
+    sub.add_parser("lock", help="lock input via the running daemon")
+    sub.add_parser("unlock", help="unlock input via the running daemon")
+    sub.add_parser("status", help="show the running daemon's state")
+    stats_parser = sub.add_parser(
+        "stats",
+        help="summarise the event journal (works while a session is running)",
+    )
+    stats_parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    history_parser = sub.add_parser(
+        "history",
+        help="past sessions: locked time per day, how they were unlocked",
+    )
+    history_parser.add_argument(
+        "--days", type=int, default=30, help="how many days back (default: 30)",
+    )
+    history_parser.add_argument("--since", metavar="YYYY-MM-DD", help="first day to include")
+    history_parser.add_argument("--until", metavar="YYYY-MM-DD", help="day to stop before")
+    history_parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+
+    fleet_parser = sub.add_parser(
+        "fleet",
+        help="poll the status endpoints of many vegitate hosts at once",
+    )
+    fleet_parser.add_argument(
+        "hosts", nargs="*", metavar="HOST[:PORT]",
+        help=f"hosts to poll (port defaults to {DEFAULT_STATUS_PORT})",
+    )
+    fleet_parser.add_argument(
+        "-f", "--hosts-file", type=Path, default=None, metavar="PATH",
+        help="read more hosts from PATH, one per line (# starts a comment)",
+    )
+    fleet_parser.add_argument(
+        "--timeout", type=float, default=2.0, help="per-host timeout in seconds (default: 2)",
+    )
+    fleet_parser.add_argument(
+        "--concurrency", type=int, default=64, help="requests in flight at once (default: 64)",
+    )
+    fleet_parser.add_argument(
+        "--watch", type=float, default=None, metavar="SECONDS",
+        help="poll again every SECONDS, reusing connections, until Ctrl-C",
+    )
+    fleet_parser.add_argument("--json", action="store_true", help="print the results as JSON")
+
     parser.add_argument(
         "-c", "--combo",
+        action="append",
         default=None,
         metavar="COMBO",
-        help="unlock key combination (default: from config or ctrl+cmd+u)",
+        help="unlock key combination or sequence; repeat for several "
+             "(default: from config or ctrl+cmd+u)",
     )
     parser.add_argument(
         "--allow-mouse-move",
@@ -106,15 +565,139 @@ def main() -> None:
         default=False,
         help="don't start caffeinate (useful if already running externally)",
     )
+    parser.add_argument(
+        "--keep-awake",
+        choices=KEEP_AWAKE_BACKENDS,
+        default=None,
+        help="how to keep the Mac awake while locked (default: from config or auto)",
+    )
+    parser.add_argument(
+        "--split-taps",
+        action="store_true",
+        default=False,
+        help="separate keyboard and pointer taps, each on its own thread",
+    )
+    parser.add_argument(
+        "--display-process",
+        action="store_true",
+        default=False,
+        help="render the lock screen from a separate process",
+    )
+    parser.add_argument(
+        "--stats-file",
+        type=Path,
+        default=STATS_PATH,
+        metavar="PATH",
+        help=f"where to write callback stats as JSON when the session ends (default: {STATS_PATH})",
+    )
+    parser.add_argument(
+        "--journal-file",
+        type=Path,
+        default=JOURNAL_PATH,
+        metavar="PATH",
+        help=f"fixed-size event journal read by `vegitate stats` (default: {JOURNAL_PATH})",
+    )
+    parser.add_argument(
+        "--journal",
+        action="store_true",
+        default=False,
+        help="keep the event journal (a record per event: roughly doubles the callback's cost)",
+    )
+    # Off is the default now; still accepted so existing scripts keep working.
+    parser.add_argument("--no-journal", dest="journal", action="store_false", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--history-file",
+        type=Path,
+        default=HISTORY_PATH,
+        metavar="PATH",
+        help=f"SQLite database of past sessions (default: {HISTORY_PATH})",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        default=False,
+        help="don't record this session in the history",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="export metrics to PATH (a .prom file for node-exporter's textfile "
+             "collector; default: metrics_file from config, off if unset)",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="how often to rewrite the metrics file (default: from config or 15)",
+    )
+    parser.add_argument(
+        "--status-addr",
+        default=None,
+        metavar="HOST:PORT",
+        help="serve the lock state as JSON on http://HOST:PORT/status, for `vegitate fleet` "
+             "(default: status_addr from config, off if unset)",
+    )
+    parser.add_argument(
+        "--record",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="record every event the tap sees to PATH (for `vegitate replay`)",
+    )
+    parser.add_argument(
+        "--no-watch",
+        action="store_true",
+        default=False,
+        help="don't apply config file changes to a running session",
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        default=False,
+        help="report how long each startup phase took, when the session ends",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=SOCKET_PATH,
+        metavar="PATH",
+        help=f"control socket for daemon/lock/unlock/status (default: {SOCKET_PATH})",
+    )
 
     args = parser.parse_args()
 
     if args.command == "init":
         cmd_init()
         return
+    if args.command in ("lock", "unlock", "status"):
+        cmd_control(args)
+        return
+    if args.command == "stats":
+        cmd_stats(args)
+        return
+    if args.command == "history":
+        cmd_history(args)
+        return
+    if args.command == "fleet":
+        cmd_fleet(args)
+        return
+
+    try:
+        config = load_config()
+    except ConfigError as exc:
+        print(f"  Error: {exc}")
+        sys.exit(1)
+    if args.command == "replay":
+        cmd_replay(args, config)
+        return
+    if args.command == "daemon":
+        cmd_daemon(args, config)
+        return
 
-    config = load_config()
-    cmd_run(args, config)
+    cmd_run(args, config, started)
 
 
 if __name__ == "__main__":
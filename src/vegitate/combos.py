@@ -0,0 +1,100 @@
+"""Unlock combos and sequences compiled into a single automaton.
+
+Every configured unlock sequence is merged into one deterministic automaton
+(an Aho–Corasick trie with its failure links resolved ahead of time), so a
+key-down costs exactly one dict lookup however many combos are configured::
+
+    table = compile_sequences(["ctrl+cmd+u", "ctrl+alt+l g"])
+    state = table.get(state << STATE_SHIFT | symbol(keycode, flags), 0)
+    if state == ACCEPT:
+        ...  # unlocked
+
+State 0 is the start state, and any transition missing from the table goes
+back to it.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+
+from .keys import ALL_MODIFIER_BITS, parse_sequence
+
+# A key-down is folded into one int: the keycode sits below the modifier bits
+# (keycodes are < 128; the lowest modifier bit is 1 << 17).
+STATE_SHIFT = 21
+
+# Transition target meaning "a whole sequence just matched".
+ACCEPT = -1
+
+
+def symbol(keycode: int, flags: int) -> int:
+    """The automaton input for a key-down with *keycode* and raw *flags*."""
+    return keycode | (flags & ALL_MODIFIER_BITS)
+
+
+def compile_sequences(sequences: list[str]) -> dict[int, int]:
+    """Compile unlock *sequences* into a ``(state, symbol) → state`` table.
+
+    Keys are ``state << STATE_SHIFT | symbol``.  Raises :class:`ValueError`
+    if any sequence doesn't parse, or if one sequence contains another
+    ("ctrl+cmd+u" and "ctrl+cmd+u g"): the shorter one always unlocks
+    first, so the longer one could never complete.
+    """
+    parsed = [
+        (seq, tuple(keycode | modifiers for keycode, modifiers in parse_sequence(seq)))
+        for seq in sequences
+    ]
+    for long_seq, long_syms in parsed:
+        for short_seq, short_syms in parsed:
+            n = len(short_syms)
+            if n < len(long_syms) and any(
+                long_syms[i:i + n] == short_syms for i in range(len(long_syms) - n + 1)
+            ):
+                raise ValueError(
+                    f"unlock sequence {long_seq!r} can never complete: "
+                    f"{short_seq!r} inside it unlocks first"
+                )
+
+    # 1. Trie of every sequence.
+    goto: list[dict[int, int]] = [{}]
+    accepting: set[int] = set()
+    for _, syms in parsed:
+        state = 0
+        for sym in syms:
+            nxt = goto[state].get(sym)
+            if nxt is None:
+                nxt = len(goto)
+                goto.append({})
+                goto[state][sym] = nxt
+            state = nxt
+        accepting.add(state)
+
+    alphabet = {sym for edges in goto for sym in edges}
+
+    # 2. Resolve failure links breadth-first into a full transition function,
+    #    so the runtime never has to follow them.
+    delta: list[dict[int, int]] = [dict(goto[0])]
+    delta.extend({} for _ in range(len(goto) - 1))
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for sym in alphabet:
+            nxt = goto[state].get(sym)
+            if nxt is None:
+                target = delta[fail[state]].get(sym, 0)
+                if target:
+                    delta[state][sym] = target
+            else:
+                # No sequence sits inside another (checked above), so a
+                # failure link never leads to an accepting state.
+                fail[nxt] = delta[fail[state]].get(sym, 0)
+                delta[state][sym] = nxt
+                queue.append(nxt)
+
+    # 3. Flatten, with any transition into an accepting state made ACCEPT.
+    table: dict[int, int] = {}
+    for state, edges in enumerate(delta):
+        for sym, target in edges.items():
+            table[state << STATE_SHIFT | sym] = ACCEPT if target in accepting else target
+    return table
@@ -6,30 +6,55 @@ CLI flags always override config file values.
 
 from __future__ import annotations
 
+import json
 import os
 from pathlib import Path
 
-# Python 3.11+ has tomllib in stdlib; fall back to tomli for 3.10.
-try:
-    import tomllib  # type: ignore[import-not-found]
-except ModuleNotFoundError:
-    try:
-        import tomli as tomllib  # type: ignore[no-redef]
-    except ModuleNotFoundError:
-        tomllib = None  # type: ignore[assignment]
+from . import __version__
 
 
 CONFIG_DIR = Path(os.environ.get("XDG_CONFIG_HOME", Path.home() / ".config")) / "vegitate"
 CONFIG_PATH = CONFIG_DIR / "config.toml"
 
+# Runtime state (session stats etc.) — XDG_STATE_HOME, not the config dir.
+STATE_DIR = Path(
+    os.environ.get("XDG_STATE_HOME", Path.home() / ".local" / "state")
+) / "vegitate"
+STATS_PATH = STATE_DIR / "last-session.json"
+JOURNAL_PATH = STATE_DIR / "journal.bin"
+HISTORY_PATH = STATE_DIR / "history.db"
+
+# The last config file that parsed and validated, keyed by its mtime and
+# size, so an unchanged file is never re-parsed.
+SNAPSHOT_PATH = STATE_DIR / "config-snapshot.json"
+
+# Control socket of `vegitate daemon`.
+SOCKET_PATH = Path(os.environ.get("XDG_RUNTIME_DIR", STATE_DIR)) / "vegitate.sock"
+
+# HTTP status endpoint (status_addr / --status-addr), when only a port or
+# only a host is given; also what `vegitate fleet` assumes.
+DEFAULT_STATUS_PORT = 8787
+
+# keep_awake / --keep-awake values (see awake.py).  Here rather than in
+# awake.py so the CLI can offer them without loading ctypes and subprocess.
+KEEP_AWAKE_BACKENDS = ("auto", "assertion", "caffeinate", "fake")
+
 # These are the defaults — used when no config file exists and no flags given.
 DEFAULTS: dict[str, object] = {
     "combo": "ctrl+cmd+u",
     "allow_mouse_move": False,
     "caffeinate": True,
+    "keep_awake": "auto",
     "panic_key": "escape",
     "panic_taps": 5,
     "panic_window": 2.0,
+    "display_process": False,
+    "split_taps": False,
+    "metrics_file": "",
+    "metrics_interval": 15.0,
+    "status_addr": "",
+    "guard_budget_ms": 50.0,
+    "passthrough": {},
 }
 
 DEFAULT_CONFIG = """\
@@ -44,46 +69,245 @@ DEFAULT_CONFIG = """\
 # Format: modifier+modifier+key
 # Modifiers: ctrl, cmd (command), shift, alt (option, opt)
 # Keys: a-z, 0-9, f1-f12, space, return, escape, tab, delete
+#
+# Sequences: steps separated by spaces, e.g. "ctrl+cmd+u g" means press
+# ctrl+cmd+u, then g. Only the first step needs a modifier.
+#
+# Several combos: use a list, e.g. combo = ["ctrl+cmd+u", "ctrl+alt+l g"]
 combo = "ctrl+cmd+u"
 
 # ── Input ─────────────────────────────────────────────
 # Allow mouse cursor movement while locked (clicks still blocked).
 allow_mouse_move = false
 
+# Use separate keyboard and pointer event taps, each on its own thread, so
+# unlock detection never waits behind a flood of mouse events.
+split_taps = false
+
+# Finer-grained passthrough rules live in the [passthrough] table at the
+# end of this file.
+
 # ── Caffeinate ────────────────────────────────────────
-# Start caffeinate to prevent display/idle/system sleep.
+# Prevent display/idle/system sleep while locked.
 caffeinate = true
+# How: "assertion" (power assertions held by vegitate itself), "caffeinate"
+# (the caffeinate command, restarted if it dies) or "auto" (assertion,
+# falling back to the caffeinate command).
+keep_awake = "auto"
 
 # ── Panic Reset ───────────────────────────────────────
 # Built-in emergency unlock: press a key rapidly N times.
 # This always works and can't be disabled from the CLI,
 # but you can customize which key and how many taps.
+# Several keys: panic_key = ["escape", "f12"] (any one of them N times).
+# Alternating keys: panic_key = "f1 f2" (f1, f2, f1, ... N presses).
 #
 # Set panic_taps = 0 to disable the panic reset entirely.
 panic_key = "escape"
 panic_taps = 5
 panic_window = 2.0   # seconds
+
+# ── Display ───────────────────────────────────────────
+# Draw the lock screen from a separate process, so terminal rendering
+# never delays input handling. The lock keeps working if it dies.
+display_process = false
+
+# ── Metrics ───────────────────────────────────────────
+# Export gauges and counters for node-exporter's textfile collector: a
+# .prom file in its --collector.textfile.directory, rewritten atomically
+# every metrics_interval seconds. Empty to turn it off.
+metrics_file = ""
+metrics_interval = 15.0   # seconds
+
+# ── Latency guard ─────────────────────────────────────
+# macOS switches the event tap off if the callback gets too slow. As its
+# latency nears this budget, vegitate sheds work in steps: the lock screen
+# timer, then the event journal, then mouse-move filtering (the cursor moves;
+# clicks and keys stay blocked). Restored once latency recovers. 0 = off.
+guard_budget_ms = 50.0
+
+# ── Status endpoint ───────────────────────────────────
+# Serve the lock state as JSON over HTTP (GET /status) for `vegitate fleet`.
+# "8787" listens on localhost only; "0.0.0.0:8787" on every interface.
+# Read-only: locking and unlocking never go over HTTP. Empty to turn it off.
+status_addr = ""
+
+# ── Passthrough ───────────────────────────────────────
+# Input allowed through while locked; everything else is blocked.
+# (This must stay the last section: TOML tables run to the end of file.)
+#
+#   events        : mouse_move, scroll, left_click, right_click,
+#                   other_click, drag, modifiers
+#   keys          : any key name, e.g. "volume_up", "volume_down", "mute"
+#   click_regions : [[x, y, width, height], ...] in screen points —
+#                   clicks inside these rectangles are let through
+[passthrough]
+events = []
+keys = []
+click_regions = []
 """
 
 
-def load_config() -> dict[str, object]:
-    """Load config from disk, falling back to defaults."""
+def _import_tomllib():  # noqa: ANN202
+    """Import the TOML parser on first use — `--version` and `init` never need it."""
+    # Python 3.11+ has tomllib in stdlib; fall back to tomli for 3.10.
+    try:
+        import tomllib  # type: ignore[import-not-found]
+    except ModuleNotFoundError:
+        try:
+            import tomli as tomllib  # type: ignore[no-redef]
+        except ModuleNotFoundError:
+            return None
+    return tomllib
+
+
+class ConfigError(ValueError):
+    """The config file couldn't be read, parsed or validated."""
+
+
+def validate_config(config: dict[str, object]) -> None:
+    """Check a merged config; raises :class:`ConfigError` naming the bad setting."""
+    # Only needed when a file actually has to be parsed.
+    from .bursts import parse_pattern
+    from .combos import compile_sequences
+    from .policy import compile_passthrough
+
+    combos = config["combo"]
+    if isinstance(combos, str):
+        combos = [combos]
+    if not isinstance(combos, list) or not combos:
+        raise ConfigError("combo must be a string or a non-empty list of strings")
+    for key in ("allow_mouse_move", "caffeinate", "display_process", "split_taps"):
+        if not isinstance(config[key], bool):
+            raise ConfigError(f"{key} must be true or false")
+    if not isinstance(config["panic_taps"], int) or config["panic_taps"] < 0:
+        raise ConfigError("panic_taps must be a whole number (0 disables the panic reset)")
+    window = config["panic_window"]
+    if not isinstance(window, (int, float)) or isinstance(window, bool) or window <= 0:
+        raise ConfigError("panic_window must be a positive number of seconds")
+    if config["keep_awake"] not in KEEP_AWAKE_BACKENDS:
+        raise ConfigError(f"keep_awake must be one of {', '.join(KEEP_AWAKE_BACKENDS)}")
+    panic_keys = config["panic_key"]
+    if isinstance(panic_keys, str):
+        panic_keys = [panic_keys]
+    if not isinstance(panic_keys, list) or not panic_keys:
+        raise ConfigError("panic_key must be a string or a non-empty list of strings")
+    if not isinstance(config["metrics_file"], str):
+        raise ConfigError("metrics_file must be a path (or empty to turn metrics off)")
+    interval = config["metrics_interval"]
+    if not isinstance(interval, (int, float)) or isinstance(interval, bool) or interval <= 0:
+        raise ConfigError("metrics_interval must be a positive number of seconds")
+    budget = config["guard_budget_ms"]
+    if not isinstance(budget, (int, float)) or isinstance(budget, bool) or budget < 0:
+        raise ConfigError("guard_budget_ms must be a number of milliseconds (0 turns it off)")
+    if not isinstance(config["status_addr"], str):
+        raise ConfigError("status_addr must be HOST:PORT (or empty to turn it off)")
+    if not isinstance(config["passthrough"], dict):
+        raise ConfigError("passthrough must be a table")
+
+    try:
+        compile_sequences([str(combo) for combo in combos])
+        for pattern in panic_keys:
+            parse_pattern(str(pattern))
+        compile_passthrough(config["passthrough"], bool(config["allow_mouse_move"]))
+        if config["status_addr"]:
+            parse_address(str(config["status_addr"]))
+    except ValueError as exc:
+        raise ConfigError(str(exc)) from None
+
+
+def parse_address(text: str, default_host: str = "127.0.0.1") -> tuple[str, int]:
+    """``"8787"``, ``"host:8787"``, ``"[::1]:8787"`` or ``"host"`` → *(host, port)*.
+
+    Raises :class:`ValueError` if the port isn't a number from 0 to 65535.
+    """
+    host, sep, port = text.rpartition(":")
+    if not sep or "]" in port:
+        # No port: a bare port number, or a bare host.
+        host, port = ("", text) if text.isdigit() else (text, str(DEFAULT_STATUS_PORT))
+    host = host.strip("[]") or default_host
+    if not port.isdigit() or int(port) > 65535:
+        raise ValueError(f"Bad address '{text}': expected HOST:PORT")
+    return host, int(port)
+
+
+def config_key(path: Path = CONFIG_PATH) -> tuple[int, int] | None:
+    """*(mtime_ns, size)* of the config file, or ``None`` if there isn't one."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_snapshot(path: Path, key: tuple[int, int]) -> dict[str, object] | None:
+    try:
+        snapshot = json.loads(SNAPSHOT_PATH.read_text())
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(snapshot, dict)
+        or snapshot.get("version") != __version__
+        or snapshot.get("path") != str(path)
+        or snapshot.get("key") != list(key)
+    ):
+        return None
+    return snapshot.get("config")
+
+
+def _write_snapshot(path: Path, key: tuple[int, int], config: dict[str, object]) -> None:
+    snapshot = {"version": __version__, "path": str(path), "key": list(key), "config": config}
+    tmp = SNAPSHOT_PATH.with_name(f"{SNAPSHOT_PATH.name}.{os.getpid()}.tmp")
+    try:
+        SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(snapshot))
+        os.replace(tmp, SNAPSHOT_PATH)
+    except (OSError, TypeError, ValueError):
+        # Best-effort: without a snapshot the file is just parsed next time.
+        tmp.unlink(missing_ok=True)
+
+
+def load_config(path: Path = CONFIG_PATH) -> dict[str, object]:
+    """Load and validate the config file, falling back to defaults if there is none.
+
+    A file that parsed and validated before, unchanged since (same mtime and
+    size), is served from the snapshot without re-parsing.  Raises
+    :class:`ConfigError` if the file can't be read, isn't valid TOML or has
+    a bad setting — it's never silently ignored.
+    """
     config: dict[str, object] = dict(DEFAULTS)
 
-    if tomllib is None or not CONFIG_PATH.exists():
+    key = config_key(path)
+    if key is None:
+        return config
+    cached = _read_snapshot(path, key)
+    if cached is not None:
+        # Over the defaults, in case a setting was added since it was taken.
+        config.update(cached)
         return config
 
+    tomllib = _import_tomllib()
+    if tomllib is None:
+        raise ConfigError(f"Reading {path} needs tomli on Python 3.10 (pip install tomli)")
+
     try:
-        with open(CONFIG_PATH, "rb") as f:
+        with open(path, "rb") as f:
             file_config = tomllib.load(f)
-    except Exception:
-        return config
+    except OSError as exc:
+        raise ConfigError(f"Can't read {path}: {exc.strerror or exc}") from None
+    except (tomllib.TOMLDecodeError, UnicodeDecodeError) as exc:
+        raise ConfigError(f"{path} isn't valid TOML: {exc}") from None
 
-    # Merge — only known keys, ignore unknown.
-    for key in DEFAULTS:
-        if key in file_config:
-            config[key] = file_config[key]
+    unknown = set(file_config) - set(DEFAULTS)
+    if unknown:
+        raise ConfigError(f"Unknown setting(s) in {path}: {', '.join(sorted(unknown))}")
+    config.update(file_config)
+    try:
+        validate_config(config)
+    except ConfigError as exc:
+        raise ConfigError(f"{path}: {exc}") from None
 
+    _write_snapshot(path, key, config)
     return config
 
 
@@ -0,0 +1,36 @@
+"""Client side of the ``vegitate daemon`` control socket.
+
+The protocol is one JSON object per line over a Unix stream socket: the
+client sends ``{"cmd": "lock" | "unlock" | "status"}`` and reads back one
+reply, ``{"ok": true, "locked": ..., ...}`` or ``{"ok": false, "error": ...}``.
+
+This module only imports the standard library (no Quartz, no Rich), so
+``vegitate lock`` costs an interpreter start and a socket round-trip.
+"""
+
+from __future__ import annotations
+
+import json
+import socket
+from pathlib import Path
+
+from .config import SOCKET_PATH
+
+COMMANDS = ("lock", "unlock", "status")
+
+
+def request(command: str, path: Path = SOCKET_PATH, timeout: float = 5.0) -> dict:
+    """Send *command* to the daemon listening on *path* and return its reply.
+
+    Raises :class:`OSError` if no daemon is listening, and
+    :class:`ValueError` if the reply can't be parsed.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(path))
+        sock.sendall(json.dumps({"cmd": command}).encode() + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ValueError("daemon closed the connection without replying")
+    return json.loads(line)
@@ -1,228 +1,915 @@
-"""Core Vegitate logic — CGEventTap + caffeinate."""
+"""Core Vegitate logic — CGEventTap + keep-awake."""
 
 from __future__ import annotations
 
 import os
 import signal
-import subprocess
 import sys
+import threading
 import time
 
 import Quartz
 
-from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from . import __version__
+from .bursts import compile_detectors
+from .config import STATS_PATH
 from .display import Display
+from .display_process import RemoteDisplay
+from .guard import BOOKKEEPING_OFF, DISPLAY_PAUSED, LEVEL_NAMES, MASK_NARROWED, LatencyGuard
+from .journal import PANIC_TAP, SESSION, UNLOCK, WRONG_COMBO, Journal
+from .combos import ACCEPT, STATE_SHIFT, compile_sequences
 from .keys import (
     ALL_MODIFIER_BITS,
-    KEY_MAP,
-    format_combo,
-    parse_combo,
+    format_sequence,
 )
+from .policy import (
+    CLICK_TYPES,
+    EVENT_GROUPS,
+    KEY_DOWN,
+    KEY_UP,
+    KEYBOARD_MASK,
+    MOUSE_MOVED,
+    compile_passthrough,
+)
+from .recording import Recorder
+from .stats import CallbackStats, StartupTimings
+from .watch import ConfigWatcher
+
+if TYPE_CHECKING:
+    from .awake import KeepAwake
+    from .history import HistoryWriter
+    from .metrics import MetricsExporter
+    from .notify import Notifier
+    from .status import StatusServer
 
 # macOS sends these event types when a tap is auto-disabled.
 _TAP_DISABLED_BY_TIMEOUT = 0xFFFFFFFE
 _TAP_DISABLED_BY_USER = 0xFFFFFFFF
 
+_perf_counter_ns = time.perf_counter_ns
+
+
+def _no_marker(kind: int, keycode: int = 0) -> None:
+    """Journal marker stand-in when there's no journal."""
+
+
+def _no_journal_event(event_type: int, suppressed: bool, elapsed_ns: int, timestamp: int) -> None:
+    """Journal record stand-in while the latency guard has shed them."""
+
 
 class Vegitate:
     """Keep the Mac awake while suppressing all HID input."""
 
     def __init__(
         self,
-        unlock_combo: str = "ctrl+cmd+u",
+        unlock_combo: str | list[str] = "ctrl+cmd+u",
         allow_mouse_move: bool = False,
         use_caffeinate: bool = True,
-        panic_key: str = "escape",
+        keep_awake: str = "auto",
+        panic_key: str | list[str] = "escape",
         panic_taps: int = 5,
         panic_window: float = 2.0,
+        stats_path: Path | None = STATS_PATH,
+        record_path: Path | None = None,
+        display_process: bool = False,
+        passthrough: dict[str, object] | None = None,
+        split_taps: bool = False,
+        startup: StartupTimings | None = None,
+        show_timings: bool = False,
+        reload_options: Callable[[], dict[str, object]] | None = None,
+        journal_path: Path | None = None,
+        history_path: Path | None = None,
+        metrics_path: Path | None = None,
+        metrics_interval: float = 15.0,
+        status_address: tuple[str, int] | None = None,
+        guard_budget_ms: float = 50.0,
+        guard_interval: float = 0.25,
     ) -> None:
-        self.combo_str = unlock_combo
-        self.combo_display = format_combo(unlock_combo)
-        self.unlock_keycode, self.unlock_modifiers = parse_combo(unlock_combo)
-        self.allow_mouse_move = allow_mouse_move
+        # Keep the Mac awake while locked, with the keep_awake backend (see
+        # awake.py); it's only loaded when the first session starts.
         self.use_caffeinate = use_caffeinate
+        self.keep_awake = keep_awake
+        self._awake: KeepAwake | None = None
+        self._awake_error: str | None = None
+        self._set_unlock_options(
+            unlock_combo, allow_mouse_move, panic_key, panic_taps, panic_window, passthrough,
+        )
+
+        # With reload_options, the config file is watched while locked and
+        # the options it returns are swapped in live (see reconfigure()).
+        self.reload_options = reload_options
+        self._watcher: ConfigWatcher | None = None
+
+        # Callback instrumentation, dumped to stats_path when the session ends.
+        self.stats = CallbackStats()
+        self.stats_path = stats_path
+
+        # Startup phase timings; printed at the end with --timings.
+        self.startup = startup or StartupTimings()
+        self.show_timings = show_timings
+
+        # Optional capture of every event the tap sees (see recording.py).
+        self.record_path = record_path
+        self.recorder: Recorder | None = None
+
+        # Optional audit journal of what the callback did (see journal.py),
+        # readable with `vegitate stats` while the session runs.
+        self.journal_path = journal_path
+        self.journal: Journal | None = None
+        self._journal_event = None
+
+        # Optional session history (see history.py).  The writer thread is
+        # only started when the first session ends.
+        self.history_path = history_path
+        self._history: HistoryWriter | None = None
+        self.locked_since: float | None = None
+        # "combo", "panic", "command" or "signal", once the session ends.
+        self.unlock_method: str | None = None
+
+        # Optional node-exporter textfile (see metrics.py), rewritten on its
+        # own thread every metrics_interval seconds while the process runs.
+        self.metrics_path = metrics_path
+        self.metrics_interval = metrics_interval
+        self._metrics: MetricsExporter | None = None
+
+        # Lock/unlock notifications, posted by one worker (see notify.py)
+        # started with the first of them.
+        self._notifier: Notifier | None = None
+
+        # Optional read-only HTTP/JSON status endpoint (see status.py).
+        self.status_address = status_address
+        self._status_server: StatusServer | None = None
+
+        # Sheds optional work as callback latency nears guard_budget_ms
+        # (see guard.py); 0 turns it off.
+        self.guard_budget_ms = guard_budget_ms
+        self.guard_interval = guard_interval
+        self._guard: LatencyGuard | None = None
+        self._journal_shed = False
+        self._mask_narrowed = False
+        self._tap_lock = threading.Lock()
+
+        # Optionally render from a subprocess so Rich never holds our GIL.
+        self.display: Display | RemoteDisplay = (
+            RemoteDisplay() if display_process else Display()
+        )
+        self.event_tap: object | None = None
+        self.run_loop_source: object | None = None
+        self.run_loop: object | None = None
+        self._callback = None  # what the taps call; chosen in _create_event_tap()
+
+        # With split_taps, pointer events get their own tap and run-loop
+        # thread so a mouse flood never queues ahead of the unlock keystroke.
+        self.split_taps = split_taps
+        self.pointer_tap: object | None = None
+        self.pointer_run_loop_source: object | None = None
+        self.pointer_run_loop: object | None = None
+        self._pointer_thread: threading.Thread | None = None
+        self._presenter: threading.Thread | None = None
+
+        # Set by the callback on unlock; the worker does the slow teardown.
+        self._unlock_requested = threading.Event()
+        self._unlock_worker: threading.Thread | None = None
+
+        # Event-type → handler lookup, filled in by _compile_policy().
+        # Until then every event is suppressed.
+        self._dispatch_get = {}.get
+        self._record = self.stats.record
+
+    def _set_unlock_options(
+        self,
+        unlock_combo: str | list[str],
+        allow_mouse_move: bool,
+        panic_key: str | list[str],
+        panic_taps: int,
+        panic_window: float,
+        passthrough: dict[str, object] | None,
+    ) -> None:
+        # Everything that can raise comes first, so a bad reload changes nothing.
+        # One or more unlock combos / sequences, e.g. "ctrl+cmd+u g".
+        combos = [unlock_combo] if isinstance(unlock_combo, str) else list(unlock_combo)
+        unlock_table = compile_sequences(combos)
+        # What gets through while locked ([passthrough] in the config).
+        policy = compile_passthrough(passthrough, allow_mouse_move)
+        # Panic reset: one rate detector per panic key (or alternating keys).
+        panic_keys = [panic_key] if isinstance(panic_key, str) else list(panic_key)
+        panic_table = compile_detectors(panic_keys, panic_taps, panic_window)
+
+        self.combos = combos
+        self.combo_display = " or ".join(format_sequence(c) for c in combos)
+        self._unlock_table = unlock_table
+        self.allow_mouse_move = allow_mouse_move
+        self.policy = policy
 
         # Panic reset settings
-        self.panic_keycode = KEY_MAP.get(panic_key.lower(), KEY_MAP["escape"])
+        self.panic_keys = panic_keys
         self.panic_taps = panic_taps
         self.panic_window = panic_window
-        self.panic_enabled = panic_taps > 0
+        self.panic_enabled = bool(panic_table)
+        self._panic_table = panic_table
 
-        self.display = Display()
-        self.event_tap: object | None = None
-        self.run_loop_source: object | None = None
-        self.caffeinate_proc: subprocess.Popen | None = None
+    def _reset_panic(self) -> None:
+        """Forget panic-key presses so far (a new session starts counting afresh)."""
+        for detectors in self._panic_table.values():
+            for detector in detectors:
+                detector.reset()
 
-        # Panic sequence: timestamps of recent key-down events.
-        self._panic_times: deque[float] = deque(
-            maxlen=max(panic_taps, 1)
+    # ------------------------------------------------------------------ #
+    #  live reconfiguration                                               #
+    # ------------------------------------------------------------------ #
+
+    def reconfigure(self, options: dict[str, object]) -> list[str]:
+        """Apply new session options without touching the taps.
+
+        Combos, panic settings and the passthrough policy are recompiled
+        into a fresh dispatch table, which the callback picks up with a
+        single attribute swap — no event sees half of the old and half of
+        the new configuration, and none is dropped.  Raises
+        :class:`ValueError` on bad options, leaving the session as it was.
+
+        Returns what couldn't be applied live: the settings that only take
+        effect at startup, and event types that are no longer allowed but
+        were left out of the tap's mask (the tap has to be recreated — i.e.
+        vegitate restarted — to start blocking them).
+        """
+        old_mask = self._build_event_mask()
+        old_policy = self.policy
+        self._set_unlock_options(
+            options["unlock_combo"],  # type: ignore[arg-type]
+            bool(options["allow_mouse_move"]),
+            options["panic_key"],  # type: ignore[arg-type]
+            int(options["panic_taps"]),  # type: ignore[call-overload]
+            float(options["panic_window"]),  # type: ignore[arg-type]
+            options["passthrough"],  # type: ignore[arg-type]
         )
+        if not self._unlock_requested.is_set():
+            self._compile_policy()
+
+        pending = [
+            name
+            for name in (
+                "use_caffeinate", "keep_awake", "split_taps", "metrics_path", "metrics_interval",
+                "status_address", "guard_budget_ms",
+            )
+            if name in options and options[name] != getattr(self, name)
+        ]
+        if self.event_tap is not None:
+            unseen = self.policy.tap_mask & ~old_mask
+            pending += [
+                f"blocking {group}"
+                for group, types in EVENT_GROUPS.items()
+                if any((unseen >> t) & 1 for t in types)
+            ]
+            # Keep filtering on the mask the tap was actually created with.
+            self.policy.tap_mask = old_policy.tap_mask
+        return pending
+
+    def _reload_config(self) -> None:
+        # Runs on the watcher thread.
+        try:
+            pending = self.reconfigure(self.reload_options())  # type: ignore[misc]
+        except ValueError as exc:
+            self.display.show_step(f"Config not reloaded — {exc}")
+            return
+        self.display.show_step(f"Config reloaded · unlock with {self.combo_display}")
+        if pending:
+            self.display.show_step(f"Restart to apply: {', '.join(pending)}")
+
+    def _start_watcher(self) -> None:
+        if self.reload_options is None or self._watcher is not None:
+            return
+        self._watcher = ConfigWatcher(self._reload_config)
+        self._watcher.start()
+
+    def _stop_watcher(self) -> None:
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.stop()
+
+    def _start_metrics(self) -> None:
+        if self.metrics_path is None or self._metrics is not None:
+            return
+        from .metrics import MetricsExporter
+
+        self._metrics = MetricsExporter(self, self.metrics_path, self.metrics_interval)
+        self._metrics.start()
+
+    def _stop_metrics(self) -> None:
+        metrics, self._metrics = self._metrics, None
+        if metrics is not None:
+            metrics.stop()
+
+    def _start_status_server(self) -> None:
+        if self.status_address is None or self._status_server is not None:
+            return
+        from .status import StatusServer
+
+        try:
+            self._status_server = StatusServer(self.status_address, self.status)
+        except OSError as exc:
+            self.display.show_step(f"Status endpoint [dim](off — {exc.strerror or exc})[/]")
+            return
+        self._status_server.start()
+        host, port = self.status_address
+        self.display.show_step(f"Status on http://{host}:{self._status_server.port}/status")
+
+    def _stop_status_server(self) -> None:
+        server, self._status_server = self._status_server, None
+        if server is not None:
+            server.close()
 
     # ------------------------------------------------------------------ #
-    #  caffeinate                                                         #
+    #  keep awake                                                         #
     # ------------------------------------------------------------------ #
 
-    def _start_caffeinate(self) -> None:
+    def _start_keep_awake(self) -> None:
         if not self.use_caffeinate:
             return
-        self.caffeinate_proc = subprocess.Popen(
-            ["caffeinate", "-dis"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+        self._awake_error = None
+        try:
+            if self._awake is None:
+                from .awake import open_backend
 
-    def _stop_caffeinate(self) -> None:
-        if self.caffeinate_proc:
-            self.caffeinate_proc.terminate()
-            try:
-                self.caffeinate_proc.wait(timeout=3)
-            except subprocess.TimeoutExpired:
-                self.caffeinate_proc.kill()
-            self.caffeinate_proc = None
+                self._awake = open_backend(self.keep_awake, self._keep_awake_restarted)
+            self._awake.start()
+        except (OSError, ValueError) as exc:
+            self._awake_error = str(exc)
+
+    def _keep_awake_restarted(self, status: int) -> None:
+        # From the caffeinate backend's supervising thread.
+        self.display.show_step(f"caffeinate exited (status {status}) — restarted")
+
+    @property
+    def keep_awake_active(self) -> bool:
+        awake = self._awake
+        return awake is not None and awake.active
+
+    def _stop_keep_awake(self) -> None:
+        if self._awake is not None:
+            self._awake.stop()
 
     # ------------------------------------------------------------------ #
     #  macOS notification (best-effort)                                   #
     # ------------------------------------------------------------------ #
 
-    @staticmethod
-    def _notify(title: str, message: str) -> None:
-        try:
-            subprocess.Popen(
-                [
-                    "osascript", "-e",
-                    f'display notification "{message}" with title "{title}"',
-                ],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-        except Exception:
-            pass
+    def _notify(self, title: str, message: str) -> None:
+        # Only queues it: the notifier's thread talks to osascript.
+        if self._notifier is None:
+            from .notify import Notifier
+
+            self._notifier = Notifier()
+        self._notifier.send(title, message)
+
+    def _close_notifier(self) -> None:
+        # Before the process exits: hand the last notification over.
+        notifier, self._notifier = self._notifier, None
+        if notifier is not None:
+            notifier.close()
 
     # ------------------------------------------------------------------ #
     #  event tap                                                          #
     # ------------------------------------------------------------------ #
 
     def _build_event_mask(self) -> int:
-        mask = (
-            Quartz.CGEventMaskBit(Quartz.kCGEventKeyDown)
-            | Quartz.CGEventMaskBit(Quartz.kCGEventKeyUp)
-            | Quartz.CGEventMaskBit(Quartz.kCGEventFlagsChanged)
-            | Quartz.CGEventMaskBit(Quartz.kCGEventLeftMouseDown)
-            | Quartz.CGEventMaskBit(Quartz.kCGEventLeftMouseUp)
-            | Quartz.CGEventMaskBit(Quartz.kCGEventRightMouseDown)
-            | Quartz.CGEventMaskBit(Quartz.kCGEventRightMouseUp)
-            | Quartz.CGEventMaskBit(Quartz.kCGEventLeftMouseDragged)
-            | Quartz.CGEventMaskBit(Quartz.kCGEventRightMouseDragged)
-            | Quartz.CGEventMaskBit(Quartz.kCGEventScrollWheel)
-            | Quartz.CGEventMaskBit(Quartz.kCGEventOtherMouseDown)
-            | Quartz.CGEventMaskBit(Quartz.kCGEventOtherMouseUp)
-            | Quartz.CGEventMaskBit(Quartz.kCGEventOtherMouseDragged)
-        )
-        if not self.allow_mouse_move:
-            mask |= Quartz.CGEventMaskBit(Quartz.kCGEventMouseMoved)
-        return mask
-
-    # This is the heart of the tool — called for every HID event.
-    def _event_callback(self, proxy, event_type, event, refcon):  # noqa: ANN001
-        # Re-enable the tap if macOS disabled it (callback took too long).
-        if event_type in (_TAP_DISABLED_BY_TIMEOUT, _TAP_DISABLED_BY_USER):
-            Quartz.CGEventTapEnable(self.event_tap, True)
-            return event
-
-        # Check for the unlock key combination.
-        if event_type == Quartz.kCGEventKeyDown:
-            keycode = Quartz.CGEventGetIntegerValueField(
-                event, Quartz.kCGKeyboardEventKeycode,
+        # Fully allowed event types are left out, so they skip the callback.
+        return self.policy.tap_mask
+
+    def _compile_policy(self) -> None:
+        """Build the per-event-type dispatch table used by the callback.
+
+        Everything the callback needs is resolved here once — Quartz
+        attributes, the unlock combo, the panic settings, the passthrough
+        bitsets — and bound as closure locals, so the hot path is a single
+        dict lookup.  Event types missing from the table are suppressed
+        without any further work.
+        """
+        get_field = Quartz.CGEventGetIntegerValueField
+        get_flags = Quartz.CGEventGetFlags
+        get_timestamp = Quartz.CGEventGetTimestamp
+        keycode_field = Quartz.kCGKeyboardEventKeycode
+        reenable_taps = self._reenable_taps
+        modifier_bits = ALL_MODIFIER_BITS
+
+        unlock_step = self._unlock_table.get
+        unlock_state = 0
+        panic_detectors = self._panic_table.get
+        unlock = self._unlock
+        unlock_by_panic = self._unlock_by_panic
+        policy = self.policy
+        allow_keys = policy.allow_keys
+        mark = self.journal.marker if self.journal is not None else _no_marker
+        stats = self.stats
+        passed = stats.passed
+
+        def on_key_down(event):  # noqa: ANN001, ANN202
+            nonlocal unlock_state
+            keycode = get_field(event, keycode_field)
+            modifiers = get_flags(event) & modifier_bits
+
+            # --- user-configured unlock combos / sequences ---
+            previous = unlock_state
+            unlock_state = unlock_step(
+                unlock_state << STATE_SHIFT | keycode | modifiers,
+                0,
             )
-            flags = Quartz.CGEventGetFlags(event) & ALL_MODIFIER_BITS
-
-            # --- user-configured unlock combo ---
-            if keycode == self.unlock_keycode and flags == self.unlock_modifiers:
-                self._unlock()
+            if unlock_state == ACCEPT:
+                mark(UNLOCK, keycode)
+                unlock()
                 return None  # swallow the unlock keystroke
+            if not unlock_state and (previous or modifiers):
+                # A chord that isn't a combo, or a sequence broken off.
+                mark(WRONG_COMBO, keycode)
 
             # --- configurable panic reset ---
-            if self.panic_enabled and keycode == self.panic_keycode:
-                now = time.time()
-                self._panic_times.append(now)
-                if (
-                    len(self._panic_times) == self.panic_taps
-                    and now - self._panic_times[0] <= self.panic_window
-                ):
-                    self._unlock()
-                    return None
-
-        # Optionally let mouse movement through.
-        if self.allow_mouse_move and event_type == Quartz.kCGEventMouseMoved:
+            detectors = panic_detectors(keycode)
+            if detectors is not None:
+                mark(PANIC_TAP, keycode)
+                timestamp = get_timestamp(event)
+                for detector in detectors:
+                    if detector.press(keycode, timestamp):
+                        unlock_by_panic()
+                        return None
+
+            # --- passthrough keys ---
+            if (allow_keys >> keycode) & 1:
+                passed[KEY_DOWN] += 1
+                return event
+            return None
+
+        def on_key_up(event):  # noqa: ANN001, ANN202
+            if (allow_keys >> get_field(event, keycode_field)) & 1:
+                passed[KEY_UP] += 1
+                return event
+            return None
+
+        get_location = Quartz.CGEventGetLocation
+        regions = policy.click_regions
+
+        # One handler per event type, so each knows which counter to bump.
+        def click_handler(event_type: int):  # noqa: ANN202
+            def on_click(event):  # noqa: ANN001, ANN202
+                point = get_location(event)
+                x, y = point.x, point.y
+                for x0, y0, x1, y1 in regions:
+                    if x0 <= x < x1 and y0 <= y < y1:
+                        passed[event_type] += 1
+                        return event
+                return None
+            return on_click
+
+        # Re-enable the tap if macOS disabled it (callback took too long).
+        def on_tap_disabled_by_timeout(event):  # noqa: ANN001, ANN202
+            stats.tap_reenabled_timeout += 1
+            reenable_taps()
+            return event
+
+        def on_tap_disabled_by_user(event):  # noqa: ANN001, ANN202
+            stats.tap_reenabled_user += 1
+            reenable_taps()
             return event
 
-        # Suppress everything else.
-        return None
+        def passthrough_handler(event_type: int):  # noqa: ANN202
+            def passthrough(event):  # noqa: ANN001, ANN202
+                passed[event_type] += 1
+                return event
+            return passthrough
+
+        table = {
+            _TAP_DISABLED_BY_TIMEOUT: on_tap_disabled_by_timeout,
+            _TAP_DISABLED_BY_USER: on_tap_disabled_by_user,
+        }
+        # Allowed event types pass straight through (most are not even in
+        # the tap mask; this covers anything that still gets delivered).
+        allow_types = policy.allow_types
+        for event_type in range(allow_types.bit_length()):
+            if (allow_types >> event_type) & 1:
+                table[event_type] = passthrough_handler(event_type)
+        if regions:
+            for event_type in CLICK_TYPES:
+                if event_type not in table:
+                    table[event_type] = click_handler(event_type)
+        if allow_keys:
+            table.setdefault(KEY_UP, on_key_up)
+        table[KEY_DOWN] = on_key_down
+
+        self._dispatch_get = table.get
+        self._record = stats.record
+        if self.journal is not None and not self._journal_shed:
+            self._journal_event = self.journal.event
 
-    def _create_event_tap(self) -> None:
-        self.event_tap = Quartz.CGEventTapCreate(
+    # This is the heart of the tool — called for every HID event.
+    def _event_callback(self, proxy, event_type, event, refcon):  # noqa: ANN001
+        start = _perf_counter_ns()
+        handler = self._dispatch_get(event_type)
+        result = None if handler is None else handler(event)  # None = suppress
+        self._record(event_type, _perf_counter_ns() - start)
+        return result
+
+    def _journaled_callback(self, proxy, event_type, event, refcon):  # noqa: ANN001
+        # _event_callback plus one journal record; kept separate so sessions
+        # without a journal don't pay for it.
+        start = _perf_counter_ns()
+        handler = self._dispatch_get(event_type)
+        result = None if handler is None else handler(event)  # None = suppress
+        elapsed = _perf_counter_ns() - start
+        self._record(event_type, elapsed)
+        self._journal_event(event_type, result is None, elapsed, start)
+        return result
+
+    def _recording_callback(self, proxy, event_type, event, refcon):  # noqa: ANN001
+        self.recorder.record(
+            event_type,
+            Quartz.CGEventGetIntegerValueField(event, Quartz.kCGKeyboardEventKeycode),
+            Quartz.CGEventGetFlags(event),
+            Quartz.CGEventGetTimestamp(event),
+        )
+        if self.journal is not None:
+            return self._journaled_callback(proxy, event_type, event, refcon)
+        return self._event_callback(proxy, event_type, event, refcon)
+
+    def _install_tap(
+        self, mask: int, callback, enabled: bool = True, run_loop: object = None,  # noqa: ANN001
+    ) -> tuple[object, object, object]:
+        """Create a tap on *run_loop*, by default the calling thread's.
+
+        Returns *(tap, run_loop_source, run_loop)*; the tap is ``None`` if
+        it couldn't be created (no Accessibility permission).
+        """
+        tap = Quartz.CGEventTapCreate(
             Quartz.kCGSessionEventTap,
             Quartz.kCGHeadInsertEventTap,
             Quartz.kCGEventTapOptionDefault,
-            self._build_event_mask(),
-            self._event_callback,
+            mask,
+            callback,
             None,
         )
+        if tap is None:
+            return None, None, None
+
+        source = Quartz.CFMachPortCreateRunLoopSource(None, tap, 0)
+        if run_loop is None:
+            run_loop = Quartz.CFRunLoopGetCurrent()
+        Quartz.CFRunLoopAddSource(run_loop, source, Quartz.kCFRunLoopCommonModes)
+        Quartz.CGEventTapEnable(tap, enabled)
+        return tap, source, run_loop
+
+    def _run_pointer_tap(
+        self, mask: int, callback, ready: threading.Event, enabled: bool,  # noqa: ANN001
+    ) -> None:
+        self.pointer_tap, self.pointer_run_loop_source, self.pointer_run_loop = (
+            self._install_tap(mask, callback, enabled)
+        )
+        ready.set()
+        if self.pointer_tap is not None:
+            Quartz.CFRunLoopRun()
+
+    def _create_event_tap(self, enabled: bool = True) -> None:
+        # Only pay for the journal and recording when they were asked for.
+        callback = self._event_callback
+        if self.journal is not None:
+            callback = self._journaled_callback
+        if self.record_path is not None:
+            self.recorder = Recorder(self.record_path)
+            callback = self._recording_callback
+        self._callback = callback
+
+        mask = self._build_event_mask()
+        if self.split_taps:
+            ready = threading.Event()
+            self._pointer_thread = threading.Thread(
+                target=self._run_pointer_tap,
+                args=(mask & ~KEYBOARD_MASK, callback, ready, enabled),
+                name="vegitate-pointer-tap",
+                daemon=True,
+            )
+            self._pointer_thread.start()
+            ready.wait()
+            if self.pointer_tap is None:
+                self.display.show_permission_error()
+                sys.exit(1)
+            mask &= KEYBOARD_MASK
+
+        self.event_tap, self.run_loop_source, self.run_loop = self._install_tap(
+            mask, callback, enabled,
+        )
         if self.event_tap is None:
             self.display.show_permission_error()
             sys.exit(1)
 
-        self.run_loop_source = Quartz.CFMachPortCreateRunLoopSource(
-            None, self.event_tap, 0,
+    def _taps(self) -> tuple[object, ...]:
+        return tuple(t for t in (self.event_tap, self.pointer_tap) if t is not None)
+
+    def _reenable_taps(self) -> None:
+        # Re-enable the taps if macOS disabled them — unless we're unlocking.
+        if self._unlock_requested.is_set():
+            return
+        for tap in self._taps():
+            Quartz.CGEventTapEnable(tap, True)
+
+    # ------------------------------------------------------------------ #
+    #  latency guard                                                      #
+    # ------------------------------------------------------------------ #
+
+    def _start_guard(self) -> None:
+        if not self.guard_budget_ms or self._guard is not None:
+            return
+        self._guard = LatencyGuard(
+            lambda: self.stats,
+            int(self.guard_budget_ms * 1_000_000),
+            self._apply_guard_level,
+            interval=self.guard_interval,
         )
-        Quartz.CFRunLoopAddSource(
-            Quartz.CFRunLoopGetCurrent(),
-            self.run_loop_source,
-            Quartz.kCFRunLoopCommonModes,
+        self._guard.start()
+
+    def _stop_guard(self) -> None:
+        # Whatever was shed stays shed: the session is ending anyway.
+        guard, self._guard = self._guard, None
+        if guard is not None:
+            guard.stop()
+
+    def _apply_guard_level(self, old: int, new: int) -> None:
+        # Runs on the guard thread.
+        self.display.pause_refresh(new >= DISPLAY_PAUSED)
+        self._shed_journal(new >= BOOKKEEPING_OFF)
+        self._narrow_tap_mask(new >= MASK_NARROWED)
+        guard = self._guard
+        estimate = guard.estimate / 1e6 if guard is not None else 0.0
+        self.display.show_step(
+            f"Callback p99 ~{estimate:.1f} ms (budget {self.guard_budget_ms:g} ms) — "
+            f"{'shedding' if new > old else 'restoring'}: {LEVEL_NAMES[new]}"
         )
-        Quartz.CGEventTapEnable(self.event_tap, True)
+
+    def _shed_journal(self, shed: bool) -> None:
+        self._journal_shed = shed
+        if self.journal is not None:
+            self._journal_event = _no_journal_event if shed else self.journal.event
+
+    def _narrow_tap_mask(self, narrow: bool) -> None:
+        """Recreate the tap that sees mouse moves, without (or with) them.
+
+        A tap's mask is fixed when it's created, so narrowing it means a new
+        tap on the same run loop.  The old tap keeps filtering until the new
+        one is enabled — for a moment both do, rather than neither.
+        """
+        with self._tap_lock:
+            if narrow == self._mask_narrowed:
+                return
+            if self.split_taps:
+                old, old_source, run_loop = (
+                    self.pointer_tap, self.pointer_run_loop_source, self.pointer_run_loop,
+                )
+                mask = self._build_event_mask() & ~KEYBOARD_MASK
+            else:
+                old, old_source, run_loop = self.event_tap, self.run_loop_source, self.run_loop
+                mask = self._build_event_mask()
+            if old is None or run_loop is None or not (mask >> MOUSE_MOVED) & 1:
+                return  # no tap, or mouse moves are allowed anyway
+            if narrow:
+                mask &= ~(1 << MOUSE_MOVED)
+
+            tap, source, _ = self._install_tap(
+                mask, self._callback, not self._unlock_requested.is_set(), run_loop,
+            )
+            if tap is None:
+                return
+            if self.split_taps:
+                self.pointer_tap, self.pointer_run_loop_source = tap, source
+            else:
+                self.event_tap, self.run_loop_source = tap, source
+            self._mask_narrowed = narrow
+            Quartz.CGEventTapEnable(old, False)
+            Quartz.CFRunLoopRemoveSource(run_loop, old_source, Quartz.kCFRunLoopCommonModes)
+            Quartz.CFMachPortInvalidate(old)
+            if self._unlock_requested.is_set():
+                # Unlocked meanwhile: _unlock() may only have seen the old tap.
+                Quartz.CGEventTapEnable(tap, False)
+            Quartz.CFRunLoopWakeUp(run_loop)
 
     # ------------------------------------------------------------------ #
     #  lock / unlock                                                      #
     # ------------------------------------------------------------------ #
 
     def _lock(self) -> None:
+        startup = self.startup
         self.display.show_step("Combo validated")
 
-        self._start_caffeinate()
-        if self.use_caffeinate:
-            self.display.show_step("Caffeinate started")
-        else:
-            self.display.show_step("Caffeinate [dim](skipped)[/]")
+        self.locked_since = time.time()
+        self.unlock_method = None
+        self._open_journal()
+        self._compile_policy()
+        self._start_unlock_worker()
+        startup.mark("policy compiled")
+
+        # Starting keep-awake (loading IOKit, or spawning caffeinate) doesn't
+        # need the tap (or vice versa), so it happens alongside tap creation
+        # rather than ahead of it.
+        caffeinate = threading.Thread(
+            target=self._start_keep_awake,
+            name="vegitate-keep-awake",
+            daemon=True,
+        )
+        caffeinate.start()
+        try:
+            self._create_event_tap()
+        except SystemExit:
+            caffeinate.join()
+            self._stop_keep_awake()
+            raise
+        startup.mark("tap enabled")
+
+        # The rest is presentation.  It runs on its own thread so run() can
+        # get the run loop servicing the tap straight away.
+        self._presenter = threading.Thread(
+            target=self._present_lock,
+            args=(caffeinate,),
+            name="vegitate-present",
+            daemon=True,
+        )
+        self._presenter.start()
 
-        self._create_event_tap()
+    def _present_lock(self, caffeinate: threading.Thread) -> None:
+        startup = self.startup
         self.display.show_step("Event tap created — input locked")
-
         self._notify("Vegitate", "Input locked")
+        startup.mark("notification sent")
+        self._start_watcher()
+        self._start_guard()
+
+        caffeinate.join()
+        startup.mark("keep-awake started")
+        self._start_metrics()
+        self._start_status_server()
+        if not self.use_caffeinate:
+            self.display.show_step("Keep-awake [dim](skipped)[/]")
+        elif self._awake_error is not None:
+            self.display.show_step(f"Keep-awake [red]failed[/] — {self._awake_error}")
+        else:
+            self.display.show_step(f"Keep-awake on [dim]({self._awake.name})[/]")  # type: ignore[union-attr]
 
-        # Brief pause so the user can read the startup steps.
-        time.sleep(0.6)
+        # Brief pause so the user can read the startup steps — input is
+        # already locked.  Skip the lock screen if the session ended first.
+        if self._unlock_requested.wait(0.6):
+            return
 
-        caff = "[green]active[/]" if self.use_caffeinate else "[dim]off[/]"
+        if not self.use_caffeinate:
+            caff = "[dim]off[/]"
+        elif self.keep_awake_active:
+            caff = f"[green]active[/] [dim]({self._awake.name})[/]"  # type: ignore[union-attr]
+        else:
+            caff = "[red]failed[/]"
 
         self.display.show_locked(
             caffeinate_status=caff,
         )
+        startup.mark("lock screen shown")
+
+    @property
+    def locked(self) -> bool:
+        return self.locked_since is not None and not self._unlock_requested.is_set()
+
+    def status(self) -> dict[str, object]:
+        """What the lock panel shows, for the status endpoint."""
+        locked = self.locked
+        since = self.locked_since if locked else None
+        if not self.use_caffeinate:
+            caffeinate = "off"
+        else:
+            caffeinate = "active" if self.keep_awake_active else "inactive"
+        awake = self._awake
+        return {
+            "ok": True,
+            "locked": locked,
+            "locked_since": since,
+            "locked_for": None if since is None else time.time() - since,
+            "caffeinate": caffeinate,
+            "keep_awake": None if awake is None else awake.name,
+            "guard": "off" if self._guard is None else LEVEL_NAMES[self._guard.level],
+            "pid": os.getpid(),
+            "version": __version__,
+        }
 
     def _unlock(self) -> None:
+        """Release input.  Runs inside the tap callback, so it must not block.
+
+        Only the taps are disabled here — both of them when split, whichever
+        saw the unlock; stopping keep-awake, the notification and the unlock
+        screen are handed to the unlock worker.
+        """
+        if self._unlock_requested.is_set():
+            return
+        for tap in self._taps():
+            Quartz.CGEventTapEnable(tap, False)
+        if self.unlock_method is None:
+            self.unlock_method = "combo"
+        self._unlock_requested.set()
+
+    def _unlock_by_panic(self) -> None:
+        if not self._unlock_requested.is_set():
+            self.unlock_method = "panic"
+        self._unlock()
+
+    def _start_unlock_worker(self) -> None:
+        self._unlock_requested.clear()
+        self._unlock_worker = threading.Thread(
+            target=self._unlock_teardown,
+            name="vegitate-unlock",
+            daemon=True,
+        )
+        self._unlock_worker.start()
+
+    def _unlock_teardown(self) -> None:
+        self._unlock_requested.wait()
         self._cleanup()
         self._notify("Vegitate", "Input unlocked")
-        self.display.show_unlocked()
-        Quartz.CFRunLoopStop(Quartz.CFRunLoopGetCurrent())
+        self.display.show_unlocked(self._timings())
+        if self.pointer_run_loop is not None:
+            Quartz.CFRunLoopStop(self.pointer_run_loop)
+        if self.run_loop is not None:
+            Quartz.CFRunLoopStop(self.run_loop)
 
     def _cleanup(self) -> None:
-        if self.event_tap:
-            Quartz.CGEventTapEnable(self.event_tap, False)
-            self.event_tap = None
+        # The presenter may still be starting keep-awake or the lock screen.
+        presenter = self._presenter
+        if presenter is not None and presenter is not threading.current_thread():
+            presenter.join(timeout=2)
+        self._stop_guard()
+        self._stop_watcher()
+        for tap in self._taps():
+            Quartz.CGEventTapEnable(tap, False)
+        self.event_tap = None
+        self.pointer_tap = None
         self.run_loop_source = None
-        self._stop_caffeinate()
+        self._stop_keep_awake()
+        self._close_recorder()
+        if self.journal is not None:
+            self.journal.flush()
+        self._dump_stats()
+        started, self.locked_since = self.locked_since, None
+        if started is not None:
+            # Anything that ends a session without going through _unlock()
+            # (SIGTERM, Ctrl-C) counts as a signal.
+            self._record_session(started, self.unlock_method or "signal", self.stats)
+        # Last, so the final export shows the session over.  The status
+        # endpoint stays up until the process exits (reporting "unlocked"):
+        # shutting it down here would hold up the unlock screen.
+        self._stop_metrics()
+
+    def _open_journal(self, new_session: bool = True) -> None:
+        """Map the journal (once per process) and mark a new session in it."""
+        if self.journal_path is None:
+            return
+        if self.journal is None:
+            try:
+                self.journal = Journal(self.journal_path)
+            except OSError as exc:
+                self.journal_path = None
+                self.display.show_step(f"Journal [dim](off — {exc.strerror or exc})[/]")
+                return
+        if new_session:
+            self.journal.marker(SESSION)
+
+    def _record_session(self, started: float, method: str, stats: CallbackStats) -> None:
+        """Queue the session's history row; the write happens off-thread."""
+        if self.history_path is None:
+            return
+        # sqlite3 is imported here, after the lock, not on the way to it.
+        from .history import HistoryWriter, session_row
+
+        if self._history is None:
+            self._history = HistoryWriter(self.history_path)
+        self._history.submit(session_row(started, time.time(), method, stats))
+
+    def _close_history(self) -> None:
+        # Before the process exits: wait for the last rows to be committed.
+        history, self._history = self._history, None
+        if history is not None:
+            history.close()
+
+    def _timings(self) -> list[tuple[str, float]] | None:
+        """Startup phases to print with the final screen, if --timings."""
+        return self.startup.phases() if self.show_timings else None
+
+    def _close_recorder(self) -> None:
+        """Finish the --record file; a failed write never holds up unlock."""
+        if self.recorder is None:
+            return
+        try:
+            self.recorder.close()
+        except (OSError, ValueError) as exc:
+            reason = exc.strerror if isinstance(exc, OSError) and exc.strerror else exc
+            self.display.show_step(f"Recording [red]incomplete[/] — {reason}")
+
+    def _dump_stats(self, stats: CallbackStats | None = None) -> None:
+        if self.stats_path is None:
+            return
+        try:
+            (stats or self.stats).dump(self.stats_path)
+        except OSError:
+            pass  # best-effort, like notifications
 
     # ------------------------------------------------------------------ #
     #  signals                                                            #
@@ -231,23 +918,31 @@ class Vegitate:
     def _setup_signals(self) -> None:
         def handler(signum: int, frame: object) -> None:
             self._cleanup()
-            self.display.show_killed()
+            self.display.show_killed(self._timings())
+            self._close_history()
+            self._close_notifier()
             sys.exit(0)
 
         signal.signal(signal.SIGTERM, handler)
         signal.signal(signal.SIGINT, handler)
         signal.signal(signal.SIGHUP, handler)
 
+        # `kill -USR1 <pid>` writes the current stats without unlocking.
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self._dump_stats())
+
     # ------------------------------------------------------------------ #
     #  main entry                                                         #
     # ------------------------------------------------------------------ #
 
     def run(self) -> None:
         self.display.show_banner(__version__)
+        self.startup.mark("banner shown")
         self._setup_signals()
         self._lock()
         try:
             Quartz.CFRunLoopRun()
         except KeyboardInterrupt:
             self._cleanup()
-            self.display.show_killed()
+            self.display.show_killed(self._timings())
+        self._close_history()
+        self._close_notifier()
@@ -0,0 +1,235 @@
+"""``vegitate daemon`` — a pre-warmed lock process driven over a Unix socket.
+
+A normal ``vegitate`` run pays for the interpreter, the pyobjc and Rich
+imports, creating the event tap and starting keep-awake before input is
+locked.  The daemon pays all of that once: the taps are created at startup,
+*disabled*, and the control socket (see :mod:`vegitate.control`) just turns
+them on and off.  Time-to-locked is then a socket round-trip plus
+``CGEventTapEnable``; keep-awake and the notification follow on the session
+worker thread.
+
+Unlocking works exactly as in a normal session — combo, sequence, panic
+reset — or with ``vegitate unlock``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+
+import Quartz
+
+from . import __version__
+from .config import SOCKET_PATH
+from .control import request
+from .core import Vegitate
+from .stats import CallbackStats
+
+
+class _ControlServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    vegitate: VegitateDaemon
+
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    server: _ControlServer
+
+    def handle(self) -> None:
+        try:
+            command = json.loads(self.rfile.readline())["cmd"]
+        except (ValueError, KeyError, TypeError):
+            reply = {"ok": False, "error": "bad request"}
+        else:
+            reply = self.server.vegitate.handle_command(command)
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+class VegitateDaemon(Vegitate):
+    """A :class:`Vegitate` that locks and unlocks on request, many times over."""
+
+    def __init__(self, socket_path: Path = SOCKET_PATH, **kwargs: object) -> None:
+        super().__init__(**kwargs)  # type: ignore[arg-type]
+        self.socket_path = socket_path
+        self.last_unlock: float | None = None
+        self.sessions = 0
+        self._server: _ControlServer | None = None
+        # Serialises lock/unlock requests from concurrent clients.
+        self._mutex = threading.Lock()
+        # Idle counts as "unlock requested": nothing re-enables the taps.
+        self._unlock_requested.set()
+        # Set by the session worker once keep-awake is stopped and the
+        # session state reset, before its slower best-effort I/O.
+        self._session_closed = threading.Event()
+        self._session_closed.set()
+        self._pending_stats: CallbackStats | None = None
+        self._dump_lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    #  commands                                                           #
+    # ------------------------------------------------------------------ #
+
+    def status(self) -> dict[str, object]:
+        return {
+            **super().status(),
+            "last_unlock": self.last_unlock,
+            "sessions": self.sessions,
+        }
+
+    def lock(self) -> dict[str, object]:
+        with self._mutex:
+            if not self.locked:
+                # The previous session may still be tearing down.
+                self._session_closed.wait()
+                self._session_closed.clear()
+                self.stats = CallbackStats()
+                self._reset_panic()
+                self._open_journal()
+                self._compile_policy()
+                self.locked_since = time.time()
+                self.unlock_method = None
+                self.sessions += 1
+                self._start_unlock_worker()
+                for tap in self._taps():
+                    Quartz.CGEventTapEnable(tap, True)
+            return self.status()
+
+    def unlock(self) -> dict[str, object]:
+        # Input is released once _unlock() has disabled the taps; the rest
+        # of the teardown finishes on the worker.
+        with self._mutex:
+            if self.locked:
+                self.unlock_method = "command"
+                self._unlock()
+            return self.status()
+
+    def reconfigure(self, options: dict[str, object]) -> list[str]:
+        # Not mid-lock: lock() compiles whatever options are current.
+        with self._mutex:
+            return super().reconfigure(options)
+
+    def handle_command(self, command: str) -> dict[str, object]:
+        handler = {"lock": self.lock, "unlock": self.unlock, "status": self.status}.get(command)
+        if handler is None:
+            return {"ok": False, "error": f"unknown command {command!r}"}
+        # The combo is the unlock credential: it goes in replies on the
+        # owner-only socket, never in status() (served over HTTP).
+        return {**handler(), "combo": self.combo_display}
+
+    # ------------------------------------------------------------------ #
+    #  session lifecycle                                                  #
+    # ------------------------------------------------------------------ #
+
+    def _unlock_teardown(self) -> None:
+        # One worker per session.  Keep-awake and the notification start
+        # here rather than in lock(), so the client's reply isn't held up.
+        self._start_keep_awake()
+        self.display.show_step(f"Locked (session {self.sessions})")
+        if self._awake_error is not None:
+            self.display.show_step(f"Keep-awake [red]failed[/] — {self._awake_error}")
+        self._notify("Vegitate", "Input locked")
+
+        self._unlock_requested.wait()
+        stats = self.stats
+        started = self.locked_since or time.time()
+        method = self.unlock_method or "combo"
+        self._stop_keep_awake()
+        self.last_unlock = time.time()
+        elapsed = self.last_unlock - started
+        self.locked_since = None
+        self._record_session(started, method, stats)
+        self._session_closed.set()
+
+        # A new session may already be running from here on.
+        self._flush_stats(stats)
+        self.display.show_step(f"Unlocked after {elapsed:.0f}s")
+        self._notify("Vegitate", "Input unlocked")
+
+    def _flush_stats(self, stats: CallbackStats) -> None:
+        # Coalesce: with back-to-back short sessions only the newest stats
+        # are worth writing, and one worker writes them while the others go.
+        self._pending_stats = stats
+        while self._pending_stats is not None and self._dump_lock.acquire(blocking=False):
+            try:
+                stats, self._pending_stats = self._pending_stats, None
+                if stats is not None:
+                    self._dump_stats(stats)
+            finally:
+                self._dump_lock.release()
+
+    def _cleanup(self) -> None:
+        super()._cleanup()
+        self._close_socket()
+        self._stop_status_server()
+
+    # ------------------------------------------------------------------ #
+    #  control socket                                                     #
+    # ------------------------------------------------------------------ #
+
+    def _open_socket(self) -> None:
+        path = self.socket_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            try:
+                request("status", path, timeout=1.0)
+            except (OSError, ValueError):
+                path.unlink()  # left behind by a daemon that didn't exit cleanly
+            else:
+                self.display.show_error(f"A vegitate daemon is already running on {path}")
+                sys.exit(1)
+
+        # Owner-only from the moment it exists: whoever can connect can unlock.
+        umask = os.umask(0o177)
+        try:
+            self._server = _ControlServer(str(path), _ControlHandler)
+        finally:
+            os.umask(umask)
+        self._server.vegitate = self
+
+    def _close_socket(self) -> None:
+        server, self._server = self._server, None
+        if server is None:
+            return
+        server.shutdown()
+        server.server_close()
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    # ------------------------------------------------------------------ #
+    #  main entry                                                         #
+    # ------------------------------------------------------------------ #
+
+    def run(self) -> None:
+        self.display.show_banner(__version__)
+        self._setup_signals()
+
+        # The tap's callback is chosen when it's created, so the journal
+        # has to exist by then; lock() only marks each new session.
+        self._open_journal(new_session=False)
+        self._create_event_tap(enabled=False)
+        self.display.show_step("Event tap created — idle")
+        self._open_socket()
+        threading.Thread(
+            target=self._server.serve_forever,
+            name="vegitate-control",
+            daemon=True,
+        ).start()
+        self.display.show_step(f"Listening on {self.socket_path}")
+        self._start_watcher()
+        self._start_guard()
+        self._start_metrics()
+        self._start_status_server()
+
+        try:
+            Quartz.CFRunLoopRun()
+        except KeyboardInterrupt:
+            self._cleanup()
+            self.display.show_killed()
+            self._close_history()
+            self._close_notifier()
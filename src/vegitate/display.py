@@ -6,11 +6,14 @@ import os
 import threading
 import time
 
+from collections.abc import Callable
+
 from rich import box
 from rich.align import Align
-from rich.console import Console, Group
+from rich.console import Console, ConsoleOptions, Group, RenderResult
 from rich.live import Live
 from rich.panel import Panel
+from rich.segment import Segment
 from rich.table import Table
 from rich.text import Text
 
@@ -20,8 +23,11 @@ from rich.text import Text
 # ---------------------------------------------------------------------------
 
 def _fmt_time(seconds: float) -> str:
-    h, rem = divmod(int(seconds), 3600)
+    d, rem = divmod(int(seconds), 86400)
+    h, rem = divmod(rem, 3600)
     m, s = divmod(rem, 60)
+    if d:
+        return f"{d}d {h:02d}:{m:02d}:{s:02d}"
     return f"{h:02d}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
 
 
@@ -34,6 +40,65 @@ LOGO = r"""
          /____/"""
 
 
+# Stand-in for the timer while the lock panel is laid out.  As wide as
+# _fmt_time() gets in the first 1000 days, and made of characters the panel
+# never uses.
+_TIMER_SLOT = "###d ##:##:##"
+
+
+class _LockScreen:
+    """The lock panel, laid out once and then patched in place.
+
+    The panel is rendered to segments once per terminal size with
+    ``_TIMER_SLOT`` where the timer goes.  After that a refresh only swaps
+    the timer text into that one segment — no tables, alignment or logo
+    layout are rebuilt.  A timer that ever outgrows the slot gets a wider
+    one and a fresh layout rather than pushing the panel's border out.
+    """
+
+    def __init__(self, build: Callable[[str], Panel]) -> None:
+        self._build = build
+        self._size: tuple[int, int | None] | None = None
+        self._lines: list[list[Segment]] = []
+        self._slot: tuple[int, int] | None = None  # (line, segment) index
+        self._slot_text = _TIMER_SLOT
+        self.timer = "00:00"
+
+    def _layout(self, console: Console, options: ConsoleOptions) -> None:
+        self._lines = console.render_lines(self._build(self._slot_text), options)
+        self._size = (options.max_width, options.height)
+        self._slot = None
+        for y, line in enumerate(self._lines):
+            for x, segment in enumerate(line):
+                if self._slot_text in segment.text:
+                    self._slot = (y, x)
+                    return
+
+    def __rich_console__(
+        self, console: Console, options: ConsoleOptions,
+    ) -> RenderResult:
+        if len(self.timer) > len(self._slot_text):
+            self._slot_text = "#" * len(self.timer)
+            self._size = None
+        if self._size != (options.max_width, options.height):
+            self._layout(console, options)
+
+        slot_y, slot_x = self._slot if self._slot else (-1, -1)
+        newline = Segment.line()
+        for y, line in enumerate(self._lines):
+            if y == slot_y:
+                text, style, control = line[slot_x]
+                # Keep the padding unstyled, as a shorter cell would be.
+                pad = " " * (len(self._slot_text) - len(self.timer))
+                line = line.copy()
+                line[slot_x:slot_x + 1] = [
+                    Segment(text.replace(self._slot_text, self.timer), style, control),
+                    Segment(pad),
+                ]
+            yield from line
+            yield newline
+
+
 # ---------------------------------------------------------------------------
 # Display
 # ---------------------------------------------------------------------------
@@ -46,6 +111,8 @@ class Display:
         self._stop = threading.Event()
         self._thread: threading.Thread | None = None
         self._start_time: float = 0.0
+        # Set by the latency guard to keep the terminal quiet under load.
+        self._paused = False
 
     # ---- startup sequence ----
 
@@ -125,17 +192,22 @@ class Display:
         caffeinate_status: str,
     ) -> None:
         self.console.clear()
+        screen = _LockScreen(
+            lambda timer: self._build_lock_panel(caffeinate_status, timer)
+        )
         try:
+            # Refreshed by hand, and only when the timer text changes.
             with Live(
+                screen,
                 console=self.console,
-                refresh_per_second=2,
+                auto_refresh=False,
                 transient=True,
             ) as live:
                 while not self._stop.is_set():
-                    elapsed = time.time() - self._start_time
-                    live.update(
-                        self._build_lock_panel(caffeinate_status, elapsed)
-                    )
+                    timer = _fmt_time(time.time() - self._start_time)
+                    if timer != screen.timer and not self._paused:
+                        screen.timer = timer
+                        live.refresh()
                     self._stop.wait(0.5)
         except Exception:
             pass  # terminal issues — event tap still works
@@ -143,7 +215,7 @@ class Display:
     def _build_lock_panel(
         self,
         caffeinate: str,
-        elapsed: float,
+        timer: str,
     ) -> Panel:
         # Status table
         table = Table(
@@ -157,7 +229,7 @@ class Display:
 
         table.add_row("Status", "[bold red]LOCKED[/]")
         table.add_row("Caffeinate", caffeinate)
-        table.add_row("Locked for", f"[bold green]{_fmt_time(elapsed)}[/]")
+        table.add_row("Locked for", f"[bold green]{timer}[/]")
 
         content = Group(
             Text(""),
@@ -179,15 +251,23 @@ class Display:
             padding=(0, 3),
         )
 
-    # ---- unlock display ----
+    def pause_refresh(self, paused: bool) -> None:
+        """Freeze (or resume) the lock screen's timer; the panel stays up."""
+        self._paused = paused
 
-    def show_unlocked(self) -> None:
-        elapsed = time.time() - self._start_time
+    def close(self) -> None:
+        """Stop the live lock view without printing anything."""
         self._stop.set()
         if self._thread:
             self._thread.join(timeout=2)
             self._thread = None
 
+    # ---- unlock display ----
+
+    def show_unlocked(self, timings: list[tuple[str, float]] | None = None) -> None:
+        elapsed = time.time() - self._start_time if self._start_time else 0
+        self.close()
+
         self.console.clear()
         duration = _fmt_time(elapsed)
 
@@ -217,18 +297,27 @@ class Display:
             )
         )
         self.console.print()
+        if timings:
+            self.show_timings(timings)
 
     # ---- interrupted / killed ----
 
-    def show_killed(self) -> None:
+    def show_killed(self, timings: list[tuple[str, float]] | None = None) -> None:
         elapsed = time.time() - self._start_time if self._start_time else 0
-        self._stop.set()
-        if self._thread:
-            self._thread.join(timeout=2)
-            self._thread = None
+        self.close()
 
         self.console.print()
         self.console.print(
             f"  [yellow]⚡[/]  Interrupted · Session: {_fmt_time(elapsed)}"
         )
         self.console.print()
+        if timings:
+            self.show_timings(timings)
+
+    # ---- --timings ----
+
+    def show_timings(self, timings: list[tuple[str, float]]) -> None:
+        self.console.print("  [dim]Startup (time since launch)[/]")
+        for phase, seconds in timings:
+            self.console.print(f"  [cyan]{seconds * 1000:9.1f} ms[/]  {phase}")
+        self.console.print()
@@ -0,0 +1,141 @@
+"""Run the terminal display in a separate process.
+
+:class:`RemoteDisplay` has the same methods as :class:`~vegitate.display.Display`
+but only writes one short JSON line per call down a pipe.  A renderer
+subprocess (``python -m vegitate.display_process``) owns the terminal, the
+Rich import and the live refresh loop, so none of that competes with the
+event-tap callback for the GIL.
+
+If the renderer dies, calls become no-ops — the lock itself never depends on
+the display.  The pipe is non-blocking: if the renderer stalls and the pipe
+fills, calls are dropped rather than holding up the caller (the unlock worker
+must get to ``CFRunLoopStop`` whatever the terminal is doing).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import subprocess
+import sys
+
+# Calls after which the renderer has nothing left to show.
+_FINAL_CALLS = frozenset({"show_unlocked", "show_killed", "show_permission_error"})
+
+
+class RemoteDisplay:
+    """Drop-in for Display that forwards every call to a renderer process."""
+
+    def __init__(self) -> None:
+        self._proc: subprocess.Popen | None = subprocess.Popen(
+            [sys.executable, "-m", "vegitate.display_process"],
+            stdin=subprocess.PIPE,
+            bufsize=0,
+        )
+        self._fd = self._proc.stdin.fileno()  # type: ignore[union-attr]
+        os.set_blocking(self._fd, False)
+        self._pending = b""  # unwritten tail of a line the pipe only half took
+        self.dropped = 0
+
+    def _write(self, data: bytes) -> bool:
+        """Write what the pipe will take now; keep the rest for later."""
+        try:
+            written = os.write(self._fd, data)
+        except BlockingIOError:
+            written = 0
+        self._pending = data[written:]
+        return not self._pending
+
+    def _send(self, call: str, *args: object) -> None:
+        if self._proc is None:
+            return
+        line = json.dumps([call, *args]).encode() + b"\n"
+        try:
+            # Finish a half-written line first so the renderer never sees
+            # two lines spliced together; while it can't be finished the
+            # renderer is stalled and this call is dropped.
+            if self._pending and not self._write(self._pending):
+                self.dropped += 1
+            else:
+                self._write(line)
+        except (BrokenPipeError, OSError, ValueError):
+            self._proc = None  # renderer is gone — carry on without it
+            return
+        if call in _FINAL_CALLS:
+            self.close()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Let the renderer finish drawing, then reap it.
+
+        A renderer that is still behind on the pipe is stalled, so it is
+        killed straight away rather than waited for.
+        """
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            if proc.stdin:
+                proc.stdin.close()
+            proc.wait(timeout=0 if self._pending else timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+
+    # ---- Display interface ----
+
+    def show_banner(self, version: str) -> None:
+        self._send("show_banner", version)
+
+    def show_step(self, msg: str) -> None:
+        self._send("show_step", msg)
+
+    def show_error(self, msg: str) -> None:
+        self._send("show_error", msg)
+
+    def show_permission_error(self) -> None:
+        self._send("show_permission_error")
+
+    def show_locked(self, caffeinate_status: str) -> None:
+        self._send("show_locked", caffeinate_status)
+
+    def pause_refresh(self, paused: bool) -> None:
+        self._send("pause_refresh", paused)
+
+    def show_unlocked(self, timings: list[tuple[str, float]] | None = None) -> None:
+        self._send("show_unlocked", timings)
+
+    def show_killed(self, timings: list[tuple[str, float]] | None = None) -> None:
+        self._send("show_killed", timings)
+
+
+# ---------------------------------------------------------------------------
+# Renderer process
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    from .display import Display
+
+    # Ctrl-C reaches the whole process group; the parent decides what it
+    # means and tells us.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    display = Display()
+    allowed = {
+        "show_banner", "show_step", "show_error", "show_permission_error",
+        "show_locked", "show_unlocked", "show_killed", "pause_refresh",
+    }
+    for line in sys.stdin.buffer:
+        try:
+            call, *args = json.loads(line)
+        except ValueError:
+            continue
+        if call in allowed:
+            getattr(display, call)(*args)
+
+    # Parent went away mid-lock: stop the live view cleanly.
+    display.close()
+
+
+if __name__ == "__main__":
+    main()
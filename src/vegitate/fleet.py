@@ -0,0 +1,167 @@
+"""``vegitate fleet`` — poll the status endpoints of many vegitate hosts at once.
+
+Every host is polled concurrently on one asyncio event loop, up to
+*concurrency* requests in flight, each with its own timeout, so a round
+takes about as long as the slowest reachable host — or the timeout — rather
+than the sum of them.  Connections are pooled, one per host, and reused
+across rounds (``--watch``): the status endpoint keeps them alive, so after
+the first round a poll is a single request on an open socket.
+
+Only the standard library is used; the endpoint speaks just enough HTTP/1.1
+for that (see :mod:`vegitate.status`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+from .config import parse_address
+
+# (reader, writer) per (host, port).
+_Connection = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class FleetPoller:
+    """Poll *hosts* (``"host[:port]"`` strings) for their status.
+
+    :meth:`poll` returns one result dict per host, in the order given::
+
+        {"host": "kiosk-3:8787", "ok": True, "status": {...}, "error": None,
+         "latency_ms": 1.9}
+
+    A host that times out, refuses the connection or sends something that
+    isn't a status has ``ok`` false, ``status`` ``None`` and the reason in
+    ``error``.  Call :meth:`close` when done, to close pooled connections.
+    """
+
+    def __init__(self, hosts: list[str], timeout: float = 2.0, concurrency: int = 64) -> None:
+        # Raises ValueError on a bad address before anything is sent.
+        self.hosts = [(name, parse_address(name)) for name in hosts]
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.connects = 0
+        self._pool: dict[tuple[str, int], _Connection] = {}
+        self._limit: asyncio.Semaphore | None = None
+
+    async def poll(self) -> list[dict[str, object]]:
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self.concurrency)
+        return list(await asyncio.gather(*(self._poll_host(n, a) for n, a in self.hosts)))
+
+    async def close(self) -> None:
+        pool, self._pool = self._pool, {}
+        for _, writer in pool.values():
+            writer.close()
+        for _, writer in pool.values():
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _poll_host(self, name: str, address: tuple[str, int]) -> dict[str, object]:
+        result: dict[str, object] = {"host": name, "ok": False, "status": None, "error": None}
+        async with self._limit:  # type: ignore[union-attr]
+            start = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(self._get_status(address), self.timeout)
+            except asyncio.TimeoutError:
+                result["error"] = f"timed out after {self.timeout:g}s"
+            except (OSError, ValueError, asyncio.IncompleteReadError) as exc:
+                result["error"] = _describe(exc)
+            else:
+                result["ok"] = True
+                result["status"] = status
+            result["latency_ms"] = (time.perf_counter() - start) * 1000
+        return result
+
+    async def _get_status(self, address: tuple[str, int]) -> dict[str, object]:
+        # A connection is out of the pool while in use, and only goes back
+        # after a complete exchange — a timeout or error closes it.
+        conn = self._pool.pop(address, None)
+        if conn is not None:
+            try:
+                status = await self._request(conn, address)
+            except (OSError, asyncio.IncompleteReadError):
+                # The host closed the idle connection (e.g. it restarted):
+                # retry once on a fresh one.
+                conn[1].close()
+            except BaseException:
+                conn[1].close()
+                raise
+            else:
+                self._keep(address, conn)
+                return status
+        conn = await asyncio.open_connection(*address)
+        self.connects += 1
+        try:
+            status = await self._request(conn, address)
+        except BaseException:
+            conn[1].close()
+            raise
+        self._keep(address, conn)
+        return status
+
+    def _keep(self, address: tuple[str, int], conn: _Connection) -> None:
+        if not conn[1].is_closing():
+            self._pool[address] = conn
+
+    async def _request(self, conn: _Connection, address: tuple[str, int]) -> dict[str, object]:
+        reader, writer = conn
+        host = f"[{address[0]}]" if ":" in address[0] else address[0]
+        writer.write(
+            f"GET /status HTTP/1.1\r\nHost: {host}:{address[1]}\r\n"
+            f"Accept: application/json\r\n\r\n".encode()
+        )
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b"", None)
+        parts = status_line.split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith(b"HTTP/1."):
+            raise ValueError("not an HTTP status endpoint")
+        length = None
+        keep_alive = parts[0] == b"HTTP/1.1"
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            if name == b"content-length":
+                length = int(value)
+            elif name == b"connection":
+                keep_alive = value.strip().lower() == b"keep-alive"
+        body = await (reader.readexactly(length) if length is not None else reader.read())
+        if not keep_alive or length is None:
+            writer.close()  # not reusable, so not pooled
+        if parts[1] != b"200":
+            raise ValueError(f"HTTP {parts[1].decode(errors='replace')}")
+        status = json.loads(body)
+        if not isinstance(status, dict) or "locked" not in status:
+            raise ValueError("not a vegitate status")
+        return status
+
+
+def _describe(exc: BaseException) -> str:
+    if isinstance(exc, asyncio.IncompleteReadError):
+        return "connection closed"
+    if isinstance(exc, ConnectionRefusedError):
+        return "connection refused"
+    if isinstance(exc, OSError):
+        return exc.strerror or str(exc)
+    return str(exc)
+
+
+def summarize(results: list[dict[str, object]]) -> dict[str, int]:
+    """Counts of locked, unlocked and unreachable hosts."""
+    locked = sum(1 for r in results if r["ok"] and r["status"]["locked"])  # type: ignore[index]
+    reachable = sum(1 for r in results if r["ok"])
+    return {
+        "hosts": len(results),
+        "locked": locked,
+        "unlocked": reachable - locked,
+        "unreachable": len(results) - reachable,
+    }
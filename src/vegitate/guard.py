@@ -0,0 +1,122 @@
+"""Shed optional work when the tap callback gets close to its time budget.
+
+macOS disables an event tap whose callback is too slow; vegitate notices
+(``kCGEventTapDisabledByTimeout``) and turns it back on, but until then
+input goes through unfiltered.  :class:`LatencyGuard` watches for that
+coming: a few times a second it takes the callback latencies recorded since
+its last look (the stats histogram — nothing is added to the callback),
+turns them into a p99, and keeps a moving average of that.
+
+As the estimate climbs towards the budget, the guard steps up through the
+levels below — each one sheds what the previous ones did, plus more — and
+steps back down one level at a time once the estimate has fallen well
+below the level's threshold, so it doesn't flap on the boundary::
+
+    DISPLAY_PAUSED   at 25% of the budget: pause the lock screen's live refresh
+    BOOKKEEPING_OFF  at 50%: stop writing per-event journal records
+    MASK_NARROWED    at 75%: recreate the tap without mouse-move events, so
+                     the cursor moves (clicks and keys stay blocked)
+
+What shedding means is up to the owner: the guard only calls
+``apply(old_level, new_level)`` on each transition.
+"""
+
+from __future__ import annotations
+
+import threading
+from array import array
+from collections.abc import Callable
+
+from .stats import LATENCY_BUCKETS, CallbackStats, histogram_quantile_ns
+
+NORMAL = 0
+DISPLAY_PAUSED = 1
+BOOKKEEPING_OFF = 2
+MASK_NARROWED = 3
+
+LEVEL_NAMES = ("normal", "display paused", "bookkeeping off", "mask narrowed")
+
+# Fraction of the budget at which each level is entered...
+ENTER_AT = (0.0, 0.25, 0.50, 0.75)
+# ...and the fraction of that below which it's left again.
+LEAVE_BELOW = 0.5
+
+
+class LatencyGuard:
+    """Move between degradation levels as the callback's latency changes.
+
+    *stats* returns the live :class:`CallbackStats` (a daemon starts a new
+    one each session).  *budget_ns* is the latency to stay clear of.  Each
+    :meth:`sample` folds the window since the previous one into
+    :attr:`estimate` (an exponential moving average, weight *alpha*) and
+    calls *apply* with the new level if it changed; :meth:`start` runs
+    :meth:`sample` every *interval* seconds on a thread of its own.
+    """
+
+    def __init__(
+        self,
+        stats: Callable[[], CallbackStats],
+        budget_ns: int,
+        apply: Callable[[int, int], None],
+        interval: float = 0.25,
+        alpha: float = 0.3,
+        quantile: float = 0.99,
+    ) -> None:
+        self.stats = stats
+        self.budget_ns = budget_ns
+        self.apply = apply
+        self.interval = interval
+        self.alpha = alpha
+        self.quantile = quantile
+        self.level = NORMAL
+        self.estimate = 0.0
+        self.shed = 0       # transitions to a higher level
+        self.restored = 0   # ... and back down
+        self._source: CallbackStats | None = None
+        self._last = array("Q", bytes(8 * LATENCY_BUCKETS))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="vegitate-guard", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def sample(self) -> int:
+        """Update the estimate from the latest window; returns the level."""
+        stats = self.stats()
+        latency = stats.latency
+        if stats is not self._source:
+            self._source = stats
+            self._last = array("Q", bytes(8 * LATENCY_BUCKETS))
+        current = array("Q", latency)
+        window = [now - before for now, before in zip(current, self._last)]
+        self._last = current
+
+        # No events, no pressure: the estimate decays towards zero.
+        p = histogram_quantile_ns(window, self.quantile) if any(window) else 0
+        self.estimate += self.alpha * (p - self.estimate)
+
+        level = self.level
+        target = level
+        fraction = self.estimate / self.budget_ns
+        while target + 1 < len(ENTER_AT) and fraction >= ENTER_AT[target + 1]:
+            target += 1
+        if target == level and level and fraction < ENTER_AT[level] * LEAVE_BELOW:
+            target = level - 1
+        if target != level:
+            # Shed everything up to the target at once; restore one step at a time.
+            self.level = target
+            if target > level:
+                self.shed += 1
+            else:
+                self.restored += 1
+            self.apply(level, target)
+        return self.level
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
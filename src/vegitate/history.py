@@ -0,0 +1,207 @@
+"""Session history in a local SQLite database.
+
+Every lock session becomes one row — when it started and ended, how it
+was unlocked, and what the callback saw.  Rows are written by
+:class:`HistoryWriter` on its own thread, a batch per transaction, so
+neither the tap nor the display ever waits on the disk.  ``vegitate
+history`` reads the same database with :func:`summarize`; its queries are
+range scans of an index that covers every column they need, so they stay
+fast however many years of sessions pile up.
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .stats import EVENT_NAMES, CallbackStats
+
+# How a session ended.
+UNLOCK_METHODS = ("combo", "panic", "command", "signal")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id              INTEGER PRIMARY KEY,
+    started         REAL NOT NULL,      -- Unix time
+    ended           REAL NOT NULL,
+    method          TEXT NOT NULL,      -- one of UNLOCK_METHODS
+    events          INTEGER NOT NULL,   -- events the callback saw
+    key_downs       INTEGER NOT NULL,
+    tap_timeouts    INTEGER NOT NULL,   -- tap re-enabled after a timeout
+    tap_user        INTEGER NOT NULL,   -- ... after being disabled by input
+    events_by_type  TEXT NOT NULL       -- JSON: event name -> count
+);
+-- Covers the range queries below, so they never touch the table itself.
+CREATE INDEX IF NOT EXISTS sessions_by_start ON sessions (started, ended, method);
+"""
+
+INSERT = """
+INSERT INTO sessions
+    (started, ended, method, events, key_downs, tap_timeouts, tap_user, events_by_type)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# (started, ended, method, events, key_downs, tap_timeouts, tap_user, events_by_type)
+Row = tuple[float, float, str, int, int, int, int, str]
+
+
+def session_row(started: float, ended: float, method: str, stats: CallbackStats) -> Row:
+    """The database row for one session."""
+    by_type = {EVENT_NAMES.get(t, str(t)): n for t, n in enumerate(stats.events) if n}
+    return (
+        started,
+        ended,
+        method,
+        stats.total,
+        stats.events[10],  # kCGEventKeyDown
+        stats.tap_reenabled_timeout,
+        stats.tap_reenabled_user,
+        json.dumps(by_type, separators=(",", ":")),
+    )
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """Open (creating if needed) the history database at *path*."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path, timeout=5.0)
+    # WAL: `vegitate history` can read while a daemon is writing.
+    db.execute("PRAGMA journal_mode = WAL")
+    db.execute("PRAGMA synchronous = NORMAL")
+    db.executescript(SCHEMA)
+    return db
+
+
+class HistoryWriter:
+    """Insert session rows from a background thread, in batched transactions.
+
+    :meth:`submit` only puts the row on a queue.  The writer thread takes
+    whatever has queued up — waiting up to *linger* seconds for more, to a
+    maximum of *batch* rows — and commits it as one transaction.  Like the
+    stats dump, history is best-effort: a database error loses that batch
+    (counted in :attr:`failed`), never the session.
+    """
+
+    def __init__(self, path: Path, batch: int = 256, linger: float = 0.25) -> None:
+        self.path = path
+        self.batch = batch
+        self.linger = linger
+        self.written = 0
+        self.failed = 0
+        self.transactions = 0
+        self._queue: queue.SimpleQueue[Row | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="vegitate-history", daemon=True)
+        self._thread.start()
+
+    def submit(self, row: Row) -> None:
+        self._queue.put(row)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write out everything submitted so far, then stop the thread."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        db: sqlite3.Connection | None = None
+        get = self._queue.get
+        done = False
+        while not done:
+            row = get()
+            if row is None:
+                break
+            rows = [row]
+            deadline = time.monotonic() + self.linger
+            while len(rows) < self.batch:
+                try:
+                    row = get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if row is None:
+                    done = True
+                    break
+                rows.append(row)
+
+            try:
+                if db is None:
+                    db = connect(self.path)
+                with db:
+                    db.executemany(INSERT, rows)
+            except sqlite3.Error:
+                self.failed += len(rows)
+            else:
+                self.written += len(rows)
+                self.transactions += 1
+        if db is not None:
+            db.close()
+
+
+# ---------------------------------------------------------------------- #
+#  queries                                                                #
+# ---------------------------------------------------------------------- #
+
+
+def summarize(path: Path, since: float, until: float) -> dict[str, object]:
+    """Sessions that started in ``[since, until)``: totals, and per local day.
+
+    A day's sessions and panics are the ones that started that day; its
+    locked time is the part of every session that fell inside it, so a
+    session that runs past midnight is split across the days it covers.
+
+    Raises :class:`FileNotFoundError` if there's no history yet.
+    """
+    if not path.exists():
+        raise FileNotFoundError(path)
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=5.0)
+    try:
+        totals = db.execute(
+            """
+            SELECT count(*), coalesce(sum(ended - started), 0),
+                   sum(method = 'combo'), sum(method = 'panic'),
+                   sum(method = 'command'), sum(method = 'signal')
+            FROM sessions WHERE started >= ? AND started < ?
+            """,
+            (since, until),
+        ).fetchone()
+        # Each session, then one more piece per local midnight it runs past.
+        # Midnights are worked out on the local calendar and converted back
+        # ('utc' treats its input as local time), so DST days come out 23
+        # or 25 hours long, as they were.
+        days = db.execute(
+            """
+            WITH RECURSIVE pieces(day, start, ended, first, panic) AS (
+                SELECT date(started, 'unixepoch', 'localtime'), started, ended,
+                       1, method = 'panic'
+                FROM sessions WHERE started >= ? AND started < ?
+                UNION ALL
+                SELECT date(day, '+1 day'),
+                       CAST(strftime('%s', day, '+1 day', 'utc') AS REAL), ended, 0, 0
+                FROM pieces
+                WHERE ended > CAST(strftime('%s', day, '+1 day', 'utc') AS REAL)
+            )
+            SELECT day, sum(first),
+                   sum(min(ended, CAST(strftime('%s', day, '+1 day', 'utc') AS REAL)) - start),
+                   sum(panic)
+            FROM pieces GROUP BY day ORDER BY day
+            """,
+            (since, until),
+        ).fetchall()
+    finally:
+        db.close()
+
+    sessions, locked, *methods = totals
+    by_method = {m: n or 0 for m, n in zip(UNLOCK_METHODS, methods)}
+    return {
+        "since": since,
+        "until": until,
+        "sessions": sessions,
+        "locked_seconds": locked,
+        "unlocks": by_method,
+        "panic_rate": by_method["panic"] / sessions if sessions else 0.0,
+        "days": [
+            {"day": day, "sessions": n, "locked_seconds": secs, "panic": panic}
+            for day, n, secs, panic in days
+        ],
+    }
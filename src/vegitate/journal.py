@@ -0,0 +1,264 @@
+"""Fixed-size, memory-mapped journal of what the event tap did.
+
+The journal is a file of a fixed size — a 64-byte header followed by a ring
+of ``capacity`` 16-byte little-endian records — mapped into memory by the
+locked session and by ``vegitate stats``, which can read it at any time,
+including while the session is still writing::
+
+    header
+        8 bytes  magic          b"VGTJRN01"
+        uint32   capacity       records in the ring (a power of two)
+        uint32   pid            of the writer
+        uint64   seq            records written so far (the next one goes
+                                to slot ``seq % capacity``)
+        uint64   started        writer's start, wall clock, ns since the epoch
+        uint64   base           writer's start, perf_counter_ns()
+    record
+        uint16   event type     CGEventType, low 16 bits (the tap-disabled
+                                pseudo-types become 0xFFFE / 0xFFFF)
+        uint8    kind           see below
+        uint8    keycode        (marker records only)
+        uint32   elapsed        callback time in ns (event records only)
+        uint64   timestamp      perf_counter_ns() when the event arrived
+
+Every event the callback sees writes one ``PASSED`` or ``SUPPRESSED``
+record; key-downs that matter for unlocking add a marker record
+(``PANIC_TAP``, ``WRONG_COMBO``, ``UNLOCK``), and ``SESSION`` marks a lock.
+Writing packs into the map in place, so the callback creates no objects,
+and the footprint is the file size however long the session runs — once
+the ring is full, the oldest records are overwritten.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+
+from .stats import EVENT_NAMES, LATENCY_BUCKETS, histogram_quantile_ns
+
+MAGIC = b"VGTJRN01"
+HEADER = struct.Struct("<8sIIQQQ")
+HEADER_SIZE = 64
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 16
+RECORD = struct.Struct("<HBBIQ")
+
+# 1 MiB of records: about a minute of a 1 kHz mouse flood.
+DEFAULT_CAPACITY = 1 << 16
+
+# Record kinds.
+PASSED = 0
+SUPPRESSED = 1
+PANIC_TAP = 2
+WRONG_COMBO = 3
+UNLOCK = 4
+SESSION = 5
+
+_MAX_ELAPSED = 0xFFFFFFFF
+_perf_counter_ns = time.perf_counter_ns
+
+
+class Journal:
+    """The writing side: a ring buffer of records in a shared file mapping.
+
+    Creating a journal (re)initialises *path*, so each session starts
+    empty.  :attr:`event` and :attr:`marker` are called from the tap
+    callback and only pack integers into the map.
+    """
+
+    __slots__ = ("path", "capacity", "event", "marker", "_mm")
+
+    def __init__(self, path: Path, capacity: int = DEFAULT_CAPACITY) -> None:
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError("journal capacity must be a power of two")
+        self.path = path
+        self.capacity = capacity
+        path.parent.mkdir(parents=True, exist_ok=True)
+        size = HEADER_SIZE + capacity * RECORD.size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            # Resized in place rather than truncated to zero first, so a
+            # reader with the old file mapped doesn't fault.  The old
+            # records are dead once the header says seq = 0.
+            os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        HEADER.pack_into(
+            self._mm, 0, MAGIC, capacity, os.getpid(), 0, time.time_ns(), _perf_counter_ns(),
+        )
+        self.event, self.marker = self._writers()
+
+    def _writers(self):  # noqa: ANN202
+        # Closures rather than methods: the sequence number and everything
+        # else the hot path touches are cell and closure locals, which is
+        # measurably cheaper per event than attribute lookups on self.
+        mm = self._mm
+        mask = self.capacity - 1
+        pack = RECORD.pack_into
+        pack_seq = SEQ.pack_into
+        header, seq_offset, max_elapsed = HEADER_SIZE, SEQ_OFFSET, _MAX_ELAPSED
+        seq = 0
+        # With split taps both run-loop threads write.  Unlocked, a switch
+        # between reading seq and bumping it gives two records one slot and
+        # skips another, and a late publish moves the header backwards.
+        # Bound acquire/release: cheaper per event than a with-block.
+        lock = threading.Lock()
+        acquire, release = lock.acquire, lock.release
+
+        def event(event_type: int, suppressed: bool, elapsed_ns: int, timestamp: int) -> None:
+            """One event the callback handled (*suppressed*: it returned None)."""
+            nonlocal seq
+            acquire()
+            try:
+                n = seq
+                seq = n + 1
+                # 16 is RECORD.size, as a literal to save a lookup per event.
+                pack(
+                    mm, header + (n & mask) * 16,
+                    event_type & 0xFFFF, suppressed, 0,
+                    elapsed_ns if elapsed_ns < max_elapsed else max_elapsed,
+                    timestamp,
+                )
+                pack_seq(mm, seq_offset, seq)
+            finally:
+                release()
+
+        def marker(kind: int, keycode: int = 0) -> None:
+            """A panic tap, wrong-combo attempt, unlock or session start."""
+            nonlocal seq
+            acquire()
+            try:
+                n = seq
+                seq = n + 1
+                pack(
+                    mm, header + (n & mask) * 16,
+                    0, kind, keycode & 0xFF, 0, _perf_counter_ns(),
+                )
+                pack_seq(mm, seq_offset, seq)
+            finally:
+                release()
+
+        return event, marker
+
+    @property
+    def seq(self) -> int:
+        """Records written so far."""
+        return SEQ.unpack_from(self._mm, SEQ_OFFSET)[0]
+
+    def flush(self) -> None:
+        """Write the records out to the file.
+
+        The map is never closed: the callback may still be running on
+        another thread, and readers see the same pages without a flush.
+        """
+        self._mm.flush()
+
+
+# ---------------------------------------------------------------------- #
+#  reading                                                                #
+# ---------------------------------------------------------------------- #
+
+
+def read_journal(path: Path) -> tuple[dict[str, int], list[tuple[int, int, int, int, int]]]:
+    """The header fields and the records still in the ring, oldest first.
+
+    Safe while the writer is running: records that may have been
+    overwritten while they were being copied are left out.  Raises
+    :class:`ValueError` if *path* isn't a journal.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError(f"{path} is empty") from None
+    with mm:
+        if len(mm) < HEADER_SIZE:
+            raise ValueError(f"{path} is not a vegitate journal")
+        magic, capacity, pid, seq, started, base = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or len(mm) != HEADER_SIZE + capacity * RECORD.size:
+            raise ValueError(f"{path} is not a vegitate journal")
+        ring = mm[HEADER_SIZE:]
+        after = SEQ.unpack_from(mm, SEQ_OFFSET)[0]
+
+    # Oldest record that is certainly intact: anything the writer reached
+    # while we copied may already be a newer record — up to `after`, plus
+    # the one it may be packing before publishing it (two with split taps).
+    first = min(seq, max(0, after + 2 - capacity))
+    start = (first % capacity) * RECORD.size
+    ordered = ring[start:] + ring[:start]
+    records = list(RECORD.iter_unpack(ordered[:max(0, seq - first) * RECORD.size]))
+    header = {
+        "capacity": capacity,
+        "pid": pid,
+        "seq": seq,
+        "first": first,
+        "started": started,
+        "base": base,
+    }
+    return header, records
+
+
+def summarize(path: Path) -> dict[str, object]:
+    """Aggregate the journal at *path* into per-event-type summaries."""
+    header, records = read_journal(path)
+    base = header["base"]
+    started = header["started"]
+
+    per_type: dict[int, list] = {}  # type → [suppressed, passed, histogram, max ns]
+    markers = {PANIC_TAP: 0, WRONG_COMBO: 0, UNLOCK: 0, SESSION: 0}
+    first_ts = last_ts = None
+    for event_type, kind, _keycode, elapsed, timestamp in records:
+        if first_ts is None:
+            first_ts = timestamp
+        last_ts = timestamp
+        if kind in markers:
+            markers[kind] += 1
+            continue
+        entry = per_type.get(event_type)
+        if entry is None:
+            entry = per_type[event_type] = [0, 0, [0] * LATENCY_BUCKETS, 0]
+        entry[0 if kind == SUPPRESSED else 1] += 1
+        entry[2][(elapsed >> 10).bit_length()] += 1
+        if elapsed > entry[3]:
+            entry[3] = elapsed
+
+    events = {}
+    for event_type in sorted(per_type):
+        suppressed, passed, histogram, max_ns = per_type[event_type]
+        if event_type >= 0xFFFE:
+            name = "tap_disabled_by_" + ("timeout" if event_type == 0xFFFE else "user")
+        else:
+            name = EVENT_NAMES.get(event_type, str(event_type))
+        events[name] = {
+            "suppressed": suppressed,
+            "passed": passed,
+            "p50_us": histogram_quantile_ns(histogram, 0.50) / 1000,
+            "p99_us": histogram_quantile_ns(histogram, 0.99) / 1000,
+            "max_us": max_ns / 1000,
+        }
+
+    def wall(ts: int | None) -> float | None:
+        return None if ts is None else (started + ts - base) / 1e9
+
+    return {
+        "path": str(path),
+        "pid": header["pid"],
+        "writer_started": started / 1e9,
+        "records": len(records),
+        "capacity": header["capacity"],
+        "overwritten": header["first"],
+        "from": wall(first_ts),
+        "to": wall(last_ts),
+        "sessions": markers[SESSION],
+        "events": events,
+        "suppressed_total": sum(e["suppressed"] for e in events.values()),
+        "panic_taps": markers[PANIC_TAP],
+        "wrong_combo_attempts": markers[WRONG_COMBO],
+        "unlocks": markers[UNLOCK],
+    }
+
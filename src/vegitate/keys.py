@@ -2,8 +2,6 @@
 
 from __future__ import annotations
 
-import Quartz
-
 # ---------------------------------------------------------------------------
 # macOS virtual key codes
 # ---------------------------------------------------------------------------
@@ -16,27 +14,40 @@ KEY_MAP: dict[str, int] = {
     "l": 37, "j": 38, "'": 39, "k": 40, ";": 41, "\\": 42, ",": 43,
     "/": 44, "n": 45, "m": 46, ".": 47, "tab": 48, "space": 49,
     "`": 50, "delete": 51, "escape": 53,
+    # Volume keys (external keyboards; built-in media keys bypass the tap)
+    "volume_up": 72, "volume_down": 73, "mute": 74,
     # F-keys
     "f1": 122, "f2": 120, "f3": 99, "f4": 118, "f5": 96, "f6": 97,
     "f7": 98, "f8": 100, "f9": 101, "f10": 109, "f11": 103, "f12": 111,
 }
 
+# ---------------------------------------------------------------------------
+# CGEventFlags modifier bits
+#
+# Same values as Quartz.kCGEventFlagMask* (CGEventTypes.h).  Spelled out here
+# so parsing a combo doesn't have to import pyobjc.
+# ---------------------------------------------------------------------------
+FLAG_MASK_SHIFT = 0x00020000
+FLAG_MASK_CONTROL = 0x00040000
+FLAG_MASK_ALTERNATE = 0x00080000
+FLAG_MASK_COMMAND = 0x00100000
+
 MODIFIER_MAP: dict[str, int] = {
-    "cmd":     Quartz.kCGEventFlagMaskCommand,
-    "command": Quartz.kCGEventFlagMaskCommand,
-    "shift":   Quartz.kCGEventFlagMaskShift,
-    "ctrl":    Quartz.kCGEventFlagMaskControl,
-    "control": Quartz.kCGEventFlagMaskControl,
-    "alt":     Quartz.kCGEventFlagMaskAlternate,
-    "option":  Quartz.kCGEventFlagMaskAlternate,
-    "opt":     Quartz.kCGEventFlagMaskAlternate,
+    "cmd":     FLAG_MASK_COMMAND,
+    "command": FLAG_MASK_COMMAND,
+    "shift":   FLAG_MASK_SHIFT,
+    "ctrl":    FLAG_MASK_CONTROL,
+    "control": FLAG_MASK_CONTROL,
+    "alt":     FLAG_MASK_ALTERNATE,
+    "option":  FLAG_MASK_ALTERNATE,
+    "opt":     FLAG_MASK_ALTERNATE,
 }
 
 ALL_MODIFIER_BITS: int = (
-    Quartz.kCGEventFlagMaskCommand
-    | Quartz.kCGEventFlagMaskShift
-    | Quartz.kCGEventFlagMaskControl
-    | Quartz.kCGEventFlagMaskAlternate
+    FLAG_MASK_COMMAND
+    | FLAG_MASK_SHIFT
+    | FLAG_MASK_CONTROL
+    | FLAG_MASK_ALTERNATE
 )
 
 # Canonical names for display
@@ -55,6 +66,28 @@ def parse_combo(combo_str: str) -> tuple[int, int]:
 
     Raises :class:`ValueError` on bad input.
     """
+    return _parse_step(combo_str, require_modifier=True)
+
+
+def parse_sequence(seq_str: str) -> list[tuple[int, int]]:
+    """Parse an unlock sequence like ``ctrl+cmd+u g`` into its steps.
+
+    Steps are separated by whitespace and each one is parsed like a combo,
+    except that only the first step needs a modifier — later steps may be
+    bare keys.  A plain combo is just a one-step sequence.
+
+    Raises :class:`ValueError` on bad input.
+    """
+    steps = seq_str.split()
+    if not steps:
+        raise ValueError("Unlock combo is empty.")
+    return [
+        _parse_step(step, require_modifier=(i == 0))
+        for i, step in enumerate(steps)
+    ]
+
+
+def _parse_step(combo_str: str, require_modifier: bool) -> tuple[int, int]:
     parts = [p.strip().lower() for p in combo_str.split("+")]
     modifiers = 0
     keycode: int | None = None
@@ -78,7 +111,7 @@ def parse_combo(combo_str: str) -> tuple[int, int]:
 
     if keycode is None:
         raise ValueError("Combo must include exactly one non-modifier key.")
-    if modifiers == 0:
+    if modifiers == 0 and require_modifier:
         raise ValueError(
             "Combo must include at least one modifier (ctrl, cmd, shift, alt)."
         )
@@ -103,3 +136,8 @@ def format_combo(combo_str: str) -> str:
     if key_part:
         ordered.append(key_part)
     return " + ".join(ordered)
+
+
+def format_sequence(seq_str: str) -> str:
+    """Like :func:`format_combo`, for every step of an unlock sequence."""
+    return " → ".join(format_combo(step) for step in seq_str.split())
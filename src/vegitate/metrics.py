@@ -0,0 +1,135 @@
+"""Metrics for node-exporter's textfile collector.
+
+node-exporter reads every ``*.prom`` file in its textfile directory on each
+scrape.  :class:`MetricsExporter` rewrites one such file every *interval*
+seconds from its own thread — the tap callback only bumps the counters it
+always bumps — by writing a temporary file next to it and renaming it over
+the old one, so a scrape sees either the previous export or the new one,
+never part of either.
+
+The file is in the Prometheus text format the collector parses, ending with
+an OpenMetrics-style ``# EOF`` line (a comment to the collector) so anything
+else reading it can tell it's complete.  Event and tap counters belong to
+the current session: they restart from zero on each lock, which Prometheus
+treats as a counter reset.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from . import __version__
+from .stats import EVENT_NAMES
+
+if TYPE_CHECKING:
+    from .core import Vegitate
+
+QUANTILES = (0.5, 0.99, 0.999)
+
+
+def render(vegitate: Vegitate) -> str:
+    """The metrics for *vegitate*'s current state, as a ``.prom`` file."""
+    stats = vegitate.stats
+    locked = vegitate.locked
+    since = vegitate.locked_since
+    lines: list[str] = []
+
+    def metric(name: str, kind: str, doc: str, samples: list[tuple[str, float]]) -> None:
+        lines.append(f"# HELP {name} {doc}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+
+    metric("vegitate_info", "gauge", "Version of the running vegitate.",
+           [(f'{{version="{__version__}"}}', 1)])
+    metric("vegitate_locked", "gauge", "1 while input is locked.",
+           [("", int(locked))])
+    metric("vegitate_session_uptime_seconds", "gauge",
+           "How long the current session has been locked (0 when unlocked).",
+           [("", round(time.time() - since, 3) if locked and since else 0.0)])
+    metric("vegitate_sessions_total", "counter", "Lock sessions started by this process.",
+           [("", getattr(vegitate, "sessions", 1))])
+    metric("vegitate_caffeinate_running", "gauge",
+           "1 while the keep-awake backend is holding the Mac awake.",
+           [("", int(vegitate.keep_awake_active))])
+    awake = vegitate._awake
+    metric("vegitate_keep_awake_restarts_total", "counter",
+           "Times the caffeinate child died during a session and was restarted.",
+           [("", awake.restarts if awake is not None else 0)])
+
+    suppressed = stats.suppressed()
+    metric("vegitate_events_suppressed_total", "counter",
+           "Events blocked this session, by event type.",
+           [(f'{{type="{EVENT_NAMES.get(t, str(t))}"}}', n) for t, n in suppressed.items()])
+    metric("vegitate_events_passed_total", "counter",
+           "Events let through this session, by event type.",
+           [(f'{{type="{EVENT_NAMES.get(t, str(t))}"}}', n)
+            for t, n in enumerate(stats.passed) if n])
+    metric("vegitate_callback_latency_seconds", "gauge",
+           "Event-tap callback time this session (histogram bucket upper bound).",
+           [(f'{{quantile="{q:g}"}}', stats.quantile(q) / 1e6) for q in QUANTILES])
+    guard = vegitate._guard
+    metric("vegitate_guard_level", "gauge",
+           "Latency guard: 0 normal, 1 display paused, 2 bookkeeping off, 3 mask narrowed.",
+           [("", guard.level if guard is not None else 0)])
+    metric("vegitate_guard_transitions_total", "counter",
+           "Latency guard level changes, by direction.",
+           [('{direction="shed"}', guard.shed if guard is not None else 0),
+            ('{direction="restore"}', guard.restored if guard is not None else 0)])
+    metric("vegitate_tap_reenabled_total", "counter",
+           "Times macOS disabled the event tap and it was re-enabled, by reason.",
+           [('{reason="timeout"}', stats.tap_reenabled_timeout),
+            ('{reason="user"}', stats.tap_reenabled_user)])
+    lines.append("# EOF\n")
+    return "\n".join(lines)
+
+
+class MetricsExporter:
+    """Rewrite *path* with :func:`render` every *interval* seconds.
+
+    Writes once on :meth:`start`, then on every tick, then a last time on
+    :meth:`stop`.  Like the stats dump, exporting is best-effort: a failed
+    write is counted in :attr:`failed` and tried again next tick.
+    """
+
+    def __init__(self, vegitate: Vegitate, path: Path, interval: float = 15.0) -> None:
+        self.vegitate = vegitate
+        self.path = path
+        self.interval = interval
+        self.written = 0
+        self.failed = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="vegitate-metrics", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Write the final state and stop the thread."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def write(self) -> None:
+        path = self.path
+        # Same directory, so the rename is atomic; not *.prom, so the
+        # collector never reads it half-written.
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            text = render(self.vegitate)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(text)
+            os.replace(tmp, path)
+        except OSError:
+            self.failed += 1
+            tmp.unlink(missing_ok=True)
+        else:
+            self.written += 1
+
+    def _run(self) -> None:
+        self.write()
+        while not self._stop.wait(self.interval):
+            self.write()
+        self.write()
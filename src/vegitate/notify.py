@@ -0,0 +1,166 @@
+"""macOS notifications from one long-lived worker (best-effort).
+
+:meth:`Notifier.send` never blocks: it appends to a small bounded queue and
+returns.  A background thread feeds the queue, one line per notification,
+to a single ``osascript -i`` child, which reads AppleScript statements from
+stdin for as long as it runs, so a lock/unlock doesn't fork a process.
+
+Notifications only report the latest state, so the worker doesn't try to
+deliver everything it's given:
+
+* a burst (whatever queued up while the worker was busy, or within
+  *linger* seconds of the first) is coalesced into its newest message;
+* when the queue is full the oldest message is dropped for the new one;
+* a message that waited longer than *max_age* seconds is dropped as stale.
+
+Message text is always sent as a quoted AppleScript string literal, so
+nothing in it can end the string or the statement.  A child that dies is
+replaced on the next message; one that can't be started (no ``osascript``
+off macOS) turns the notifier off.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import threading
+import time
+from collections import deque
+
+# Characters that may appear in a literal as escapes; any other control
+# character is left out, since the child reads one statement per line.
+_ESCAPES = {"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_QUOTE = str.maketrans(
+    {chr(c): None for c in range(0x20)}
+    | {"\x7f": None, "\u2028": " ", "\u2029": " "}
+    | _ESCAPES
+)
+
+
+def applescript_string(text: str) -> str:
+    """*text* as an AppleScript string literal, quotes included."""
+    return '"' + text.translate(_QUOTE) + '"'
+
+
+def notification_script(title: str, message: str) -> str:
+    """The one-line AppleScript statement that posts a notification."""
+    return (
+        f"display notification {applescript_string(message)} "
+        f"with title {applescript_string(title)}"
+    )
+
+
+class Notifier:
+    """Post notifications from a background thread through one child.
+
+    Counters: :attr:`sent`, and the messages never sent because they were
+    :attr:`coalesced`, :attr:`dropped` (queue full), :attr:`stale` or
+    :attr:`failed` (the child couldn't be started or written to).
+    """
+
+    def __init__(
+        self,
+        command: tuple[str, ...] = ("osascript", "-i"),
+        maxsize: int = 8,
+        linger: float = 0.1,
+        max_age: float = 10.0,
+    ) -> None:
+        self.command = command
+        self.linger = linger
+        self.max_age = max_age
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.stale = 0
+        self.failed = 0
+        self.spawned = 0
+        self._pending: deque[tuple[float, str, str]] = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._disabled = False
+        self._proc: subprocess.Popen | None = None
+        self._thread = threading.Thread(target=self._run, name="vegitate-notify", daemon=True)
+        self._thread.start()
+
+    def send(self, title: str, message: str) -> None:
+        """Queue a notification; returns straight away."""
+        with self._cond:
+            if self._closed or self._disabled:
+                self.dropped += 1
+                return
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1  # the deque drops the oldest
+            self._pending.append((time.monotonic(), title, message))
+            self._cond.notify()
+
+    def close(self, timeout: float = 1.0) -> None:
+        """Post what's queued, then let the child exit once it's done.
+
+        The child isn't waited for: it finishes the statements it was given
+        and exits at end of input, as a one-off ``osascript`` would.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    break
+            if self.linger > 0 and not self._closed:
+                time.sleep(self.linger)  # let the rest of a burst arrive
+            with self._cond:
+                burst = list(self._pending)
+                self._pending.clear()
+            queued, title, message = burst[-1]
+            self.coalesced += len(burst) - 1
+            if time.monotonic() - queued > self.max_age:
+                self.stale += 1
+                continue
+            # Quoted here, so only what's actually sent is, off the caller.
+            self._write(notification_script(title, message))
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.stdin is not None:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+    def _write(self, line: str) -> None:
+        data = (line + "\n").encode()
+        for _ in range(2):  # a dead child is replaced once
+            proc = self._proc
+            if proc is None or proc.poll() is not None:
+                try:
+                    proc = self._proc = self._spawn()
+                except OSError:
+                    self.failed += 1
+                    with self._cond:
+                        self._disabled = True
+                        self.dropped += len(self._pending)
+                        self._pending.clear()
+                    return
+            try:
+                proc.stdin.write(data)  # type: ignore[union-attr]
+                proc.stdin.flush()  # type: ignore[union-attr]
+            except OSError:
+                self._proc = None
+                continue
+            self.sent += 1
+            return
+        self.failed += 1
+
+    def _spawn(self) -> subprocess.Popen:
+        self.spawned += 1
+        return subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            # Out of the terminal's process group: a Ctrl-C that ends the
+            # session shouldn't take the last notification with it.
+            start_new_session=True,
+        )
@@ -0,0 +1,158 @@
+"""Passthrough policy: which input is allowed through while locked.
+
+The ``[passthrough]`` section of the config file is compiled into integers
+used as bitsets — one bit per CGEventType, one bit per keycode — so every
+allow/deny decision in the tap callback is a shift and a mask::
+
+    [passthrough]
+    events = ["mouse_move", "scroll"]
+    keys = ["volume_up", "volume_down", "mute"]
+    click_regions = [[0, 0, 200, 100]]   # x, y, width, height (points)
+
+Everything not allowed is suppressed.  Key-downs are always seen by the
+callback, since that's where unlock and panic detection happen.
+"""
+
+from __future__ import annotations
+
+from .keys import KEY_MAP
+
+# CGEventType values (CGEventTypes.h), spelled out so this module doesn't
+# need Quartz — see keys.py for the same reasoning.
+LEFT_MOUSE_DOWN = 1
+LEFT_MOUSE_UP = 2
+RIGHT_MOUSE_DOWN = 3
+RIGHT_MOUSE_UP = 4
+MOUSE_MOVED = 5
+LEFT_MOUSE_DRAGGED = 6
+RIGHT_MOUSE_DRAGGED = 7
+KEY_DOWN = 10
+KEY_UP = 11
+FLAGS_CHANGED = 12
+SCROLL_WHEEL = 22
+OTHER_MOUSE_DOWN = 25
+OTHER_MOUSE_UP = 26
+OTHER_MOUSE_DRAGGED = 27
+
+# Policy names → the event types they cover.
+EVENT_GROUPS: dict[str, tuple[int, ...]] = {
+    "mouse_move": (MOUSE_MOVED,),
+    "scroll": (SCROLL_WHEEL,),
+    "left_click": (LEFT_MOUSE_DOWN, LEFT_MOUSE_UP),
+    "right_click": (RIGHT_MOUSE_DOWN, RIGHT_MOUSE_UP),
+    "other_click": (OTHER_MOUSE_DOWN, OTHER_MOUSE_UP),
+    "drag": (LEFT_MOUSE_DRAGGED, RIGHT_MOUSE_DRAGGED, OTHER_MOUSE_DRAGGED),
+    "modifiers": (FLAGS_CHANGED,),
+}
+
+CLICK_TYPES: tuple[int, ...] = (
+    LEFT_MOUSE_DOWN, LEFT_MOUSE_UP,
+    RIGHT_MOUSE_DOWN, RIGHT_MOUSE_UP,
+    OTHER_MOUSE_DOWN, OTHER_MOUSE_UP,
+)
+
+# Every event type the tap listens to when nothing is allowed.
+LOCKED_TYPES: tuple[int, ...] = (
+    KEY_DOWN, KEY_UP, FLAGS_CHANGED,
+    *CLICK_TYPES,
+    MOUSE_MOVED,
+    LEFT_MOUSE_DRAGGED, RIGHT_MOUSE_DRAGGED, OTHER_MOUSE_DRAGGED,
+    SCROLL_WHEEL,
+)
+
+
+def _bits(values: tuple[int, ...] | list[int]) -> int:
+    mask = 0
+    for v in values:
+        mask |= 1 << v
+    return mask
+
+
+# Event types that belong on the keyboard tap when taps are split.
+KEYBOARD_MASK = _bits((KEY_DOWN, KEY_UP, FLAGS_CHANGED))
+
+
+class Passthrough:
+    """A compiled passthrough policy.
+
+    ``allow_types`` and ``allow_keys`` are bitsets; ``click_regions`` holds
+    ``(x0, y0, x1, y1)`` rectangles; ``tap_mask`` is the CGEventMask to tap
+    with — fully allowed event types are left out of it entirely, so they
+    never reach the callback at all.
+    """
+
+    __slots__ = ("allow_types", "allow_keys", "click_regions", "tap_mask")
+
+    def __init__(
+        self,
+        allow_types: int = 0,
+        allow_keys: int = 0,
+        click_regions: tuple[tuple[float, float, float, float], ...] = (),
+    ) -> None:
+        self.allow_types = allow_types
+        self.allow_keys = allow_keys
+        self.click_regions = click_regions
+        self.tap_mask = (_bits(LOCKED_TYPES) & ~allow_types) | (1 << KEY_DOWN)
+
+    def allows(
+        self, event_type: int, keycode: int = 0, x: float = 0.0, y: float = 0.0,
+    ) -> bool:
+        """Whether an event would be let through (ignoring unlock/panic)."""
+        if (self.allow_types >> event_type) & 1:
+            return True
+        if event_type in (KEY_DOWN, KEY_UP):
+            return bool((self.allow_keys >> keycode) & 1)
+        if event_type in CLICK_TYPES:
+            return any(
+                x0 <= x < x1 and y0 <= y < y1
+                for x0, y0, x1, y1 in self.click_regions
+            )
+        return False
+
+
+def compile_passthrough(
+    section: dict[str, object] | None, allow_mouse_move: bool = False,
+) -> Passthrough:
+    """Compile a ``[passthrough]`` config section.
+
+    *allow_mouse_move* is the older single-purpose flag and is equivalent to
+    ``events = ["mouse_move"]``.  Raises :class:`ValueError` on unknown event
+    names, unknown keys or malformed regions.
+    """
+    section = section or {}
+    unknown = set(section) - {"events", "keys", "click_regions"}
+    if unknown:
+        raise ValueError(
+            f"Unknown [passthrough] setting(s): {', '.join(sorted(unknown))}"
+        )
+
+    types: list[int] = [MOUSE_MOVED] if allow_mouse_move else []
+    for name in section.get("events", []):  # type: ignore[union-attr]
+        if name not in EVENT_GROUPS:
+            raise ValueError(
+                f"Unknown passthrough event '{name}'.\n"
+                f"  Events : {', '.join(EVENT_GROUPS)}"
+            )
+        types.extend(EVENT_GROUPS[name])
+
+    keys: list[int] = []
+    for name in section.get("keys", []):  # type: ignore[union-attr]
+        key = str(name).lower()
+        if key not in KEY_MAP:
+            raise ValueError(
+                f"Unknown passthrough key '{name}'.\n"
+                f"  Keys : {', '.join(sorted(KEY_MAP))}"
+            )
+        keys.append(KEY_MAP[key])
+
+    regions: list[tuple[float, float, float, float]] = []
+    for region in section.get("click_regions", []):  # type: ignore[union-attr]
+        try:
+            x, y, w, h = (float(v) for v in region)
+        except (TypeError, ValueError):
+            raise ValueError(
+                f"Bad click region {region!r} — expected [x, y, width, height]."
+            ) from None
+        regions.append((x, y, x + w, y + h))
+
+    return Passthrough(_bits(types), _bits(keys), tuple(regions))
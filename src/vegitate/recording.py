@@ -0,0 +1,140 @@
+"""Compact binary recordings of event-tap traffic.
+
+A recording is an 8-byte magic header followed by fixed-size little-endian
+records — one per event the tap saw::
+
+    uint32  event type   (CGEventType, including the tap-disabled pseudo-types)
+    uint16  keycode      (0 for non-keyboard events)
+    2 bytes padding
+    uint64  flags        (CGEventFlags, unmasked)
+    uint64  timestamp    (CGEventGetTimestamp, mach absolute time units)
+
+Recordings are captured on a Mac with ``vegitate --record FILE`` and played
+back anywhere with ``vegitate replay FILE``.
+"""
+
+from __future__ import annotations
+
+import queue
+import struct
+import threading
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+MAGIC = b"VGTREC01"
+RECORD = struct.Struct("<IH2xQQ")
+
+# (event_type, keycode, flags, timestamp)
+Record = tuple[int, int, int, int]
+
+
+class Recorder:
+    """Append records to a file from a background writer thread.
+
+    Records are packed in place into a preallocated buffer, so recording an
+    event costs one ``pack_into`` call (under a lock: with split taps both
+    run-loop threads record).  A full buffer is handed to the
+    writer thread and packing carries on in a spare one — the tap callback
+    never waits on the disk.  Buffers come back to the spares once written;
+    if the disk falls behind, another buffer is allocated rather than
+    stalling the callback or losing records.
+    """
+
+    def __init__(self, path: Path, batch: int = 4096, buffers: int = 2) -> None:
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._size = RECORD.size * batch
+        self._spare: queue.SimpleQueue[bytearray] = queue.SimpleQueue()
+        for _ in range(buffers - 1):
+            self._spare.put(bytearray(self._size))
+        self._full: queue.SimpleQueue[tuple[bytearray, int] | None] = queue.SimpleQueue()
+        self._buf = bytearray(self._size)
+        self._pos = 0
+        self._lock = threading.Lock()
+        self.count = 0
+        self.buffers = buffers
+        self.error: Exception | None = None
+        self._thread = threading.Thread(target=self._run, name="vegitate-recorder", daemon=True)
+        self._thread.start()
+
+    def record(self, event_type: int, keycode: int, flags: int, timestamp: int) -> None:
+        # Split taps record from two run-loop threads; the lock keeps a
+        # switch mid-record from losing, doubling or overrunning a slot.
+        with self._lock:
+            RECORD.pack_into(self._buf, self._pos, event_type, keycode, flags, timestamp)
+            self._pos += RECORD.size
+            self.count += 1
+            if self._pos >= self._size:
+                self._hand_off()
+
+    def flush(self) -> None:
+        """Hand what's buffered to the writer thread; doesn't wait for it."""
+        with self._lock:
+            if self._pos:
+                self._hand_off()
+
+    def _hand_off(self) -> None:
+        self._full.put((self._buf, self._pos))
+        try:
+            self._buf = self._spare.get_nowait()
+        except queue.Empty:
+            self._buf = bytearray(self._size)
+            self.buffers += 1
+        self._pos = 0
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Write out everything recorded, then close the file.
+
+        Raises the first error the writer hit, if any.
+        """
+        if self._file.closed:
+            return
+        self.flush()
+        self._full.put(None)
+        self._thread.join(timeout)
+        try:
+            self._file.close()
+        except OSError as exc:  # the header may still be buffered
+            self.error = self.error or exc
+        if self.error is not None:
+            raise self.error
+
+    def _run(self) -> None:
+        get = self._full.get
+        while (item := get()) is not None:
+            buf, size = item
+            if self.error is None:
+                try:
+                    self._file.write(memoryview(buf)[:size])
+                    self._file.flush()
+                except (OSError, ValueError) as exc:  # ValueError: closed on timeout
+                    self.error = exc
+            self._spare.put(buf)
+
+
+def write_records(path: Path, records: Iterable[Record]) -> int:
+    """Write *records* to a new recording at *path*; return how many."""
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        count = 0
+        for rec in records:
+            f.write(RECORD.pack(*rec))
+            count += 1
+    return count
+
+
+def read_records(path: Path) -> Iterator[Record]:
+    """Yield every record in the recording at *path*.
+
+    Raises :class:`ValueError` if the file is not a recording or is truncated.
+    """
+    data = Path(path).read_bytes()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a vegitate recording")
+    body = memoryview(data)[len(MAGIC):]
+    if len(body) % RECORD.size:
+        raise ValueError(
+            f"{path} is truncated ({len(body) % RECORD.size} stray bytes at the end)"
+        )
+    return RECORD.iter_unpack(body)
@@ -0,0 +1,192 @@
+"""Replay recorded (or synthetic) event streams through the tap callback.
+
+Importing this module installs the stand-in Quartz backend, so it must be
+imported before anything that pulls in :mod:`vegitate.core`.  Nothing here
+ever creates a real event tap — it is safe to run on a Mac and headless on
+Linux CI alike.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from array import array
+from collections.abc import Iterator
+from pathlib import Path
+
+from . import simulate
+
+simulate.install()
+
+from .bursts import parse_pattern  # noqa: E402
+from .core import Vegitate  # noqa: E402
+from .keys import KEY_MAP, MODIFIER_MAP, parse_sequence  # noqa: E402
+from .recording import Record, read_records  # noqa: E402
+
+
+# ---------------------------------------------------------------------------
+# Synthetic traffic
+# ---------------------------------------------------------------------------
+
+def synthetic_session(
+    events: int,
+    combo: str = "ctrl+cmd+u",
+    panic_key: str = "escape",
+    seed: int = 0,
+) -> Iterator[Record]:
+    """Yield roughly *events* records of plausible locked-session traffic.
+
+    The mix is dominated by 1 kHz mouse-move floods, with clicks, scrolls,
+    stray typing, wrong unlock combos and panic-key bursts mixed in, and ends
+    with the real unlock combo (every step of it, for a sequence).
+    """
+    rng = random.Random(seed)
+    ts = 0
+    emitted = 0
+    keys = [KEY_MAP[k] for k in "abcdefghijklmnopqrstuvwxyz"]
+    mods = sorted(set(MODIFIER_MAP.values()))
+    panic = parse_pattern(panic_key)
+    unlock_steps = parse_sequence(combo)
+    unlock_keycode, unlock_modifiers = unlock_steps[0]
+
+    while emitted < events:
+        kind = rng.random()
+        if kind < 0.70:
+            # Mouse-move flood at ~1 kHz.
+            for _ in range(rng.randint(50, 1000)):
+                ts += 1_000_000
+                yield (simulate.kCGEventMouseMoved, 0, 0, ts)
+                emitted += 1
+        elif kind < 0.80:
+            for down, up in (
+                (simulate.kCGEventLeftMouseDown, simulate.kCGEventLeftMouseUp),
+                (simulate.kCGEventRightMouseDown, simulate.kCGEventRightMouseUp),
+            ):
+                ts += rng.randint(50, 200) * 1_000_000
+                yield (down, 0, 0, ts)
+                ts += rng.randint(50, 150) * 1_000_000
+                yield (up, 0, 0, ts)
+                emitted += 2
+        elif kind < 0.88:
+            for _ in range(rng.randint(5, 40)):
+                ts += 8_000_000
+                yield (simulate.kCGEventScrollWheel, 0, 0, ts)
+                emitted += 1
+        elif kind < 0.95:
+            # Someone typing at a locked machine.
+            for _ in range(rng.randint(3, 30)):
+                key = rng.choice(keys)
+                ts += rng.randint(60, 250) * 1_000_000
+                yield (simulate.kCGEventKeyDown, key, 0, ts)
+                ts += rng.randint(30, 90) * 1_000_000
+                yield (simulate.kCGEventKeyUp, key, 0, ts)
+                emitted += 2
+        elif kind < 0.98:
+            # Wrong combo: right key, wrong modifiers (or vice versa).
+            flags = rng.choice(mods)
+            key = unlock_keycode if flags != unlock_modifiers else rng.choice(keys)
+            ts += rng.randint(200, 800) * 1_000_000
+            yield (simulate.kCGEventFlagsChanged, 0, flags, ts)
+            yield (simulate.kCGEventKeyDown, key, flags, ts + 40_000_000)
+            yield (simulate.kCGEventKeyUp, key, flags, ts + 90_000_000)
+            yield (simulate.kCGEventFlagsChanged, 0, 0, ts + 120_000_000)
+            ts += 120_000_000
+            emitted += 4
+        else:
+            # Panic-key burst — fast enough to trip the panic reset.
+            for i in range(rng.randint(3, 8)):
+                key = panic[i % len(panic)]
+                ts += rng.randint(80, 250) * 1_000_000
+                yield (simulate.kCGEventKeyDown, key, 0, ts)
+                ts += 40_000_000
+                yield (simulate.kCGEventKeyUp, key, 0, ts)
+                emitted += 2
+
+    for keycode, modifiers in unlock_steps:
+        ts += 300_000_000
+        yield (simulate.kCGEventKeyDown, keycode, modifiers, ts)
+
+
+# ---------------------------------------------------------------------------
+# Harness
+# ---------------------------------------------------------------------------
+
+def _percentile(sorted_ns: list[int], q: float) -> float:
+    """Nearest-rank percentile of *sorted_ns*, in microseconds."""
+    if not sorted_ns:
+        return 0.0
+    idx = min(len(sorted_ns) - 1, int(q * len(sorted_ns)))
+    return sorted_ns[idx] / 1000
+
+
+def replay(
+    records: list[Record],
+    combo: str | list[str] = "ctrl+cmd+u",
+    allow_mouse_move: bool = False,
+    passthrough: dict[str, object] | None = None,
+    panic_key: str | list[str] = "escape",
+    panic_taps: int = 5,
+    panic_window: float = 2.0,
+) -> dict[str, object]:
+    """Push *records* through ``Vegitate._event_callback`` and time it.
+
+    Two passes are made: an untimed one for raw throughput, then one that
+    times every call for the latency percentiles.  Unlocks triggered along
+    the way are counted and re-armed so the whole stream is exercised.
+    """
+    vegitate = Vegitate(
+        unlock_combo=combo,
+        allow_mouse_move=allow_mouse_move,
+        use_caffeinate=False,
+        panic_key=panic_key,
+        panic_taps=panic_taps,
+        panic_window=panic_window,
+        stats_path=None,
+        passthrough=passthrough,
+    )
+    unlocks = 0
+
+    def count_unlock() -> None:
+        nonlocal unlocks
+        unlocks += 1
+        vegitate._reset_panic()
+
+    vegitate._unlock = count_unlock  # type: ignore[method-assign]
+    vegitate._compile_policy()
+    callback = vegitate._event_callback
+
+    # Like the real tap, only deliver event types in the tap mask.
+    mask = vegitate._build_event_mask()
+    records = [r for r in records if r[0] > 31 or (mask >> r[0]) & 1]
+    types = [r[0] for r in records]
+    events = [simulate.FakeEvent(r[1], r[2], r[3]) for r in records]
+    pairs = list(zip(types, events))
+
+    start = time.perf_counter_ns()
+    for event_type, event in pairs:
+        callback(None, event_type, event, None)
+    elapsed = time.perf_counter_ns() - start
+
+    unlocks = 0
+    latencies = array("Q", bytes(8 * len(pairs)))
+    clock = time.perf_counter_ns
+    for i, (event_type, event) in enumerate(pairs):
+        t0 = clock()
+        callback(None, event_type, event, None)
+        latencies[i] = clock() - t0
+    ordered = sorted(latencies)
+
+    return {
+        "events": len(pairs),
+        "seconds": elapsed / 1e9,
+        "events_per_sec": len(pairs) / (elapsed / 1e9) if elapsed else 0.0,
+        "p50_us": _percentile(ordered, 0.50),
+        "p99_us": _percentile(ordered, 0.99),
+        "p999_us": _percentile(ordered, 0.999),
+        "max_us": ordered[-1] / 1000 if ordered else 0.0,
+        "unlocks": unlocks,
+    }
+
+
+def load(path: Path) -> list[Record]:
+    return list(read_records(path))
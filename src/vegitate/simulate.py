@@ -0,0 +1,259 @@
+"""Stand-in Quartz backend so Vegitate can run headless (benchmarks, Linux CI).
+
+Only the small slice of the Quartz / CoreFoundation API that Vegitate uses is
+provided.  Call :func:`install` *before* importing :mod:`vegitate.core` and the
+rest of the package will pick this module up as ``Quartz``::
+
+    from vegitate import simulate
+    simulate.install()
+
+    from vegitate.core import Vegitate
+"""
+
+from __future__ import annotations
+
+import queue
+import sys
+import threading
+import time
+from collections.abc import Callable
+
+# ---------------------------------------------------------------------------
+# Constants (values match the real framework headers)
+# ---------------------------------------------------------------------------
+
+kCGEventLeftMouseDown = 1
+kCGEventLeftMouseUp = 2
+kCGEventRightMouseDown = 3
+kCGEventRightMouseUp = 4
+kCGEventMouseMoved = 5
+kCGEventLeftMouseDragged = 6
+kCGEventRightMouseDragged = 7
+kCGEventKeyDown = 10
+kCGEventKeyUp = 11
+kCGEventFlagsChanged = 12
+kCGEventScrollWheel = 22
+kCGEventOtherMouseDown = 25
+kCGEventOtherMouseUp = 26
+kCGEventOtherMouseDragged = 27
+
+kCGEventFlagMaskShift = 0x00020000
+kCGEventFlagMaskControl = 0x00040000
+kCGEventFlagMaskAlternate = 0x00080000
+kCGEventFlagMaskCommand = 0x00100000
+
+kCGKeyboardEventKeycode = 9
+
+kCGSessionEventTap = 1
+kCGHeadInsertEventTap = 0
+kCGEventTapOptionDefault = 0
+
+kCFRunLoopCommonModes = "kCFRunLoopCommonModes"
+
+
+# ---------------------------------------------------------------------------
+# Events
+# ---------------------------------------------------------------------------
+
+class CGPoint:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: float = 0.0, y: float = 0.0) -> None:
+        self.x = x
+        self.y = y
+
+
+class FakeEvent:
+    """A synthetic CGEvent: a keycode, modifier flags, timestamp and location."""
+
+    __slots__ = ("keycode", "flags", "timestamp", "location")
+
+    def __init__(
+        self,
+        keycode: int = 0,
+        flags: int = 0,
+        timestamp: int = 0,
+        x: float = 0.0,
+        y: float = 0.0,
+    ) -> None:
+        self.keycode = keycode
+        self.flags = flags
+        self.timestamp = timestamp
+        self.location = CGPoint(x, y)
+
+
+def CGEventMaskBit(event_type: int) -> int:
+    return 1 << event_type
+
+
+def CGEventGetIntegerValueField(event: FakeEvent, field: int) -> int:
+    if field == kCGKeyboardEventKeycode:
+        return event.keycode
+    return 0
+
+
+def CGEventGetFlags(event: FakeEvent) -> int:
+    return event.flags
+
+
+def CGEventGetTimestamp(event: FakeEvent) -> int:
+    return event.timestamp
+
+
+def CGEventGetLocation(event: FakeEvent) -> CGPoint:
+    return event.location
+
+
+# ---------------------------------------------------------------------------
+# Event taps
+# ---------------------------------------------------------------------------
+
+class FakeTap:
+    """What :func:`CGEventTapCreate` hands back."""
+
+    def __init__(self, mask: int, callback, refcon: object) -> None:  # noqa: ANN001
+        self.mask = mask
+        self.callback = callback
+        self.refcon = refcon
+        self.enabled = False
+        self.valid = True
+        self.run_loop: FakeRunLoop | None = None
+
+    def post(self, event_type: int, event: FakeEvent) -> FakeEvent | None:
+        """Deliver one event the way the window server would.
+
+        Events outside the tap mask, or sent while the tap is disabled, pass
+        straight through without reaching the callback.
+        """
+        if not self.enabled or not (self.mask >> event_type) & 1:
+            return event
+        return self.callback(None, event_type, event, self.refcon)
+
+    def enqueue(
+        self,
+        event_type: int,
+        event: FakeEvent,
+        done: Callable[[FakeEvent | None], None] | None = None,
+    ) -> None:
+        """Queue an event for delivery on the tap's run loop thread.
+
+        Like the real thing, events reach a tap one at a time in arrival
+        order, so a slow callback makes everything behind it wait.  *done*
+        is called with the callback's result once the event is handled.
+        """
+        def deliver() -> None:
+            result = self.post(event_type, event)
+            if done is not None:
+                done(result)
+
+        self.run_loop.perform(deliver)
+
+
+# Every tap created through this backend, most recent last.
+taps: list[FakeTap] = []
+
+# Set to False to make CGEventTapCreate fail like a missing permission does.
+permission_granted = True
+
+
+def CGEventTapCreate(tap, place, options, mask, callback, refcon):  # noqa: ANN001
+    if not permission_granted:
+        return None
+    tap_obj = FakeTap(mask, callback, refcon)
+    taps.append(tap_obj)
+    return tap_obj
+
+
+def CGEventTapEnable(tap: FakeTap, enable: bool) -> None:
+    tap.enabled = bool(enable) and tap.valid
+
+
+def CFMachPortInvalidate(tap: FakeTap) -> None:
+    tap.valid = False
+    tap.enabled = False
+
+
+# ---------------------------------------------------------------------------
+# Run loops
+# ---------------------------------------------------------------------------
+
+class FakeRunLoop:
+    """A run loop that executes queued work items until stopped."""
+
+    def __init__(self) -> None:
+        self.sources: list[object] = []
+        self._queue: queue.SimpleQueue[Callable[[], None] | None] = queue.SimpleQueue()
+
+    def perform(self, work: Callable[[], None]) -> None:
+        self._queue.put(work)
+
+    def run(self) -> None:
+        while True:
+            work = self._queue.get()
+            if work is None:
+                return
+            work()
+
+    def stop(self) -> None:
+        self._queue.put(None)
+
+
+_local = threading.local()
+
+
+def CFRunLoopGetCurrent() -> FakeRunLoop:
+    loop = getattr(_local, "loop", None)
+    if loop is None:
+        loop = _local.loop = FakeRunLoop()
+    return loop
+
+
+def CFMachPortCreateRunLoopSource(allocator, port, order):  # noqa: ANN001
+    return port
+
+
+def CFRunLoopAddSource(loop: FakeRunLoop, source: object, mode: str) -> None:
+    loop.sources.append(source)
+    if isinstance(source, FakeTap):
+        source.run_loop = loop
+
+
+def CFRunLoopRemoveSource(loop: FakeRunLoop, source: object, mode: str) -> None:
+    if source in loop.sources:
+        loop.sources.remove(source)
+
+
+def CFRunLoopWakeUp(loop: FakeRunLoop) -> None:
+    pass  # perform() already wakes the loop
+
+
+def CFRunLoopRun() -> None:
+    CFRunLoopGetCurrent().run()
+
+
+def CFRunLoopStop(loop: FakeRunLoop) -> None:
+    loop.stop()
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def now_ns() -> int:
+    """A timestamp in the same unit as ``CGEventGetTimestamp``.
+
+    Nanoseconds: off macOS the event timebase is taken to be 1:1.
+    """
+    return time.monotonic_ns()
+
+
+def reset() -> None:
+    """Forget every tap created so far."""
+    global permission_granted
+    taps.clear()
+    permission_granted = True
+
+
+def install() -> None:
+    """Register this module as ``Quartz`` for the rest of the process."""
+    sys.modules["Quartz"] = sys.modules[__name__]
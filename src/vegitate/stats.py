@@ -0,0 +1,162 @@
+"""Cheap, fixed-size instrumentation for the event-tap callback.
+
+Everything lives in preallocated :class:`array.array` buffers so recording an
+event is a couple of integer increments — no lists, dicts or objects are
+created on the hot path.  Read it any time with :meth:`CallbackStats.snapshot`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+
+# Latency bucket ``b`` counts callbacks that took under ``1024 << b`` ns, so
+# bucket 0 is "< ~1 µs".  There is one bucket per bit of a 64-bit duration,
+# which means recording never has to clamp the index.
+LATENCY_BUCKETS = 55
+
+# CGEventType values are small integers; anything at or above this (the
+# tap-disabled pseudo-events) is counted separately.
+EVENT_TYPES = 32
+
+EVENT_NAMES: dict[int, str] = {
+    1: "left_mouse_down",
+    2: "left_mouse_up",
+    3: "right_mouse_down",
+    4: "right_mouse_up",
+    5: "mouse_moved",
+    6: "left_mouse_dragged",
+    7: "right_mouse_dragged",
+    10: "key_down",
+    11: "key_up",
+    12: "flags_changed",
+    22: "scroll_wheel",
+    25: "other_mouse_down",
+    26: "other_mouse_up",
+    27: "other_mouse_dragged",
+}
+
+
+def bucket_upper_ns(bucket: int) -> int:
+    """Exclusive upper bound of latency *bucket*, in nanoseconds."""
+    return 1024 << bucket
+
+
+def histogram_quantile_ns(histogram: Sequence[int], q: float) -> int:
+    """Upper bound (ns) of the bucket holding quantile *q* (0–1); 0 if empty."""
+    rank = q * sum(histogram)
+    seen = 0
+    for bucket, count in enumerate(histogram):
+        seen += count
+        if count and seen >= rank:
+            return bucket_upper_ns(bucket)
+    return 0
+
+
+class CallbackStats:
+    """Latency histogram, per-event-type counters and tap-health counters.
+
+    :attr:`events` counts every event the callback saw, :attr:`passed` the
+    ones it let through (bumped by the passthrough handlers themselves, so
+    blocking an event costs nothing extra); the rest were suppressed.
+    """
+
+    __slots__ = (
+        "latency",
+        "events",
+        "passed",
+        "tap_reenabled_timeout",
+        "tap_reenabled_user",
+        "started",
+    )
+
+    def __init__(self) -> None:
+        self.latency = array("Q", bytes(8 * LATENCY_BUCKETS))
+        self.events = array("Q", bytes(8 * EVENT_TYPES))
+        self.passed = array("Q", bytes(8 * EVENT_TYPES))
+        self.tap_reenabled_timeout = 0
+        self.tap_reenabled_user = 0
+        self.started = time.time()
+
+    def record(self, event_type: int, elapsed_ns: int) -> None:
+        self.latency[(elapsed_ns >> 10).bit_length()] += 1
+        if event_type < EVENT_TYPES:
+            self.events[event_type] += 1
+
+    # ---- reading ----
+
+    @property
+    def total(self) -> int:
+        return sum(self.latency)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound (in µs) of the bucket holding quantile *q* (0–1)."""
+        return histogram_quantile_ns(self.latency, q) / 1000
+
+    def suppressed(self) -> dict[int, int]:
+        """Event type → events suppressed, for the types that had any."""
+        return {
+            t: n - self.passed[t]
+            for t, n in enumerate(self.events) if n > self.passed[t]
+        }
+
+    def snapshot(self) -> dict[str, object]:
+        return {
+            "started": self.started,
+            "duration": time.time() - self.started,
+            "events_total": self.total,
+            "events": {
+                EVENT_NAMES.get(t, str(t)): n
+                for t, n in enumerate(self.events) if n
+            },
+            "suppressed": {
+                EVENT_NAMES.get(t, str(t)): n for t, n in self.suppressed().items()
+            },
+            "tap_reenabled": {
+                "timeout": self.tap_reenabled_timeout,
+                "user": self.tap_reenabled_user,
+            },
+            "latency_us": {
+                "p50": self.quantile(0.50),
+                "p99": self.quantile(0.99),
+                "p999": self.quantile(0.999),
+                "buckets": {
+                    f"<{bucket_upper_ns(b) / 1000:g}": n
+                    for b, n in enumerate(self.latency) if n
+                },
+            },
+        }
+
+    def dump(self, path: Path) -> None:
+        """Write :meth:`snapshot` to *path* as JSON (atomically)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.snapshot(), indent=2) + "\n")
+        os.replace(tmp, path)
+
+
+class StartupTimings:
+    """When each startup phase finished, in seconds since *start*.
+
+    *start* is a :func:`time.perf_counter` reading — the CLI takes one as the
+    very first thing it does, so the phases include argument parsing,
+    config loading and the lazy imports.  Phases may be marked from any
+    thread.
+    """
+
+    __slots__ = ("start", "marks")
+
+    def __init__(self, start: float | None = None) -> None:
+        self.start = time.perf_counter() if start is None else start
+        self.marks: list[tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        self.marks.append((phase, time.perf_counter() - self.start))
+
+    def phases(self) -> list[tuple[str, float]]:
+        """``(phase, seconds)`` pairs in the order they finished."""
+        return sorted(self.marks, key=lambda m: m[1])
@@ -0,0 +1,73 @@
+"""Read-only HTTP/JSON status endpoint of a running session or daemon.
+
+``GET /status`` returns what the lock panel shows — locked or not, for how
+long, caffeinate, the latency guard — plus the pid and version, as one JSON
+object.  The unlock combo is never included, and nothing can be changed
+over HTTP: locking and unlocking stay on the owner-only control socket.
+Connections are kept alive, so a poller such as ``vegitate fleet`` pays for
+the TCP handshake once, not on every poll.
+"""
+
+from __future__ import annotations
+
+import json
+import socket
+import threading
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import __version__
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    server: StatusServer
+    # Keep-alive; every response carries a Content-Length.
+    protocol_version = "HTTP/1.1"
+    server_version = f"vegitate/{__version__}"
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.partition("?")[0] in ("/", "/status"):
+            self._reply(200, self.server.status())
+        else:
+            self._reply(404, {"ok": False, "error": "not found"})
+
+    def _reply(self, code: int, payload: dict[str, object]) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass  # stderr is the lock screen's terminal
+
+
+class StatusServer(ThreadingHTTPServer):
+    """Serve *status()* on *address* from a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], status: Callable[[], dict[str, object]]) -> None:
+        if ":" in address[0]:
+            self.address_family = socket.AF_INET6
+        super().__init__(address, _StatusHandler)
+        self.status = status
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="vegitate-status", daemon=True,
+        )
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def handle_error(self, request: object, client_address: object) -> None:
+        pass  # usually a poller that gave up waiting; stderr is the lock screen
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def close(self) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,198 @@
+"""Watch the config file for changes while a session is running.
+
+Uses the cheapest notification the OS offers: kqueue on macOS (vnode
+events on the config directory, so editors that save by renaming a new
+file into place are seen too), inotify on Linux, and otherwise a stat poll.
+Whatever the backend, a change only counts once the file's *(mtime, size)*
+key differs from the last one seen, so the callback fires once per save.
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from .config import CONFIG_PATH, config_key
+
+# inotify(7) constants (linux/inotify.h).
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_IN_MASK = (
+    _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+)
+
+
+def _inotify_fd(directory: Path) -> int | None:
+    """An inotify descriptor watching *directory*, or ``None`` if unavailable."""
+    try:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), _IN_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+class ConfigWatcher:
+    """Call *on_change* from a background thread whenever *path* changes.
+
+    *interval* is the poll period when there's no kqueue or inotify, and
+    how often the thread checks whether it has been stopped.  *settle* is
+    how long to wait after a notification before reading the key, so the
+    several events of one save arrive together.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[], None],
+        path: Path = CONFIG_PATH,
+        interval: float = 1.0,
+        settle: float = 0.05,
+    ) -> None:
+        self.on_change = on_change
+        self.path = path
+        self.interval = interval
+        self.settle = settle
+        self.backend = "poll"
+        self._key = config_key(path)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._file_kevent: int | None = None  # kqueue: fd of the file itself
+        self._wait: Callable[[], bool] = self._wait_poll
+        self._close: Callable[[], None] = lambda: None
+
+    def start(self) -> None:
+        self._open_backend()
+        self._thread = threading.Thread(
+            target=self._run, name="vegitate-config-watch", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        # Not joined: the thread notices within *interval* and closes its
+        # descriptors itself, and unlocking shouldn't wait for that.
+        self._stop.set()
+        self._thread = None
+
+    # ------------------------------------------------------------------ #
+    #  backends                                                           #
+    # ------------------------------------------------------------------ #
+
+    def _open_backend(self) -> None:
+        directory = self.path.parent
+        if not directory.is_dir():
+            return  # nothing to watch yet; poll until the file appears
+        if hasattr(select, "kqueue"):
+            self._open_kqueue(directory)
+        else:
+            fd = _inotify_fd(directory)
+            if fd is not None:
+                self.backend = "inotify"
+                self._wait = lambda: self._wait_fd(fd)
+                self._close = lambda: os.close(fd)
+
+    def _open_kqueue(self, directory: Path) -> None:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        kq = select.kqueue()
+        kq.control([select.kevent(
+            fd,
+            filter=select.KQ_FILTER_VNODE,
+            flags=select.KQ_EV_ADD | select.KQ_EV_CLEAR,
+            fflags=select.KQ_NOTE_WRITE | select.KQ_NOTE_ATTRIB | select.KQ_NOTE_EXTEND,
+        )], 0)
+        self.backend = "kqueue"
+        self._file_kevent = self._watch_file(kq)
+
+        def wait() -> bool:
+            events = kq.control(None, 4, self.interval)
+            if events:
+                # The file itself may have been replaced: re-arm its watch.
+                self._file_kevent = self._watch_file(kq)
+            return bool(events)
+
+        def close() -> None:
+            if self._file_kevent is not None:
+                os.close(self._file_kevent)
+            kq.close()
+            os.close(fd)
+
+        self._wait = wait
+        self._close = close
+
+    def _watch_file(self, kq: select.kqueue) -> int | None:
+        # Directory events cover create/rename/delete; in-place writes only
+        # show up on the file's own descriptor.
+        if self._file_kevent is not None:
+            os.close(self._file_kevent)
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except OSError:
+            return None
+        kq.control([select.kevent(
+            fd,
+            filter=select.KQ_FILTER_VNODE,
+            flags=select.KQ_EV_ADD | select.KQ_EV_CLEAR,
+            fflags=(
+                select.KQ_NOTE_WRITE | select.KQ_NOTE_EXTEND | select.KQ_NOTE_ATTRIB
+                | select.KQ_NOTE_DELETE | select.KQ_NOTE_RENAME
+            ),
+        )], 0)
+        return fd
+
+    def _wait_fd(self, fd: int) -> bool:
+        ready, _, _ = select.select([fd], [], [], self.interval)
+        if not ready:
+            return False
+        try:
+            while os.read(fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def _wait_poll(self) -> bool:
+        self._stop.wait(self.interval)
+        return True
+
+    # ------------------------------------------------------------------ #
+    #  loop                                                               #
+    # ------------------------------------------------------------------ #
+
+    def _run(self) -> None:
+        try:
+            # The first pass doesn't wait, catching a save made between
+            # __init__ and the backend being set up.  After that the key is
+            # also re-checked on every timeout, which costs one stat per
+            # *interval* and covers any notification the backend missed.
+            notified = False
+            while not self._stop.is_set():
+                if notified and self.backend != "poll":
+                    self._stop.wait(self.settle)
+                key = config_key(self.path)
+                if key != self._key:
+                    self._key = key
+                    self.on_change()
+                notified = self._wait()
+        finally:
+            self._close()